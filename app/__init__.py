@@ -21,8 +21,9 @@ login_manager.anonymous_user = AnonymousUser
 
 @login_manager.user_loader
 def load_user(user_id):
-    from app.models.user import User
-    return User.query.get(int(user_id))
+    # Instantané en lecture seule, mis en cache (voir app/utils/identity_cache.py)
+    from app.utils.identity_cache import IdentityCache
+    return IdentityCache.get(int(user_id))
 
 def create_app(config_name='default'):
     app = Flask(__name__)
@@ -4,9 +4,37 @@ Package pour les commandes CLI personnalisées.
 """
 
 def register_commands(app):
-    """Enregistre les commandes existantes du module tricount"""
-    from app.commands.tricount_commands import init_tricount_categories, tricount_init, migrate_merchant_names
+    """Enregistre les commandes des modules tricount et teamplanning, des traitements en arrière-plan, du suivi des erreurs et la mise à jour du schéma"""
+    from app.commands.tricount_commands import (
+        init_tricount_categories, tricount_init, migrate_merchant_names, ensure_expense_indexes,
+        init_expense_search
+    )
     
     app.cli.add_command(init_tricount_categories)
     app.cli.add_command(tricount_init)
-    app.cli.add_command(migrate_merchant_names)
\ No newline at end of file
+    app.cli.add_command(migrate_merchant_names)
+    app.cli.add_command(ensure_expense_indexes)
+    app.cli.add_command(init_expense_search)
+    
+    from app.commands.teamplanning_commands import (
+        init_teamplanning_tables, clear_planning_cache, compress_raw_plannings, prune_raw_plannings
+    )
+    
+    app.cli.add_command(init_teamplanning_tables)
+    app.cli.add_command(clear_planning_cache)
+    app.cli.add_command(compress_raw_plannings)
+    app.cli.add_command(prune_raw_plannings)
+    
+    from app.commands.job_commands import init_jobs_table, fail_stale_jobs
+    
+    app.cli.add_command(init_jobs_table)
+    app.cli.add_command(fail_stale_jobs)
+    
+    from app.commands.error_commands import collapse_error_history, rollup_error_stats
+    
+    app.cli.add_command(collapse_error_history)
+    app.cli.add_command(rollup_error_stats)
+    
+    from app.commands.schema_commands import upgrade_schema
+    
+    app.cli.add_command(upgrade_schema)
\ No newline at end of file
@@ -0,0 +1,274 @@
+# app/commands/error_commands.py
+"""
+Commandes personnalisées pour le suivi des erreurs (tables error_following, error_occurrences et error_stats_daily)
+"""
+import click
+from datetime import datetime
+from flask.cli import with_appcontext
+from sqlalchemy import bindparam, func, select
+from app.extensions import db
+
+# Colonnes ajoutées à error_following par le regroupement des erreurs
+GROUPING_COLUMNS = ('fingerprint', 'occurrence_count', 'first_seen', 'last_seen')
+
+
+def _add_grouping_columns(bind, errors):
+    """Ajoute à error_following les colonnes de regroupement absentes"""
+    existing = {column['name'] for column in db.inspect(bind).get_columns('error_following')}
+    missing = [name for name in GROUPING_COLUMNS if name not in existing]
+
+    with bind.begin() as connection:
+        for name in missing:
+            column_type = errors.c[name].type.compile(dialect=bind.dialect)
+            default = ' NOT NULL DEFAULT 1' if name == 'occurrence_count' else ''
+            connection.exec_driver_sql(f'ALTER TABLE error_following ADD COLUMN {name} {column_type}{default}')
+    return missing
+
+
+def _fingerprint_rows(bind, errors, occurrences, batch_size):
+    """
+    Calcule l'empreinte des erreurs qui n'en ont pas et copie chacune dans error_occurrences
+
+    Chaque ligne non regroupée est une occurrence unique: elle est aussi comptée
+    dans error_stats_daily. Chaque lot est traité dans sa propre transaction: la
+    commande peut être relancée.
+    """
+    from app.models.error_following import ErrorFollowing, ErrorStatsDaily, compute_fingerprint
+
+    pending = (
+        select(errors.c.id, errors.c.error_type, errors.c.source, errors.c.stack_trace, errors.c.created_at)
+        .where(errors.c.fingerprint.is_(None))
+        .order_by(errors.c.id)
+        .limit(batch_size)
+    )
+    update = (
+        errors.update()
+        .where(errors.c.id == bindparam('row_id'))
+        .values(
+            fingerprint=bindparam('row_fingerprint'),
+            occurrence_count=1,
+            first_seen=bindparam('seen'),
+            last_seen=bindparam('seen')
+        )
+    )
+    columns = ('error_id', 'created_at') + ErrorFollowing.OCCURRENCE_COLUMNS
+
+    processed = 0
+    while True:
+        with bind.begin() as connection:
+            rows = connection.execute(pending).all()
+            if not rows:
+                break
+            now = datetime.utcnow()
+            connection.execute(update, [
+                {
+                    'row_id': row.id,
+                    'row_fingerprint': compute_fingerprint(row.error_type, row.source, row.stack_trace),
+                    'seen': row.created_at or now
+                }
+                for row in rows
+            ])
+            copied = select(
+                errors.c.id, func.coalesce(errors.c.created_at, now),
+                *[errors.c[name] for name in ErrorFollowing.OCCURRENCE_COLUMNS]
+            ).where(errors.c.id.in_([row.id for row in rows]))
+            connection.execute(occurrences.insert().from_select(columns, copied))
+            ErrorStatsDaily.increment(connection, ErrorStatsDaily.count_rows(
+                {'created_at': row.created_at or now, 'error_type': row.error_type, 'source': row.source}
+                for row in rows
+            ))
+        processed += len(rows)
+        click.echo(f"{processed} erreurs analysées...")
+    return processed
+
+
+def _collapse_fingerprint(connection, errors, occurrences, fingerprint):
+    """
+    Fusionne les lignes d'une même empreinte dans la plus récente
+
+    Returns:
+        int: Nombre de lignes supprimées
+    """
+    from app.models.error_following import MAX_SAMPLES_PER_ERROR
+
+    rows = connection.execute(
+        select(errors.c.id, errors.c.occurrence_count, errors.c.first_seen, errors.c.last_seen,
+               errors.c.resolved, errors.c.resolved_at)
+        .where(errors.c.fingerprint == fingerprint)
+        .order_by(errors.c.last_seen.desc(), errors.c.id.desc())
+    ).all()
+    keeper, others = rows[0], [row.id for row in rows[1:]]
+
+    # L'erreur regroupée n'est résolue que si toutes ses occurrences l'étaient
+    resolved = all(row.resolved for row in rows)
+    connection.execute(errors.update().where(errors.c.id == keeper.id).values(
+        occurrence_count=sum(row.occurrence_count or 1 for row in rows),
+        first_seen=min(row.first_seen for row in rows if row.first_seen is not None),
+        resolved=resolved,
+        resolved_at=keeper.resolved_at if resolved else None
+    ))
+    connection.execute(
+        occurrences.update().where(occurrences.c.error_id.in_(others)).values(error_id=keeper.id)
+    )
+    connection.execute(errors.delete().where(errors.c.id.in_(others)))
+
+    kept = (
+        select(occurrences.c.id)
+        .where(occurrences.c.error_id == keeper.id)
+        .order_by(occurrences.c.created_at.desc(), occurrences.c.id.desc())
+        .limit(MAX_SAMPLES_PER_ERROR)
+    )
+    connection.execute(
+        occurrences.delete().where(occurrences.c.error_id == keeper.id, occurrences.c.id.notin_(kept))
+    )
+    return len(others)
+
+
+@click.command('collapse_error_history')
+@click.option('--batch-size', default=500, show_default=True,
+              help="Nombre d'erreurs (ou d'empreintes) traitées par transaction")
+@with_appcontext
+def collapse_error_history(batch_size):
+    """
+    Regroupe l'historique de error_following: une ligne par empreinte
+
+    Crée la table error_occurrences et les colonnes de regroupement si besoin,
+    calcule l'empreinte des erreurs existantes (chacune est copiée comme
+    occurrence et comptée dans error_stats_daily), fusionne les lignes de même empreinte en cumulant leurs
+    compteurs, puis crée l'index unique sur l'empreinte. La commande peut être
+    interrompue et relancée.
+    """
+    from app.models.error_following import ErrorFollowing, ErrorOccurrence, ErrorStatsDaily
+
+    bind = db.session.get_bind()
+    errors = ErrorFollowing.__table__
+    occurrences = ErrorOccurrence.__table__
+
+    try:
+        occurrences.create(bind, checkfirst=True)
+        ErrorStatsDaily.__table__.create(bind, checkfirst=True)
+
+        added = _add_grouping_columns(bind, errors)
+        if added:
+            click.echo(f"Colonnes ajoutées: {', '.join(added)}")
+
+        processed = _fingerprint_rows(bind, errors, occurrences, batch_size)
+
+        duplicates = (
+            select(errors.c.fingerprint)
+            .where(errors.c.fingerprint.isnot(None))
+            .group_by(errors.c.fingerprint)
+            .having(func.count() > 1)
+            .limit(batch_size)
+        )
+        removed = 0
+        while True:
+            with bind.begin() as connection:
+                fingerprints = connection.execute(duplicates).scalars().all()
+                if not fingerprints:
+                    break
+                for fingerprint in fingerprints:
+                    removed += _collapse_fingerprint(connection, errors, occurrences, fingerprint)
+            click.echo(f"{removed} lignes fusionnées...")
+
+        with bind.begin() as connection:
+            for index in errors.indexes | occurrences.indexes:
+                index.create(connection, checkfirst=True)
+
+        remaining = db.session.query(func.count(ErrorFollowing.id)).scalar()
+        click.echo(f"Regroupement terminé: {processed} erreurs analysées, {removed} lignes fusionnées, "
+                   f"{remaining} erreurs distinctes")
+    except Exception as e:
+        db.session.rollback()
+        click.echo(f"Erreur lors du regroupement des erreurs: {str(e)}")
+        return False
+
+    return True
+
+
+def _rebuild_error_stats(connection, batch_size):
+    """
+    Recalcule error_stats_daily à partir des erreurs regroupées
+
+    Le détail par jour n'est connu que pour les occurrences conservées dans
+    error_occurrences; les autres occurrences d'une erreur sont comptées au jour
+    de sa première occurrence.
+
+    Returns:
+        int: Nombre d'occurrences comptées
+    """
+    from app.models.error_following import ErrorFollowing, ErrorOccurrence, ErrorStatsDaily
+
+    errors = ErrorFollowing.__table__
+    occurrences = ErrorOccurrence.__table__
+    connection.execute(ErrorStatsDaily.__table__.delete())
+
+    total = 0
+    last_id = 0
+    while True:
+        groups = connection.execute(
+            select(errors.c.id, errors.c.error_type, errors.c.source, errors.c.first_seen,
+                   errors.c.created_at, errors.c.occurrence_count)
+            .where(errors.c.id > last_id)
+            .order_by(errors.c.id)
+            .limit(batch_size)
+        ).all()
+        if not groups:
+            break
+        last_id = groups[-1].id
+
+        sampled = {}
+        for error_id, created_at in connection.execute(
+            select(occurrences.c.error_id, occurrences.c.created_at)
+            .where(occurrences.c.error_id.in_([group.id for group in groups]))
+        ):
+            sampled.setdefault(error_id, []).append(created_at)
+
+        counts = {}
+        for group in groups:
+            first_seen = group.first_seen or group.created_at or datetime.utcnow()
+            seen = sampled.get(group.id, [])
+            remaining = max((group.occurrence_count or 1) - len(seen), 0)
+            rows = [{'created_at': created_at or first_seen, 'error_type': group.error_type, 'source': group.source}
+                    for created_at in seen]
+            for key, count in ErrorStatsDaily.count_rows(rows).items():
+                counts[key] = counts.get(key, 0) + count
+            if remaining:
+                key = (first_seen.date(), group.error_type, (group.source or '')[:255])
+                counts[key] = counts.get(key, 0) + remaining
+            total += len(seen) + remaining
+        ErrorStatsDaily.increment(connection, counts)
+    return total
+
+
+@click.command('rollup_error_stats')
+@click.option('--rebuild', is_flag=True, help="Recalcule les compteurs même si la table est déjà remplie")
+@click.option('--batch-size', default=500, show_default=True, help="Nombre d'erreurs lues par requête")
+@with_appcontext
+def rollup_error_stats(rebuild, batch_size):
+    """
+    Crée et remplit la table error_stats_daily (statistiques des erreurs)
+
+    Les compteurs sont ensuite tenus à jour à chaque écriture du journal
+    d'erreurs: la commande ne recalcule une table déjà remplie qu'avec --rebuild.
+    """
+    from app.models.error_following import ErrorStatsDaily
+
+    bind = db.session.get_bind()
+    table = ErrorStatsDaily.__table__
+
+    try:
+        table.create(bind, checkfirst=True)
+        with bind.begin() as connection:
+            populated = connection.execute(select(table.c.day).limit(1)).first() is not None
+            if populated and not rebuild:
+                click.echo("La table error_stats_daily est déjà remplie (--rebuild pour la recalculer)")
+                return True
+            total = _rebuild_error_stats(connection, batch_size)
+
+        click.echo(f"Statistiques recalculées: {total} occurrences comptées")
+    except Exception as e:
+        click.echo(f"Erreur lors du calcul des statistiques d'erreurs: {str(e)}")
+        return False
+
+    return True
@@ -0,0 +1,58 @@
+# app/commands/job_commands.py
+"""
+Commandes personnalisées pour les traitements en arrière-plan (table jobs)
+"""
+import click
+from datetime import datetime, timedelta
+from flask.cli import with_appcontext
+from app.extensions import db
+
+
+@click.command('init_jobs_table')
+@with_appcontext
+def init_jobs_table():
+    """Crée la table jobs si elle est absente de la base"""
+    from app.models.job import Job
+
+    try:
+        with db.session.get_bind().begin() as connection:
+            if db.inspect(connection).has_table(Job.__tablename__):
+                click.echo("La table jobs existe déjà")
+                return True
+            Job.__table__.create(connection, checkfirst=True)
+
+        click.echo("Table créée: jobs")
+    except Exception as e:
+        click.echo(f"Erreur lors de la création de la table jobs: {str(e)}")
+        return False
+
+    return True
+
+
+@click.command('fail_stale_jobs')
+@click.option('--older-than-hours', default=6, show_default=True,
+              help="Âge à partir duquel un traitement non terminé est considéré comme interrompu")
+@with_appcontext
+def fail_stale_jobs(older_than_hours):
+    """Marque en échec les traitements interrompus (processus redémarré pendant leur exécution)"""
+    from app.models.job import Job
+
+    cutoff = datetime.utcnow() - timedelta(hours=older_than_hours)
+
+    try:
+        count = Job.query.filter(
+            Job.status.in_([Job.PENDING, Job.RUNNING]),
+            Job.created_at < cutoff
+        ).update({
+            Job.status: Job.FAILED,
+            Job.error: 'Traitement interrompu',
+            Job.finished_at: datetime.utcnow()
+        }, synchronize_session=False)
+        db.session.commit()
+        click.echo(f"{count} traitements interrompus marqués en échec")
+    except Exception as e:
+        db.session.rollback()
+        click.echo(f"Erreur lors du nettoyage des traitements: {str(e)}")
+        return False
+
+    return True
@@ -0,0 +1,55 @@
+# app/commands/schema_commands.py
+"""
+Mise à jour ordonnée du schéma de la base
+
+Les tables, colonnes et index ajoutés depuis la version de base ne sont pas
+couverts par les révisions Flask-Migrate: chacun a sa commande idempotente.
+upgrade_schema les enchaîne dans l'ordre requis par le code déployé; elle est
+lancée au démarrage du conteneur, après `flask db upgrade`.
+"""
+import click
+from flask.cli import with_appcontext
+
+
+def _upgrade_steps():
+    """Commandes de mise à jour, dans l'ordre d'exécution, avec leurs options"""
+    from app.commands.tricount_commands import ensure_expense_indexes, init_expense_search
+    from app.commands.teamplanning_commands import init_teamplanning_tables, compress_raw_plannings
+    from app.commands.job_commands import init_jobs_table
+    from app.commands.error_commands import collapse_error_history, rollup_error_stats
+    from app.commands.user_commands import init_permission_version
+
+    return [
+        # Compteur partagé du cache des permissions
+        (init_permission_version, {}),
+        # Dépenses: index des filtres et recherche plein texte (PostgreSQL)
+        (ensure_expense_indexes, {'check': False}),
+        (init_expense_search, {}),
+        # Teamplanning: cache d'extraction et blocs par utilisateur, puis HTML compressé
+        (init_teamplanning_tables, {}),
+        (compress_raw_plannings, {}),
+        # Traitements en arrière-plan
+        (init_jobs_table, {}),
+        # Suivi des erreurs: regroupement par empreinte (index unique requis par le
+        # journal d'erreurs), puis compteurs journaliers
+        (collapse_error_history, {}),
+        (rollup_error_stats, {}),
+    ]
+
+
+@click.command('upgrade_schema')
+@with_appcontext
+@click.pass_context
+def upgrade_schema(ctx):
+    """
+    Applique dans l'ordre toutes les mises à jour de schéma (idempotent)
+
+    S'arrête à la première commande en échec, avec un code de sortie non nul.
+    """
+    for command, options in _upgrade_steps():
+        click.echo(f"== {command.name}")
+        if ctx.invoke(command, **options) is False:
+            raise click.ClickException(f"Mise à jour du schéma interrompue: échec de {command.name}")
+
+    click.echo("Schéma à jour")
+    return True
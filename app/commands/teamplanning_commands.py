@@ -0,0 +1,175 @@
+# app/commands/teamplanning_commands.py
+"""
+Commandes personnalisées pour le module teamplanning
+"""
+import click
+from datetime import datetime, timedelta
+from flask.cli import with_appcontext
+from sqlalchemy import bindparam, select
+from app.extensions import db
+
+# Tables du module, dans l'ordre des dépendances (clés étrangères)
+TEAMPLANNING_TABLES = (
+    'raw_plannings',
+    'parsed_plannings',
+    'planning_entries',
+    'planning_extraction_cache',
+    'planning_user_blocks',
+)
+
+
+@click.command('init_teamplanning_tables')
+@with_appcontext
+def init_teamplanning_tables():
+    """Crée les tables du module teamplanning absentes de la base"""
+    import app.models.planning  # noqa: F401 - déclare les tables dans les métadonnées
+
+    bind = db.session.get_bind()
+
+    try:
+        with bind.begin() as connection:
+            inspector = db.inspect(connection)
+            created = []
+            for name in TEAMPLANNING_TABLES:
+                if inspector.has_table(name):
+                    continue
+                db.metadata.tables[name].create(connection, checkfirst=True)
+                created.append(name)
+
+        if created:
+            click.echo(f"Tables créées: {', '.join(created)}")
+        else:
+            click.echo("Toutes les tables teamplanning existent déjà")
+    except Exception as e:
+        click.echo(f"Erreur lors de la création des tables teamplanning: {str(e)}")
+        return False
+
+    return True
+
+
+@click.command('clear_planning_cache')
+@with_appcontext
+def clear_planning_cache():
+    """Vide le cache des résultats d'extraction Netplanning (mémoire et base)"""
+    from app.services.teamplanning import ExtractionCache
+
+    try:
+        deleted = ExtractionCache.invalidate()
+        click.echo(f"Cache d'extraction vidé: {deleted} entrées supprimées")
+    except Exception as e:
+        db.session.rollback()
+        click.echo(f"Erreur lors du vidage du cache d'extraction: {str(e)}")
+        return False
+
+    return True
+
+
+@click.command('compress_raw_plannings')
+@click.option('--batch-size', default=20, show_default=True,
+              help="Nombre de plannings compressés par transaction (chaque planning pèse plusieurs Mo)")
+@with_appcontext
+def compress_raw_plannings(batch_size):
+    """
+    Migre raw_plannings.raw_content du texte vers le stockage compressé (zlib)
+
+    L'ancienne colonne est renommée raw_content_text, puis les plannings sont
+    compressés par lots dans la nouvelle colonne binaire; l'ancienne colonne est
+    supprimée à la fin. La commande peut être interrompue et relancée.
+    """
+    from app.models.planning import RawPlanning, _TEXT_STORAGE
+
+    bind = db.session.get_bind()
+    table = RawPlanning.__table__
+
+    try:
+        columns = {column['name']: column for column in db.inspect(bind).get_columns('raw_plannings')}
+        if 'raw_content_text' not in columns:
+            if isinstance(columns['raw_content']['type'], db.LargeBinary):
+                click.echo("La colonne raw_content est déjà compressée")
+                return True
+
+            binary_type = table.c.raw_content.type.impl.compile(dialect=bind.dialect)
+            with bind.begin() as connection:
+                connection.exec_driver_sql(
+                    'ALTER TABLE raw_plannings RENAME COLUMN raw_content TO raw_content_text'
+                )
+                connection.exec_driver_sql(f'ALTER TABLE raw_plannings ADD COLUMN raw_content {binary_type}')
+
+        # La nouvelle colonne est binaire: les écritures ci-dessous sont compressées
+        _TEXT_STORAGE[bind.dialect] = False
+
+        text_column = db.column('raw_content_text', db.Text)
+        pending = (
+            select(table.c.id, text_column)
+            .select_from(table)
+            .where(table.c.raw_content.is_(None), text_column.isnot(None))
+            .order_by(table.c.id)
+            .limit(batch_size)
+        )
+        # Le type CompressedText de la colonne compresse les valeurs à l'écriture
+        update = (
+            table.update()
+            .where(table.c.id == bindparam('row_id'))
+            .values(raw_content=bindparam('content'))
+        )
+
+        compressed = 0
+        while True:
+            with bind.begin() as connection:
+                rows = connection.execute(pending).all()
+                if not rows:
+                    break
+                connection.execute(update, [{'row_id': row.id, 'content': row.raw_content_text} for row in rows])
+            compressed += len(rows)
+            click.echo(f"{compressed} plannings compressés...")
+
+        with bind.begin() as connection:
+            connection.exec_driver_sql('ALTER TABLE raw_plannings DROP COLUMN raw_content_text')
+
+        click.echo(f"Migration terminée: {compressed} plannings compressés")
+    except Exception as e:
+        click.echo(f"Erreur lors de la compression des plannings bruts: {str(e)}")
+        return False
+
+    return True
+
+
+@click.command('prune_raw_plannings')
+@click.option('--keep-days', default=30, show_default=True, help="Âge minimal (en jours) des contenus purgés")
+@click.option('--dry-run', is_flag=True, help="Affiche le nombre de plannings concernés sans rien purger")
+@with_appcontext
+def prune_raw_plannings(keep_days, dry_run):
+    """
+    Purge le HTML des anciens plannings bruts dont les données analysées sont conservées
+
+    Seul le contenu est supprimé: la ligne reste pour le ParsedPlanning qui la
+    référence et pour la déduplication par content_hash. Le dernier planning
+    récupéré et les plannings non analysés ne sont jamais purgés.
+    """
+    from app.models.planning import RawPlanning, ParsedPlanning
+
+    cutoff = datetime.utcnow() - timedelta(days=keep_days)
+
+    try:
+        latest = RawPlanning.query.order_by(RawPlanning.created_at.desc()).first()
+        query = RawPlanning.query.filter(
+            RawPlanning.created_at < cutoff,
+            RawPlanning.raw_content.isnot(None),
+            RawPlanning.id.in_(db.session.query(ParsedPlanning.raw_planning_id))
+        )
+        if latest:
+            query = query.filter(RawPlanning.id != latest.id)
+
+        if dry_run:
+            click.echo(f"{query.count()} plannings bruts seraient purgés (antérieurs au {cutoff:%d/%m/%Y})")
+            return True
+
+        pruned = query.update({RawPlanning.raw_content: None}, synchronize_session=False)
+        db.session.commit()
+        click.echo(f"{pruned} plannings bruts purgés (antérieurs au {cutoff:%d/%m/%Y})")
+    except Exception as e:
+        db.session.rollback()
+        click.echo(f"Erreur lors de la purge des plannings bruts: {str(e)}")
+        return False
+
+    return True
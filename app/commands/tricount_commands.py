@@ -215,4 +215,153 @@ def migrate_merchant_names():
         db.session.rollback()
         click.echo(f"Erreur lors de l'enregistrement des modifications: {str(e)}")
     
-    return True
\ No newline at end of file
+    return True
+
+def _expense_index_checks():
+    """
+    Requêtes représentatives des listes et index attendus dans leur plan d'exécution
+    
+    Returns:
+        list: Tuples (description, requête, index attendus)
+    """
+    from sqlalchemy import or_
+    from app.models.tricount import Expense, DeclarationStatus
+    from app.models.tricount.expense import TRIGRAM_SEARCH_COLUMNS
+    from app.utils.sql_query_utils import build_reimbursement_query
+    
+    return [
+        (
+            "Remboursements (flag + statut + dates)",
+            build_reimbursement_query(
+                flag_id=1,
+                status_values=[DeclarationStatus.NOT_DECLARED.value],
+                start_date='2024-01-01',
+                end_date='2024-12-31',
+                show_all=True
+            ).limit(20),
+            {'ix_expenses_flag_status_date'}
+        ),
+        (
+            "Catégorisation (dépenses incomplètes par date de modification)",
+            Expense.query.filter(
+                or_(Expense.category_id == None, Expense.flag_id == None)
+            ).order_by(Expense.updated_at.desc(), Expense.id.desc()).limit(9),
+            {'ix_expenses_incomplete_updated'}
+        ),
+        (
+            "Liste des dépenses (catégorie + tri par date)",
+            Expense.query.filter(Expense.category_id == 1)
+            .order_by(Expense.date.desc(), Expense.id.desc()).limit(50),
+            {'ix_expenses_category_date'}
+        ),
+        (
+            "Recherche plein texte",
+            build_reimbursement_query(search_query='carrefour', show_all=True),
+            {'ix_expenses_search_vector'}
+        ),
+        (
+            "Filtres ILIKE des règles (trigrammes)",
+            Expense.query.filter(or_(*(
+                getattr(Expense, column).ilike('%carrefour%') for column in TRIGRAM_SEARCH_COLUMNS
+            ))),
+            {f'ix_expenses_{column}_trgm' for column in TRIGRAM_SEARCH_COLUMNS}
+        )
+    ]
+
+
+@click.command('ensure_expense_indexes')
+@click.option('--check', is_flag=True, help="Vérifie via EXPLAIN que les requêtes des listes utilisent les index")
+@with_appcontext
+def ensure_expense_indexes(check):
+    """Crée les index de la table des dépenses manquants et vérifie leur utilisation"""
+    from app.models.tricount import Expense
+    from app.utils.sql_query_utils import explain_query, plan_index_names
+    
+    bind = db.session.get_bind()
+    
+    try:
+        with bind.begin() as connection:
+            if connection.dialect.name == 'postgresql':
+                connection.exec_driver_sql('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            
+            # Index déclarés sur le modèle mais absents de la base
+            inspector = db.inspect(connection)
+            existing = {index['name'] for index in inspector.get_indexes(Expense.__tablename__)}
+            columns = {column['name'] for column in inspector.get_columns(Expense.__tablename__)}
+            created = 0
+            for index in sorted(Expense.__table__.indexes, key=lambda i: i.name):
+                if index.name in existing:
+                    continue
+                if any(column.name not in columns for column in index.columns):
+                    click.echo(f"Index ignoré (colonne absente, voir init_expense_search): {index.name}")
+                    continue
+                # Les conditions ddl_if (index trigrammes PostgreSQL) sont respectées par create()
+                index.create(connection, checkfirst=True)
+                if db.inspect(connection).has_index(Expense.__tablename__, index.name):
+                    click.echo(f"Index créé: {index.name}")
+                    created += 1
+        
+        click.echo(f"{created} index créé(s)")
+    except Exception as e:
+        click.echo(f"Erreur lors de la création des index: {str(e)}")
+        return False
+    
+    if not check:
+        return True
+    
+    if bind.dialect.name != 'postgresql':
+        click.echo("Vérification EXPLAIN disponible uniquement sous PostgreSQL")
+        return True
+    
+    failures = 0
+    # Sur une petite table le planificateur préfère un parcours séquentiel:
+    # on le désactive pour vérifier que les index sont utilisables
+    db.session.execute(db.text('SET LOCAL enable_seqscan = off'))
+    
+    for label, query, expected in _expense_index_checks():
+        used = plan_index_names(explain_query(query))
+        missing = expected - used
+        if missing:
+            failures += 1
+            click.echo(f"ÉCHEC {label}: index non utilisés {sorted(missing)} (plan: {sorted(used)})")
+        else:
+            click.echo(f"OK {label}: {sorted(used & expected)}")
+    
+    db.session.rollback()
+    
+    if failures:
+        raise click.ClickException(f"{failures} requête(s) n'utilisent pas les index attendus")
+    
+    return True
+
+
+@click.command('init_expense_search')
+@with_appcontext
+def init_expense_search():
+    """Installe la recherche plein texte des dépenses (colonne, trigger, index) et recalcule les vecteurs"""
+    from app.models.tricount import Expense, install_expense_search
+    
+    bind = db.session.get_bind()
+    if bind.dialect.name != 'postgresql':
+        click.echo("Recherche plein texte disponible uniquement sous PostgreSQL (repli ILIKE actif)")
+        return True
+    
+    try:
+        with bind.begin() as connection:
+            connection.exec_driver_sql(
+                'ALTER TABLE expenses ADD COLUMN IF NOT EXISTS search_vector tsvector'
+            )
+            install_expense_search(connection)
+            
+            index = next(i for i in Expense.__table__.indexes if i.name == 'ix_expenses_search_vector')
+            index.create(connection, checkfirst=True)
+            
+            # Une mise à jour des colonnes indexées déclenche le recalcul du vecteur
+            result = connection.exec_driver_sql('UPDATE expenses SET merchant = merchant')
+        
+        click.echo(f"Recherche plein texte installée: {result.rowcount} dépenses indexées")
+    except Exception as e:
+        click.echo(f"Erreur lors de l'installation de la recherche: {str(e)}")
+        return False
+    
+    return True
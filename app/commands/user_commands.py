@@ -2,7 +2,7 @@
 import click
 from flask.cli import with_appcontext
 from app.extensions import db
-from app.models.user import User, Group, Permission
+from app.models.user import User, Group, Permission, PermissionVersion
 from sqlalchemy.exc import IntegrityError
 
 @click.command('init_users')
@@ -158,7 +158,31 @@ def users_init():
     """Alias simplifié pour initialiser les utilisateurs"""
     return init_users()
 
+@click.command('init_permission_version')
+@with_appcontext
+def init_permission_version():
+    """Crée la table permission_version (compteur partagé du cache des permissions) et sa ligne unique"""
+    from app.utils.permission_cache import VERSION_ROW_ID
+    
+    table = PermissionVersion.__table__
+    try:
+        with db.session.get_bind().begin() as connection:
+            table.create(connection, checkfirst=True)
+            exists = connection.execute(
+                db.select(table.c.id).where(table.c.id == VERSION_ROW_ID)
+            ).first()
+            if not exists:
+                connection.execute(table.insert().values(id=VERSION_ROW_ID, version=0))
+        
+        click.echo("Table permission_version prête")
+    except Exception as e:
+        click.echo(f"Erreur lors de la création de la table permission_version: {str(e)}")
+        return False
+    
+    return True
+
 def register_commands(app):
     """Enregistre toutes les commandes personnalisées pour les utilisateurs"""
     app.cli.add_command(init_users)
-    app.cli.add_command(users_init)
\ No newline at end of file
+    app.cli.add_command(users_init)
+    app.cli.add_command(init_permission_version)
\ No newline at end of file
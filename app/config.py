@@ -18,6 +18,40 @@ class Config:
     # Nouvelles configurations de sécurité
     SESSION_COOKIE_NAME = 'qb_tools_session'
     SESSION_REFRESH_EACH_REQUEST = True
+    
+    # Contrôle du nombre de requêtes SQL des vues de liste (voir app/utils/query_counter.py)
+    SQL_QUERY_BUDGET_CHECK = False
+    
+    # Backend de parsing des plannings Netplanning: 'lxml' (rapide) ou 'html.parser'
+    TEAMPLANNING_HTML_PARSER = os.getenv('TEAMPLANNING_HTML_PARSER', 'lxml')
+    
+    # Nombre d'entrées du cache mémoire des extractions (voir extraction_cache.py)
+    TEAMPLANNING_EXTRACTION_CACHE_SIZE = 64
+    
+    # Client HTTP Netplanning (voir netplanning_client.py): session partagée et retentatives
+    NETPLANNING_URL = os.getenv('NETPLANNING_URL', 'https://www.netplanning.fr/')
+    NETPLANNING_TIMEOUT = 10
+    NETPLANNING_RETRIES = 3
+    NETPLANNING_POOL_SIZE = 4
+    
+    # Nombre de threads exécutant les traitements en arrière-plan (voir job_runner.py)
+    JOB_WORKERS = 2
+    
+    # Journal d'erreurs à écriture différée (voir app/utils/error_sink.py)
+    ERROR_SINK_ASYNC = True
+    ERROR_SINK_QUEUE_SIZE = 1000
+    ERROR_SINK_BATCH_SIZE = 100
+    
+    # Délai entre deux vérifications des règles modifiées par un autre processus (secondes, voir rule_engine.py)
+    RULE_ENGINE_CHECK_INTERVAL = 5
+    
+    # Délai entre deux vérifications des groupes/permissions modifiés par un autre processus (secondes)
+    PERMISSION_CACHE_CHECK_INTERVAL = 30
+    
+    # Cache des utilisateurs connectés (voir app/utils/identity_cache.py)
+    IDENTITY_CACHE_TTL = 30
+    IDENTITY_CACHE_SIZE = 256
+    IDENTITY_CACHE_REDIS_URL = os.environ.get('IDENTITY_CACHE_REDIS_URL')
 
 class ProdConfig(Config):
     DEBUG = False
@@ -27,9 +61,19 @@ class DevConfig(Config):
     DEBUG = True
     SESSION_COOKIE_SECURE = False  # Autoriser HTTP en développement
     TEMPLATES_AUTO_RELOAD = True
+    SQL_QUERY_BUDGET_CHECK = True  # Journalise les vues qui dépassent leur budget
+
+class TestConfig(Config):
+    TESTING = True
+    # SQLite en mémoire par défaut (voir tests/conftest.py)
+    SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URL', 'sqlite://')
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    SQL_QUERY_BUDGET_CHECK = True  # Un dépassement de budget fait échouer le test
+    ERROR_SINK_ASYNC = False
 
 config = {
     'development': DevConfig,
     'production': ProdConfig,
+    'testing': TestConfig,
     'default': DevConfig
 }
@@ -5,7 +5,7 @@ Importe tous les modèles pour qu'ils soient accessibles depuis app.models
 """
 
 # Importer les modèles utilisateur
-from app.models.user import User, Group, Permission
+from app.models.user import User, Group, Permission, PermissionVersion
 
 # Importer les modèles tricount
 from app.models.tricount import (
@@ -16,11 +16,14 @@ from app.models.tricount import (
 
 # Importer les modèles de planning
 try:
-    from app.models.planning import RawPlanning, ParsedPlanning, PlanningEntry
+    from app.models.planning import RawPlanning, ParsedPlanning, PlanningEntry, PlanningExtractionCache, PlanningUserBlock
 except ImportError:
     # Si l'importation échoue, afficher un avertissement mais continuer
     import sys
     print("AVERTISSEMENT: Impossible d'importer les modèles de planning. Ces tables pourraient être supprimées lors des migrations.", file=sys.stderr)
 
 # Import ErrorFollowing
-from app.models.error_following import ErrorFollowing
\ No newline at end of file
+from app.models.error_following import ErrorFollowing, ErrorOccurrence, ErrorStatsDaily
+
+# Traitements en arrière-plan
+from app.models.job import Job
@@ -3,16 +3,84 @@ from app.extensions import db
 from datetime import datetime
 from flask import request, session
 from flask_login import current_user
+import hashlib
 import json
+import re
+
+# Nombre de frames (les plus internes) du traceback prises en compte dans l'empreinte
+FINGERPRINT_FRAMES = 5
+
+# Nombre d'occurrences récentes conservées par erreur (table error_occurrences)
+MAX_SAMPLES_PER_ERROR = 10
+
+_FRAME_PATTERN = re.compile(r'^\s*File "([^"]+)", line \d+, in (\S+)', re.MULTILINE)
+_EXCEPTION_PATTERN = re.compile(r'^([A-Za-z_][\w.]*)(?::|$)')
+_NUMBER_PATTERN = re.compile(r'\d+')
+
+
+def _original_stack_trace(stack_trace):
+    """Traceback d'origine d'un stack_trace éventuellement fusionné en JSON par create_from_exception"""
+    if not stack_trace:
+        return ''
+    if isinstance(stack_trace, (list, tuple)):
+        return ''.join(stack_trace)
+    if stack_trace.startswith('{'):
+        try:
+            return json.loads(stack_trace).get('original_stack_trace') or ''
+        except (ValueError, AttributeError):
+            return ''
+    return stack_trace
+
+
+def compute_fingerprint(error_type, source, stack_trace=None):
+    """
+    Empreinte d'une erreur: deux occurrences de la même erreur ont la même empreinte
+    
+    L'empreinte combine le type d'erreur, la source (nombres remplacés par '#', pour
+    que /expense/12 et /expense/13 soient regroupées), la classe de l'exception et
+    les dernières frames du traceback (fichier et fonction, sans numéro de ligne).
+    Le message n'en fait pas partie: il contient souvent des valeurs variables.
+    
+    Args:
+        error_type (str): Type d'erreur ('exception', '404', etc.)
+        source (str): Source de l'erreur (route, fonction, etc.)
+        stack_trace (str): Traceback, texte ou JSON produit par create_from_exception (optionnel)
+    
+    Returns:
+        str: SHA-256 hexadécimal
+    """
+    trace = _original_stack_trace(stack_trace)
+    frames = _FRAME_PATTERN.findall(trace)[-FINGERPRINT_FRAMES:]
+    
+    # Dernière ligne d'un traceback d'exception: "ClasseException: message"
+    exception_class = ''
+    if 'Traceback (most recent call last)' in trace:
+        match = _EXCEPTION_PATTERN.match(trace.strip().splitlines()[-1])
+        if match:
+            exception_class = match.group(1)
+    
+    parts = [
+        error_type or '',
+        _NUMBER_PATTERN.sub('#', source or ''),
+        exception_class,
+    ]
+    parts.extend(f"{filename.replace(chr(92), '/').rsplit('/app/', 1)[-1]}:{function}" for filename, function in frames)
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
 
 class ErrorFollowing(db.Model):
     """
     Modèle pour suivre les erreurs dans l'application
     Permet d'enregistrer les erreurs plutôt que de les afficher dans les logs
+    
+    Une ligne regroupe toutes les occurrences d'une même erreur (même empreinte,
+    voir compute_fingerprint): les champs contextuels sont ceux de la dernière
+    occurrence, les occurrences récentes sont conservées dans ErrorOccurrence.
     """
     __tablename__ = 'error_following'
     
     id = db.Column(db.Integer, primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=True)            # Empreinte (compute_fingerprint)
     error_type = db.Column(db.String(50), nullable=False)            # 'redirection', 'exception', '404', '500', etc.
     source = db.Column(db.String(255), nullable=False)               # Source de l'erreur (route, template, etc.)
     message = db.Column(db.Text, nullable=False)                     # Message d'erreur
@@ -33,8 +101,27 @@ class ErrorFollowing(db.Model):
     resolved = db.Column(db.Boolean, default=False)                  # Indique si l'erreur a été résolue
     resolved_at = db.Column(db.DateTime, nullable=True)              # Quand l'erreur a été résolue
     
+    # Regroupement des occurrences
+    occurrence_count = db.Column(db.Integer, default=1, nullable=False)  # Nombre d'occurrences
+    first_seen = db.Column(db.DateTime, default=datetime.utcnow)     # Première occurrence
+    last_seen = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # Dernière occurrence
+    
+    occurrences = db.relationship('ErrorOccurrence', backref='error', lazy='dynamic',
+                                  cascade='all, delete-orphan', order_by='ErrorOccurrence.created_at.desc()')
+    
+    # Colonnes recopiées dans chaque occurrence
+    OCCURRENCE_COLUMNS = (
+        'message', 'stack_trace', 'user_id', 'user_email', 'url', 'referrer',
+        'request_method', 'request_data', 'user_agent', 'ip_address'
+    )
+    
+    __table_args__ = (
+        # Cible des INSERT ... ON CONFLICT (fingerprint) du journal d'erreurs
+        db.Index('ix_error_following_fingerprint', 'fingerprint', unique=True),
+    )
+    
     def __repr__(self):
-        return f'<ErrorFollowing {self.id}: {self.error_type} from {self.source}>'
+        return f'<ErrorFollowing {self.id}: {self.error_type} from {self.source} (x{self.occurrence_count})>'
     
     @classmethod
     def create_from_exception(cls, error_type, source, message, stack_trace=None, additional_info=None):
@@ -51,12 +138,13 @@ class ErrorFollowing(db.Model):
         Returns:
             ErrorFollowing: L'instance créée (non sauvegardée)
         """
-        # Créer l'instance de base
+        # Créer l'instance de base (l'empreinte porte sur le traceback d'origine)
         error = cls(
             error_type=error_type,
             source=source,
             message=message,
-            stack_trace=stack_trace
+            stack_trace=stack_trace,
+            fingerprint=compute_fingerprint(error_type, source, stack_trace)
         )
         
         # Ajouter les informations contextuelles de la requête si disponible
@@ -120,4 +208,94 @@ class ErrorFollowing(db.Model):
                 # En cas d'erreur, conserver le stack_trace original
                 pass
         
-        return error
\ No newline at end of file
+        return error
+
+
+class ErrorOccurrence(db.Model):
+    """
+    Occurrence récente d'une erreur regroupée (au plus MAX_SAMPLES_PER_ERROR par erreur)
+    """
+    __tablename__ = 'error_occurrences'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    error_id = db.Column(db.Integer, db.ForeignKey('error_following.id', ondelete='CASCADE'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    message = db.Column(db.Text, nullable=False)
+    stack_trace = db.Column(db.Text, nullable=True)
+    user_id = db.Column(db.Integer, nullable=True)
+    user_email = db.Column(db.String(100), nullable=True)
+    url = db.Column(db.String(2000), nullable=True)
+    referrer = db.Column(db.String(2000), nullable=True)
+    request_method = db.Column(db.String(10), nullable=True)
+    request_data = db.Column(db.Text, nullable=True)
+    user_agent = db.Column(db.String(500), nullable=True)
+    ip_address = db.Column(db.String(50), nullable=True)
+    
+    __table_args__ = (
+        db.Index('ix_error_occurrences_error_created', 'error_id', 'created_at'),
+    )
+    
+    def __repr__(self):
+        return f'<ErrorOccurrence {self.id} of error {self.error_id}>'
+
+
+class ErrorStatsDaily(db.Model):
+    """
+    Compteurs journaliers des occurrences d'erreurs par type et par source
+    
+    Tenus à jour à chaque écriture du journal d'erreurs (voir app/utils/error_sink.py):
+    la page de statistiques ne lit que cette table, dont la taille dépend du nombre
+    de jours et de sources, pas du nombre d'occurrences.
+    """
+    __tablename__ = 'error_stats_daily'
+    
+    day = db.Column(db.Date, primary_key=True)
+    error_type = db.Column(db.String(50), primary_key=True)
+    source = db.Column(db.String(255), primary_key=True)
+    occurrence_count = db.Column(db.Integer, default=0, nullable=False)
+    
+    @staticmethod
+    def count_rows(rows):
+        """
+        Compte des occurrences par (jour, type, source)
+        
+        Args:
+            rows (iterable): Occurrences avec les clés 'created_at', 'error_type' et 'source'
+        
+        Returns:
+            dict: {(jour, type, source): nombre d'occurrences}
+        """
+        counts = {}
+        for row in rows:
+            key = (row['created_at'].date(), row['error_type'], (row['source'] or '')[:255])
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+    
+    @classmethod
+    def increment(cls, connection, counts):
+        """
+        Ajoute des occurrences aux compteurs (INSERT ... ON CONFLICT DO UPDATE)
+        
+        Args:
+            connection: Connexion dans une transaction ouverte
+            counts (dict): {(jour, type, source): nombre d'occurrences}
+        """
+        if not counts:
+            return
+        from app.utils.sql_query_utils import insert_ignoring_conflicts
+        
+        table = cls.__table__
+        upsert = insert_ignoring_conflicts(table, bind=connection)
+        connection.execute(
+            upsert.on_conflict_do_update(
+                index_elements=[table.c.day, table.c.error_type, table.c.source],
+                set_={'occurrence_count': table.c.occurrence_count + upsert.excluded.occurrence_count}
+            ),
+            [
+                {'day': day, 'error_type': error_type, 'source': source, 'occurrence_count': count}
+                for (day, error_type, source), count in counts.items()
+            ]
+        )
+    
+    def __repr__(self):
+        return f'<ErrorStatsDaily {self.day} {self.error_type} {self.source}: {self.occurrence_count}>'
@@ -0,0 +1,58 @@
+# app/models/job.py
+from app.extensions import db
+from datetime import datetime
+import json
+
+class Job(db.Model):
+    """
+    Modèle pour suivre les traitements longs exécutés en arrière-plan
+    Voir app/services/job_runner.py
+    """
+    __tablename__ = 'jobs'
+    
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    FINISHED_STATUSES = (SUCCEEDED, FAILED)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)                  # Nom du traitement (ex: 'tricount.apply_rule')
+    status = db.Column(db.String(20), nullable=False, default=PENDING, index=True)
+    progress = db.Column(db.Integer, nullable=False, default=0)       # Avancement en pourcentage (0 à 100)
+    message = db.Column(db.String(255), nullable=True)                # Étape en cours ou résumé final
+    result = db.Column(db.Text, nullable=True)                        # Résultat sérialisé en JSON
+    error = db.Column(db.Text, nullable=True)                         # Message d'erreur en cas d'échec
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # Utilisateur à l'origine du traitement
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    @property
+    def is_finished(self):
+        """Indique si le traitement est terminé (succès ou échec)"""
+        return self.status in self.FINISHED_STATUSES
+    
+    def get_result(self):
+        """Retourne le résultat au format Python (None si absent)"""
+        return json.loads(self.result) if self.result else None
+    
+    def to_dict(self):
+        """Représentation JSON du traitement pour les routes de suivi"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'status': self.status,
+            'progress': self.progress,
+            'message': self.message,
+            'result': self.get_result(),
+            'error': self.error,
+            'finished': self.is_finished,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+    
+    def __repr__(self):
+        return f'<Job {self.id} {self.name} ({self.status})>'
@@ -1,7 +1,49 @@
 # app/models/planning.py
 from app.extensions import db
 from datetime import datetime
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import deferred
+from weakref import WeakKeyDictionary
 import json
+import zlib
+
+# Niveau de compression zlib du HTML brut (6: bon compromis taille/temps pour quelques Mo)
+RAW_CONTENT_COMPRESSION_LEVEL = 6
+
+# Dialectes (un par moteur) dont la colonne raw_plannings.raw_content est encore en
+# texte, c'est-à-dire avant compress_raw_plannings (voir _detect_raw_content_storage)
+_TEXT_STORAGE = WeakKeyDictionary()
+
+class _PassthroughBinary(db.LargeBinary):
+    """LargeBinary dont les valeurs passent sans conversion (bytes ou texte selon la colonne réelle)"""
+    
+    def bind_processor(self, dialect):
+        return None
+    
+    def result_processor(self, dialect, coltype):
+        return None
+
+class CompressedText(db.TypeDecorator):
+    """
+    Texte stocké compressé (zlib) dans une colonne binaire
+    
+    La compression est transparente: le modèle lit et écrit des chaînes. Tant
+    que la colonne d'une base existante est encore en texte (avant la commande
+    compress_raw_plannings), les valeurs sont lues telles quelles et écrites en
+    clair, pour que l'application fonctionne pendant la migration.
+    """
+    impl = _PassthroughBinary
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None or _TEXT_STORAGE.get(dialect):
+            return value
+        return zlib.compress(value.encode('utf-8'), RAW_CONTENT_COMPRESSION_LEVEL)
+    
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return zlib.decompress(bytes(value)).decode('utf-8')
 
 class RawPlanning(db.Model):
     """Modèle pour stocker le contenu brut du planning récupéré de Netplanning"""
@@ -9,13 +51,29 @@ class RawPlanning(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     content_hash = db.Column(db.String(64), unique=True, nullable=False, index=True)
-    raw_content = db.Column(db.Text, nullable=False)
+    # HTML compressé, chargé à la demande; None une fois purgé (voir prune_raw_plannings)
+    raw_content = deferred(db.Column(CompressedText, nullable=True))
     parsed = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def __repr__(self):
         return f'<RawPlanning {self.id} created at {self.created_at}>'
 
+@event.listens_for(RawPlanning, 'before_insert')
+@event.listens_for(RawPlanning, 'before_update')
+def _detect_raw_content_storage(mapper, connection, target):
+    """
+    Relit le type réel de raw_plannings.raw_content avant d'écrire le HTML
+    
+    Les écritures sont rares (une par récupération Netplanning): la colonne est
+    inspectée à chaque fois, ce qui suit une migration faite par un autre processus.
+    """
+    if not inspect(target).attrs.raw_content.history.has_changes():
+        return
+    columns = {column['name']: column['type'] for column in db.inspect(connection).get_columns('raw_plannings')}
+    column_type = columns.get('raw_content')
+    _TEXT_STORAGE[connection.dialect] = column_type is not None and not isinstance(column_type, db.LargeBinary)
+
 class ParsedPlanning(db.Model):
     """Modèle pour stocker les données de planning analysées"""
     __tablename__ = 'parsed_plannings'
@@ -54,4 +112,42 @@ class PlanningEntry(db.Model):
     parsed_planning = db.relationship('ParsedPlanning', backref=db.backref('entries', lazy='dynamic'))
     
     def __repr__(self):
-        return f'<PlanningEntry {self.person_name} on {self.date}>'
\ No newline at end of file
+        return f'<PlanningEntry {self.person_name} on {self.date}>'
+
+class PlanningExtractionCache(db.Model):
+    """Résultat d'extraction mis en cache pour un contenu de planning brut"""
+    __tablename__ = 'planning_extraction_cache'
+    __table_args__ = (
+        db.UniqueConstraint('content_hash', 'extractor', 'params_key', name='uq_planning_extraction_cache_key'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), nullable=False, index=True)  # RawPlanning.content_hash
+    extractor = db.Column(db.String(50), nullable=False)                # Nom de l'extraction (users, dates...)
+    params_key = db.Column(db.String(64), nullable=False)               # SHA-256 des paramètres normalisés
+    result = db.Column(db.Text, nullable=False)                         # Résultat sérialisé en JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<PlanningExtractionCache {self.extractor} for {self.content_hash[:12]}>'
+
+class PlanningUserBlock(db.Model):
+    """Empreinte du bloc (tbody) d'un utilisateur dans un planning brut, pour la détection des changements"""
+    __tablename__ = 'planning_user_blocks'
+    __table_args__ = (
+        db.UniqueConstraint('raw_planning_id', 'user_key', name='uq_planning_user_blocks_user'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    raw_planning_id = db.Column(db.Integer, db.ForeignKey('raw_plannings.id'), nullable=False, index=True)
+    user_key = db.Column(db.String(100), nullable=False)   # ID Netplanning, ou nom à défaut
+    user_name = db.Column(db.String(100), nullable=False)
+    block_hash = db.Column(db.String(64), nullable=False)  # SHA-256 du bloc complet (période incluse)
+    day_hashes = db.Column(db.Text, nullable=False)        # JSON {jour: empreinte des cellules du jour}
+    
+    def get_day_hashes(self):
+        """Retourne les empreintes par jour au format Python"""
+        return json.loads(self.day_hashes)
+    
+    def __repr__(self):
+        return f'<PlanningUserBlock {self.user_name} in {self.raw_planning_id}>'
@@ -10,10 +10,12 @@ from app.models.tricount.flag import Flag
 from app.models.tricount.category import Category, category_flags
 from app.models.tricount.expense import Expense
 from app.models.tricount.rule import AutoCategorizationRule, PendingRuleApplication, rule_expense_links
+from app.models.tricount.search import install_expense_search
 
 # Réexporter tous les modèles pour maintenir la compatibilité avec le code existant
 __all__ = [
     'ReimbursementType', 'ModificationSource', 'DeclarationStatus',
     'Flag', 'Category', 'Expense', 'AutoCategorizationRule', 
-    'PendingRuleApplication', 'category_flags', 'rule_expense_links'
+    'PendingRuleApplication', 'category_flags', 'rule_expense_links',
+    'install_expense_search'
 ]
\ No newline at end of file
@@ -6,9 +6,15 @@ from app.extensions import db
 from datetime import datetime
 import hashlib
 from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy import case
+from sqlalchemy import DDL, case, event, or_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from app.models.tricount.common import ModificationSource, DeclarationStatus
 
+# Colonnes filtrées par ILIKE '%terme%' (toutes les branches d'un OR doivent être
+# indexées pour que PostgreSQL combine les index en BitmapOr)
+TRIGRAM_SEARCH_COLUMNS = ('merchant', 'renamed_merchant', 'description', 'notes', 'declaration_reference')
+
 class Expense(db.Model):
     """Modèle pour stocker les dépenses importées"""
     __tablename__ = 'expenses'
@@ -55,6 +61,37 @@ class Expense(db.Model):
     # Identifiant unique pour éviter les doublons
     unique_identifier = db.Column(db.String(255), unique=True, index=True)
     
+    # Vecteur de recherche plein texte, maintenu par trigger sous PostgreSQL (voir search.py).
+    # Différé: jamais chargé avec les dépenses
+    search_vector = deferred(db.Column(TSVECTOR().with_variant(db.Text(), 'sqlite')))
+    
+    # Index alignés sur les requêtes des listes (remboursements, catégorisation, dépenses)
+    __table_args__ = (
+        # build_reimbursement_query: flag + statut de déclaration, puis plage/tri de dates
+        db.Index('ix_expenses_flag_status_date', 'flag_id', 'declaration_status', 'date', 'id'),
+        # Liste des dépenses: filtre par catégorie puis tri par date
+        db.Index('ix_expenses_category_date', 'category_id', 'date', 'id'),
+        # Tri par date sans filtre (pagination par clé sur (date, id))
+        db.Index('ix_expenses_date_id', 'date', 'id'),
+        # categorize_expenses: dépenses incomplètes triées par dernière modification
+        db.Index(
+            'ix_expenses_incomplete_updated', 'updated_at', 'id',
+            postgresql_where=or_(category_id == None, flag_id == None),
+            sqlite_where=or_(category_id == None, flag_id == None)
+        ),
+        # Recherche plein texte (PostgreSQL uniquement)
+        db.Index('ix_expenses_search_vector', 'search_vector', postgresql_using='gin').ddl_if(dialect='postgresql'),
+        # Filtres ILIKE '%terme%' (règles, dépenses similaires): index trigrammes (PostgreSQL uniquement)
+        *(
+            db.Index(
+                f'ix_expenses_{column}_trgm', column,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'}
+            ).ddl_if(dialect='postgresql')
+            for column in TRIGRAM_SEARCH_COLUMNS
+        ),
+    )
+    
     def __repr__(self):
         return f'<Expense {self.date} {self.description} {self.amount}>'
     
@@ -100,4 +137,12 @@ class Expense(db.Model):
         au lieu d'une liste, conformément aux recommandations SQLAlchemy.
         """
         # Utilise les arguments positionnels au lieu d'une liste
-        return case((cls.is_debit == True, -cls.amount), else_=cls.amount)
\ No newline at end of file
+        return case((cls.is_debit == True, -cls.amount), else_=cls.amount)
+
+
+# L'extension pg_trgm doit exister avant la création des index trigrammes
+event.listen(
+    Expense.__table__,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
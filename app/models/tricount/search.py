@@ -0,0 +1,84 @@
+# app/models/tricount/search.py
+"""
+Infrastructure de recherche plein texte des dépenses (PostgreSQL).
+
+La colonne `expenses.search_vector` (tsvector) est maintenue par trigger à partir
+des colonnes textuelles, avec une configuration française sans accents
+(`fr_unaccent`). unaccent() n'étant pas IMMUTABLE, une colonne générée n'est pas
+possible: le trigger la remplace.
+"""
+from sqlalchemy import event
+from app.models.tricount.expense import Expense
+
+# Configuration de recherche: dictionnaire français précédé de unaccent
+EXPENSE_SEARCH_CONFIG = 'fr_unaccent'
+
+# Colonnes indexées et poids associés (A = plus pertinent)
+EXPENSE_SEARCH_WEIGHTS = (
+    ('renamed_merchant', 'A'),
+    ('merchant', 'A'),
+    ('description', 'B'),
+    ('notes', 'C'),
+    ('declaration_reference', 'D'),
+)
+
+_SEARCH_VECTOR_SQL = ' ||\n        '.join(
+    f"setweight(to_tsvector('{EXPENSE_SEARCH_CONFIG}', coalesce(NEW.{column}, '')), '{weight}')"
+    for column, weight in EXPENSE_SEARCH_WEIGHTS
+)
+
+_SEARCH_COLUMNS_SQL = ', '.join(column for column, _ in EXPENSE_SEARCH_WEIGHTS)
+
+EXPENSE_SEARCH_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{EXPENSE_SEARCH_CONFIG}') THEN
+            CREATE TEXT SEARCH CONFIGURATION {EXPENSE_SEARCH_CONFIG} (COPY = french);
+            ALTER TEXT SEARCH CONFIGURATION {EXPENSE_SEARCH_CONFIG}
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem;
+        END IF;
+    END
+    $$
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION expenses_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+        {_SEARCH_VECTOR_SQL};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS expenses_search_vector_trigger ON expenses",
+    f"""
+    CREATE TRIGGER expenses_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF {_SEARCH_COLUMNS_SQL} ON expenses
+    FOR EACH ROW EXECUTE FUNCTION expenses_search_vector_update()
+    """,
+)
+
+
+def install_expense_search(connection):
+    """
+    Installe la configuration de recherche et le trigger de mise à jour (PostgreSQL)
+
+    Args:
+        connection: Connexion SQLAlchemy (dans une transaction)
+
+    Returns:
+        bool: True si l'installation a été effectuée, False pour les autres moteurs
+    """
+    if connection.dialect.name != 'postgresql':
+        return False
+
+    for statement in EXPENSE_SEARCH_DDL:
+        connection.exec_driver_sql(statement)
+    return True
+
+
+@event.listens_for(Expense.__table__, 'after_create')
+def _install_expense_search(target, connection, **kw):
+    """Installe le trigger de recherche à la création de la table des dépenses"""
+    install_expense_search(connection)
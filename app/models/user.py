@@ -3,6 +3,10 @@ from app.extensions import db
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 from datetime import datetime
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from app.utils.permission_cache import PermissionCache
+from app.utils.identity_cache import IdentityCache
 
 # Table d'association pour les utilisateurs et les groupes
 user_groups = db.Table('user_groups',
@@ -45,17 +49,18 @@ class User(db.Model, UserMixin):
         """Vérifie si le mot de passe correspond au hash"""
         return check_password_hash(self.password_hash, password)
     
+    @property
+    def permission_set(self):
+        """Permissions de l'utilisateur: frozenset de couples (outil, permission), mis en cache"""
+        return PermissionCache.get(self.id).permissions
+    
     def has_permission(self, tool_name, permission_name):
         """Vérifie si l'utilisateur a une permission spécifique pour un outil"""
-        for group in self.groups:
-            for permission in group.permissions:
-                if permission.tool == tool_name and permission.name == permission_name:
-                    return True
-        return False
+        return (tool_name, permission_name) in PermissionCache.get(self.id).permissions
     
     def is_admin(self):
         """Vérifie si l'utilisateur est administrateur"""
-        return any(group.name == 'admin' for group in self.groups)
+        return 'admin' in PermissionCache.get(self.id).groups
 
 class Group(db.Model):
     """Modèle pour stocker les groupes d'utilisateurs"""
@@ -88,4 +93,67 @@ class Permission(db.Model):
     )
     
     def __repr__(self):
-        return f'<Permission {self.name} for {self.tool}>'
\ No newline at end of file
+        return f'<Permission {self.name} for {self.tool}>'
+
+class PermissionVersion(db.Model):
+    """
+    Compteur de version des groupes et permissions (une seule ligne)
+    
+    Incrémenté dans la transaction de chaque modification des groupes, des
+    permissions ou des appartenances: les autres processus le comparent pour
+    invalider leurs caches (voir PermissionCache).
+    """
+    __tablename__ = 'permission_version'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<PermissionVersion {self.version}>'
+
+# Attributs de User qui changent les droits de l'utilisateur
+USER_ACCESS_ATTRIBUTES = ('groups', 'is_active')
+
+
+# Invalidation des caches de permissions et d'utilisateurs (appliquée à la validation de la transaction)
+@event.listens_for(User, 'after_update')
+def _invalidate_user_permissions(mapper, connection, target):
+    """Les groupes d'un utilisateur ont pu changer"""
+    session = object_session(target)
+    PermissionCache.schedule_invalidation(session, target.id)
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in USER_ACCESS_ATTRIBUTES):
+        PermissionCache.bump_stored_version(connection, session)
+
+
+@event.listens_for(User, 'after_delete')
+def _invalidate_deleted_user(mapper, connection, target):
+    session = object_session(target)
+    PermissionCache.schedule_invalidation(session, target.id)
+    PermissionCache.bump_stored_version(connection, session)
+
+
+@event.listens_for(Group, 'after_insert')
+@event.listens_for(Group, 'after_update')
+@event.listens_for(Group, 'after_delete')
+@event.listens_for(Permission, 'after_insert')
+@event.listens_for(Permission, 'after_update')
+@event.listens_for(Permission, 'after_delete')
+def _invalidate_all_permissions(mapper, connection, target):
+    """Un groupe ou une permission concerne potentiellement tous les utilisateurs"""
+    session = object_session(target)
+    PermissionCache.schedule_invalidation(session)
+    PermissionCache.bump_stored_version(connection, session)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_permission_invalidations(session):
+    invalidated = PermissionCache.apply_pending(session)
+    if invalidated:
+        # Les instantanés du user_loader portent aussi les groupes et permissions
+        IdentityCache.invalidate(invalidated)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_permission_invalidations(session):
+    PermissionCache.discard_pending(session)
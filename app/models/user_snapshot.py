@@ -0,0 +1,87 @@
+# app/models/user_snapshot.py
+from collections import namedtuple
+from datetime import datetime
+from flask_login import UserMixin
+
+PermissionSnapshot = namedtuple('PermissionSnapshot', ['tool', 'name'])
+GroupSnapshot = namedtuple('GroupSnapshot', ['name', 'permissions'])
+
+# Attributs de User copiés dans l'instantané (les dates sont sérialisées en ISO)
+SNAPSHOT_FIELDS = ('id', 'username', 'email', 'first_name', 'last_name', 'is_active')
+SNAPSHOT_DATES = ('created_at', 'last_login')
+
+
+class UserSnapshot(UserMixin):
+    """
+    Copie en lecture seule d'un utilisateur connecté, détachée de la session
+
+    Chargée par le user_loader (voir app/utils/identity_cache.py) à la place
+    du modèle User: expose les mêmes attributs, groupes et permissions que les
+    templates et les routes lisent sur current_user, sans requête. Pour modifier
+    l'utilisateur, recharger le modèle avec db.session.get(User, current_user.id).
+    """
+
+    def __init__(self, data):
+        for name in SNAPSHOT_FIELDS:
+            if name != 'is_active':
+                object.__setattr__(self, name, data.get(name))
+        for name in SNAPSHOT_DATES:
+            value = data.get(name)
+            object.__setattr__(self, name, datetime.fromisoformat(value) if value else None)
+        groups = tuple(
+            GroupSnapshot(group['name'], tuple(PermissionSnapshot(tool, name) for tool, name in group['permissions']))
+            for group in data.get('groups', [])
+        )
+        object.__setattr__(self, 'groups', groups)
+        object.__setattr__(self, '_data', data)
+        object.__setattr__(self, '_group_names', frozenset(group.name for group in groups))
+        object.__setattr__(self, 'permission_set', frozenset(
+            (permission.tool, permission.name) for group in groups for permission in group.permissions
+        ))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"UserSnapshot est en lecture seule (attribut '{name}')")
+
+    def __repr__(self):
+        return f'<UserSnapshot {self.username}>'
+
+    @staticmethod
+    def data_from_user(user):
+        """
+        Données sérialisables (JSON) d'un instantané
+
+        Args:
+            user (User): Utilisateur chargé depuis la base
+
+        Returns:
+            dict: Attributs, dates ISO et groupes {'name', 'permissions': [[outil, nom], ...]}
+        """
+        data = {name: getattr(user, name) for name in SNAPSHOT_FIELDS}
+        for name in SNAPSHOT_DATES:
+            value = getattr(user, name)
+            data[name] = value.isoformat() if value else None
+        data['groups'] = [
+            {
+                'name': group.name,
+                'permissions': [[permission.tool, permission.name] for permission in group.permissions]
+            }
+            for group in user.groups
+        ]
+        return data
+
+    @property
+    def is_active(self):
+        """Même valeur que la colonne User.is_active (utilisée par is_authenticated)"""
+        return self._data.get('is_active')
+
+    def to_data(self):
+        """Données sérialisables de l'instantané (voir data_from_user)"""
+        return self._data
+
+    def has_permission(self, tool_name, permission_name):
+        """Vérifie si l'utilisateur a une permission spécifique pour un outil"""
+        return (tool_name, permission_name) in self.permission_set
+
+    def is_admin(self):
+        """Vérifie si l'utilisateur est administrateur"""
+        return 'admin' in self._group_names
@@ -1,11 +1,13 @@
 # app/routes/admin/errors_routes.py
 from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from app.extensions import db
-from app.models.error_following import ErrorFollowing
+from app.models.error_following import ErrorFollowing, ErrorOccurrence, ErrorStatsDaily, MAX_SAMPLES_PER_ERROR
 from app.utils.auth_helpers import admin_required
+from app.utils.error_sink import ErrorSink
 from flask_login import login_required
-from datetime import datetime
+from datetime import datetime, timedelta
 from sqlalchemy import desc
+from sqlalchemy.orm import defer
 
 # Créer le blueprint pour l'administration des erreurs
 errors_admin_bp = Blueprint('errors_admin', __name__, url_prefix='/admin/errors')
@@ -14,7 +16,7 @@ errors_admin_bp = Blueprint('errors_admin', __name__, url_prefix='/admin/errors'
 @login_required
 @admin_required
 def errors_list():
-    """Liste des erreurs enregistrées"""
+    """Liste des erreurs enregistrées (une ligne par erreur regroupée)"""
     # Filtres
     error_type = request.args.get('type')
     resolved = request.args.get('resolved')
@@ -22,8 +24,8 @@ def errors_list():
     end_date = request.args.get('end_date')
     search = request.args.get('search')
     
-    # Création de la requête de base
-    query = ErrorFollowing.query
+    # Création de la requête de base (les colonnes volumineuses ne sont pas affichées)
+    query = ErrorFollowing.query.options(defer(ErrorFollowing.stack_trace), defer(ErrorFollowing.request_data))
     
     # Appliquer les filtres
     if error_type:
@@ -36,14 +38,14 @@ def errors_list():
     if start_date:
         try:
             start_date_obj = datetime.strptime(start_date, '%Y-%m-%d')
-            query = query.filter(ErrorFollowing.created_at >= start_date_obj)
+            query = query.filter(ErrorFollowing.last_seen >= start_date_obj)
         except ValueError:
             pass
     
     if end_date:
         try:
             end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
-            query = query.filter(ErrorFollowing.created_at <= end_date_obj)
+            query = query.filter(ErrorFollowing.first_seen <= end_date_obj)
         except ValueError:
             pass
     
@@ -54,8 +56,8 @@ def errors_list():
             (ErrorFollowing.message.ilike(search_term))
         )
     
-    # Tri par date de création (plus récentes en premier)
-    query = query.order_by(desc(ErrorFollowing.created_at))
+    # Tri par dernière occurrence (plus récentes en premier)
+    query = query.order_by(desc(ErrorFollowing.last_seen))
     
     # Paginer les résultats
     page = request.args.get('page', 1, type=int)
@@ -79,9 +81,10 @@ def errors_list():
 @login_required
 @admin_required
 def error_details(error_id):
-    """Affiche les détails d'une erreur"""
+    """Affiche les détails d'une erreur et ses occurrences récentes"""
     error = ErrorFollowing.query.get_or_404(error_id)
-    return render_template('admin/error_details.html', error=error)
+    occurrences = error.occurrences.limit(MAX_SAMPLES_PER_ERROR).all()
+    return render_template('admin/error_details.html', error=error, occurrences=occurrences)
 
 @errors_admin_bp.route('/<int:error_id>/resolve', methods=['POST'])
 @login_required
@@ -132,40 +135,49 @@ def delete_error(error_id):
 @login_required
 @admin_required
 def error_stats():
-    """Affiche des statistiques sur les erreurs"""
-    # Nombre total d'erreurs
-    total_errors = ErrorFollowing.query.count()
+    """Affiche des statistiques sur les erreurs (compteurs journaliers de error_stats_daily)"""
+    occurrences = db.func.coalesce(db.func.sum(ErrorStatsDaily.occurrence_count), 0)
     
-    # Nombre d'erreurs non résolues
-    unresolved_errors = ErrorFollowing.query.filter_by(resolved=False).count()
+    # Nombre total d'occurrences
+    total_errors = db.session.query(occurrences).scalar()
     
-    # Nombre d'erreurs par type
-    error_type_counts = db.session.query(
-        ErrorFollowing.error_type,
+    # Nombre d'erreurs distinctes résolues et non résolues (une ligne par empreinte)
+    resolved_counts = dict(db.session.query(
+        ErrorFollowing.resolved,
         db.func.count(ErrorFollowing.id)
-    ).group_by(ErrorFollowing.error_type).all()
+    ).group_by(ErrorFollowing.resolved).all())
+    unresolved_errors = resolved_counts.get(False, 0)
+    resolved_errors = resolved_counts.get(True, 0)
     
-    # Nombre d'erreurs par jour (30 derniers jours)
-    errors_by_day = db.session.query(
-        db.func.date(ErrorFollowing.created_at),
-        db.func.count(ErrorFollowing.id)
-    ).group_by(db.func.date(ErrorFollowing.created_at)).order_by(db.func.date(ErrorFollowing.created_at).desc()).limit(30).all()
+    # Nombre d'occurrences par type
+    error_type_counts = db.session.query(
+        ErrorStatsDaily.error_type,
+        occurrences
+    ).group_by(ErrorStatsDaily.error_type).all()
     
-    # Inverser pour un ordre chronologique
-    errors_by_day.reverse()
+    # Nombre d'occurrences par jour (30 derniers jours)
+    since = datetime.utcnow().date() - timedelta(days=29)
+    errors_by_day = db.session.query(
+        ErrorStatsDaily.day,
+        occurrences
+    ).filter(ErrorStatsDaily.day >= since).group_by(ErrorStatsDaily.day).order_by(ErrorStatsDaily.day).all()
+    recent_errors = sum(count for _, count in errors_by_day)
     
-    # Sources les plus fréquentes (top 10)
+    # Sources les plus fréquentes sur 30 jours (top 10)
     top_sources = db.session.query(
-        ErrorFollowing.source,
-        db.func.count(ErrorFollowing.id)
-    ).group_by(ErrorFollowing.source).order_by(db.func.count(ErrorFollowing.id).desc()).limit(10).all()
+        ErrorStatsDaily.source,
+        occurrences
+    ).filter(ErrorStatsDaily.day >= since).group_by(ErrorStatsDaily.source).order_by(occurrences.desc()).limit(10).all()
     
     return render_template('admin/error_stats.html',
                           total_errors=total_errors,
                           unresolved_errors=unresolved_errors,
+                          resolved_errors=resolved_errors,
                           error_type_counts=error_type_counts,
                           errors_by_day=errors_by_day,
-                          top_sources=top_sources)
+                          recent_errors=recent_errors,
+                          top_sources=top_sources,
+                          sink_stats=ErrorSink.stats())
 
 @errors_admin_bp.route('/bulk-resolve', methods=['POST'])
 @login_required
@@ -205,7 +217,8 @@ def bulk_resolve():
             flash(f'{len(error_ids)} erreurs marquées comme non résolues.', 'success')
         
         elif action == 'delete':
-            # Supprimer les erreurs
+            # Supprimer les erreurs et leurs occurrences
+            ErrorOccurrence.query.filter(ErrorOccurrence.error_id.in_(error_ids)).delete(synchronize_session=False)
             ErrorFollowing.query.filter(ErrorFollowing.id.in_(error_ids)).delete(synchronize_session=False)
             flash(f'{len(error_ids)} erreurs supprimées.', 'success')
         
@@ -1,6 +1,8 @@
 # app/routes/main.py
-from flask import Blueprint, render_template, redirect, url_for
-from flask_login import current_user
+from flask import Blueprint, render_template, redirect, url_for, jsonify
+from flask_login import current_user, login_required
+from app.extensions import db
+from app.models.job import Job
 
 main_bp = Blueprint('main', __name__)
 
@@ -11,4 +13,15 @@ def home():
     if not current_user.is_authenticated:
         return redirect(url_for('auth.login'))
     
-    return render_template('home.html')
\ No newline at end of file
+    return render_template('home.html')
+
+@main_bp.route('/jobs/<int:job_id>')
+@login_required
+def job_status(job_id):
+    """État d'un traitement en arrière-plan (interrogé par js/common/job_progress.js)"""
+    job = db.session.get(Job, job_id)
+    
+    if not job or (job.user_id and job.user_id != current_user.id and not current_user.is_admin()):
+        return jsonify({'success': False, 'error': 'Traitement introuvable'}), 404
+    
+    return jsonify({'success': True, 'job': job.to_dict()})
@@ -29,4 +29,5 @@ def check_teamplanning_access():
     return None
 
 # Import routes after blueprint creation to avoid circular imports
-from app.routes.teamplanning.index_routes import *
\ No newline at end of file
+from app.routes.teamplanning.index_routes import *
+from app.routes.teamplanning.extraction_routes import *
\ No newline at end of file
@@ -1,23 +1,54 @@
-# app/routes/teamplanning.py
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
-from app.extensions import db
+# app/routes/teamplanning/extraction_routes.py
+from flask import render_template, redirect, url_for, flash, request, jsonify
+from flask_login import login_required, current_user
 import requests
+from app.routes.teamplanning import teamplanning_bp
 from app.services.planning_parser import PlanningParser
-from app.services.teamplanning import NetplanningExtractor
+from app.services.job_runner import JobRunner
+from app.services.teamplanning import (
+    NetplanningExtractor, NetplanningClient, PlanningDocument, ExtractionCache, PlanningDelta, TIME_SLOT_NAMES
+)
 from app.models.planning import RawPlanning, ParsedPlanning, PlanningEntry
 from datetime import datetime, timedelta
 
-teamplanning_bp = Blueprint('teamplanning', __name__, url_prefix='/teamplanning')
+NO_PLANNING_ERROR = 'Aucun planning n\'a été récupéré. Veuillez d\'abord récupérer des données Netplanning.'
 
-@teamplanning_bp.route('/')
-def index():
-    """Page principale du module Teamplanning"""
-    # Récupérer le dernier planning analysé s'il existe
-    latest_planning = ParsedPlanning.query.order_by(ParsedPlanning.created_at.desc()).first()
+
+def get_latest_planning_document():
+    """
+    Retourne le document analysé du dernier planning brut récupéré
+    
+    Le document est partagé entre les routes d'extraction: le HTML du même
+    planning n'est analysé qu'une fois pour les utilisateurs, les dates et les événements.
+    
+    Returns:
+        tuple: (RawPlanning, PlanningDocument), ou (None, None) si aucun planning
+    """
+    latest_raw_planning = RawPlanning.query.order_by(RawPlanning.created_at.desc()).first()
+    if not latest_raw_planning:
+        return None, None
+    return latest_raw_planning, PlanningDocument.for_raw_planning(latest_raw_planning)
+
+
+def cached_extraction(raw_planning, extractor, params, compute):
+    """
+    Résultat d'une extraction, mis en cache par contenu de planning et paramètres
     
-    return render_template('teamplanning/index.html', latest_planning=latest_planning)
+    Le document n'est analysé que si le résultat est absent des deux niveaux du cache.
+    
+    Args:
+        raw_planning (RawPlanning): Planning brut extrait
+        extractor (str): Nom de l'extraction
+        params (dict): Paramètres de l'extraction
+        compute (callable): Calcul du résultat en cas d'absence
+        
+    Returns:
+        Résultat de l'extraction (à ne pas modifier)
+    """
+    return ExtractionCache.get_or_compute(raw_planning.content_hash, extractor, params, compute)
 
 @teamplanning_bp.route('/fetch-netplanning', methods=['POST'])
+@login_required
 def fetch_netplanning():
     """Récupère le contenu de Netplanning avec le cookie fourni"""
     data = request.get_json()
@@ -27,30 +58,21 @@ def fetch_netplanning():
     
     cookie = data['cookie']
     
-    # Définir le cookie pour la requête sans le stocker côté serveur
-    cookies = {
-        'PHPSESSID': cookie  # Le nom peut varier, mais PHPSESSID est courant pour PHP
-    }
-    
-    # Définir les headers pour simuler un navigateur
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'fr,fr-FR;q=0.8,en-US;q=0.5,en;q=0.3',
-        'Referer': 'https://www.netplanning.fr/',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-        'Cache-Control': 'max-age=0',
-    }
-    
     try:
-        # Faire la requête à Netplanning
-        response = requests.get('https://www.netplanning.fr/', cookies=cookies, headers=headers, timeout=10)
+        # Le cookie n'est pas stocké côté serveur: il n'accompagne que cette requête
+        fetched = NetplanningClient.fetch(cookie)
+        
+        # Page inchangée (304): reprendre le contenu déjà enregistré, s'il est encore disponible
+        if fetched['not_modified']:
+            raw_planning = RawPlanning.query.filter_by(content_hash=fetched['content_hash']).first()
+            if raw_planning and raw_planning.raw_content is not None:
+                fetched['content'] = raw_planning.raw_content
+            else:
+                fetched = NetplanningClient.fetch(cookie, conditional=False)
         
         # Vérifier si la requête a réussi
-        if response.status_code == 200:
-            content = response.text
+        if fetched['content'] is not None:
+            content = fetched['content']
             
             # Vérifier si c'est la page de login
             if 'connexion' in content.lower() and 'mot de passe' in content.lower():
@@ -61,25 +83,24 @@ def fetch_netplanning():
                 })
             
             # Stocker le contenu dans la base de données s'il a changé
-            raw_planning, is_new = PlanningParser.save_raw_content(content)
+            raw_planning, is_new = PlanningParser.save_raw_content(content, fetched['content_hash'])
             
             result = {
                 'success': True,
                 'content': content,  # Toujours renvoyer le contenu brut pour l'affichage
                 'is_new': is_new,
+                'not_modified': fetched['not_modified'],
                 'raw_planning_id': raw_planning.id
             }
             
-            # Si c'est un nouveau contenu, l'analyser
+            # Si c'est un nouveau contenu, l'analyser en arrière-plan (détection des changements incluse)
             if is_new:
-                try:
-                    parsed_planning = PlanningParser.parse_planning(raw_planning.id)
-                    result['parsed'] = True
-                    result['parsed_planning_id'] = parsed_planning.id
-                except Exception as e:
-                    # En cas d'erreur d'analyse, on continue quand même
-                    result['parsed'] = False
-                    result['parse_error'] = str(e)
+                job = JobRunner.submit(
+                    'teamplanning.parse_planning', PlanningParser.parse_job, raw_planning.id,
+                    user_id=current_user.id
+                )
+                result['parsed'] = False
+                result['parse_job_id'] = job.id
             else:
                 # Si le contenu existe déjà, récupérer le planning analysé associé
                 result['parsed'] = raw_planning.parsed
@@ -90,27 +111,29 @@ def fetch_netplanning():
         else:
             return jsonify({
                 'success': False, 
-                'error': f'Erreur lors de la récupération des données (code {response.status_code})'
+                'error': f'Erreur lors de la récupération des données (code {fetched["status_code"]})'
             }), 500
             
     except requests.exceptions.RequestException as e:
         return jsonify({'success': False, 'error': f'Erreur de connexion: {str(e)}'}), 500
 
 @teamplanning_bp.route('/extract-users', methods=['POST'])
+@login_required
 def extract_users():
     """Extrait les noms des utilisateurs à partir du dernier planning brut"""
-    # Récupérer le dernier planning brut
-    latest_raw_planning = RawPlanning.query.order_by(RawPlanning.created_at.desc()).first()
+    latest_raw_planning, document = get_latest_planning_document()
     
     if not latest_raw_planning:
         return jsonify({
             'success': False,
-            'error': 'Aucun planning n\'a été récupéré. Veuillez d\'abord récupérer des données Netplanning.'
+            'error': NO_PLANNING_ERROR
         }), 404
     
     try:
-        # Utiliser notre service d'extraction HTML
-        users = NetplanningExtractor.extract_users(latest_raw_planning.raw_content)
+        users = cached_extraction(
+            latest_raw_planning, 'users', {},
+            lambda: NetplanningExtractor.extract_users(document)
+        )
         
         return jsonify({
             'success': True,
@@ -125,6 +148,7 @@ def extract_users():
         }), 500
 
 @teamplanning_bp.route('/view-planning/<int:parsed_planning_id>')
+@login_required
 def view_planning(parsed_planning_id):
     """Affiche le planning analysé"""
     parsed_planning = ParsedPlanning.query.get_or_404(parsed_planning_id)
@@ -143,20 +167,22 @@ def view_planning(parsed_planning_id):
     )
 
 @teamplanning_bp.route('/extract-dates', methods=['POST'])
+@login_required
 def extract_dates():
     """Extrait les informations de dates (mois, année, jours) du planning"""
-    # Récupérer le dernier planning brut
-    latest_raw_planning = RawPlanning.query.order_by(RawPlanning.created_at.desc()).first()
+    latest_raw_planning, document = get_latest_planning_document()
     
     if not latest_raw_planning:
         return jsonify({
             'success': False,
-            'error': 'Aucun planning n\'a été récupéré. Veuillez d\'abord récupérer des données Netplanning.'
+            'error': NO_PLANNING_ERROR
         }), 404
     
     try:
-        # Utiliser notre service d'extraction HTML
-        dates_info = NetplanningExtractor.extract_planning_dates(latest_raw_planning.raw_content)
+        dates_info = cached_extraction(
+            latest_raw_planning, 'dates', {},
+            lambda: NetplanningExtractor.extract_planning_dates(document)
+        )
         
         if dates_info.get('error'):
             return jsonify({
@@ -212,16 +238,101 @@ def extract_dates():
             'error': f'Erreur lors de l\'extraction des dates: {str(e)}'
         }), 500
 
+def build_events_payload(document, selected_users, selected_days):
+    """
+    Événements des utilisateurs et jours sélectionnés, et journal à afficher
+    
+    Args:
+        document (PlanningDocument): Document du planning
+        selected_users (list): Noms des utilisateurs (vide = premier utilisateur)
+        selected_days (list): Jours à extraire (vide = tous)
+        
+    Returns:
+        dict: `events` (utilisateurs et statistiques) et `events_log` (liste triée)
+    """
+    all_users = NetplanningExtractor.extract_users(document)
+    
+    events_data = {'users': {}, 'summary': {}}
+    
+    # Si aucun utilisateur sélectionné, prendre le premier par défaut
+    if not selected_users and all_users:
+        selected_users = [all_users[0]]
+    
+    # Pour chaque utilisateur sélectionné
+    for user_name in selected_users:
+        # Trouver son index dans la liste complète
+        user_index = all_users.index(user_name) if user_name in all_users else -1
+        
+        if user_index >= 0:
+            # Extraire les événements pour cet utilisateur et les jours sélectionnés
+            user_events = NetplanningExtractor.extract_specific_days(
+                document,
+                days_to_extract=selected_days if selected_days else None,
+                user_index=user_index
+            )
+            
+            # Fusionner les données
+            if user_name in user_events['users']:
+                events_data['users'][user_name] = user_events['users'][user_name]
+    
+    # Calculer les statistiques globales
+    total_events = 0
+    events_by_type = {}
+    
+    for user, user_data in events_data['users'].items():
+        for day_data in user_data.get('days', {}).values():
+            for time_slot, event in day_data.items():
+                if not event.get('is_empty', True):
+                    total_events += 1
+                    event_type = event.get('type', 'unknown')
+                    events_by_type[event_type] = events_by_type.get(event_type, 0) + 1
+    
+    events_data['summary'] = {
+        'users_count': len(events_data['users']),
+        'total_events': total_events,
+        'events_by_type': events_by_type
+    }
+    
+    # Préparer les événements pour l'affichage en excluant weekends et jours fériés
+    events_log = []
+    for user, user_data in events_data['users'].items():
+        for day_str, day_data in user_data.get('days', {}).items():
+            # Inclure tous les créneaux horaires
+            for time_slot, event in day_data.items():
+                # Ignorer les événements vides, weekends et jours fériés
+                if (not event.get('is_empty', True) and 
+                    not event.get('is_weekend', False) and 
+                    not event.get('is_holiday', False)):
+                    events_log.append({
+                        'user': user,
+                        'day': day_str,
+                        'time_slot': time_slot,
+                        'content': event.get('content', ''),
+                        'type': event.get('type', 'unknown'),
+                        'comment': event.get('comment', ''),
+                        'last_modified': event.get('last_modified', ''),
+                        'author': event.get('author', '')
+                    })
+    
+    # Trier les événements
+    events_log.sort(key=lambda e: (
+        e['user'],
+        int(e['day']) if e['day'].isdigit() else 0,
+        {'morning': 0, 'day': 1, 'evening': 2}.get(e['time_slot'], 3)
+    ))
+    
+    return {'events': events_data, 'events_log': events_log}
+
 @teamplanning_bp.route('/extract-events', methods=['POST'])
+@login_required
 def extract_events():
     """Extrait les événements du planning pour les utilisateurs et jours spécifiés"""
-    # Récupérer le dernier planning brut
-    latest_raw_planning = RawPlanning.query.order_by(RawPlanning.created_at.desc()).first()
+    latest_raw_planning, document = get_latest_planning_document()
     
     if not latest_raw_planning:
         return jsonify({
             'success': False,
-            'error': 'Aucun planning n\'a été récupéré. Veuillez d\'abord récupérer des données Netplanning.'
+            'error': NO_PLANNING_ERROR
         }), 404
     
     try:
@@ -230,87 +341,16 @@ def extract_events():
         selected_users = data.get('users', [])
         selected_days = data.get('days', [])
         
-        # Utiliser la méthode adaptée pour l'extraction ciblée
-        # Au lieu d'appeler directement UserExtractor, utilisons NetplanningExtractor
-        metadata = NetplanningExtractor.extract_metadata(latest_raw_planning.raw_content)
-        all_users = metadata['users']
-        
-        events_data = {'users': {}, 'summary': {}}
-        
-        # Si aucun utilisateur sélectionné, prendre le premier par défaut
-        if not selected_users and all_users:
-            selected_users = [all_users[0]]
-        
-        # Pour chaque utilisateur sélectionné
-        for user_name in selected_users:
-            # Trouver son index dans la liste complète
-            user_index = all_users.index(user_name) if user_name in all_users else -1
-            
-            if user_index >= 0:
-                # Extraire les événements pour cet utilisateur et les jours sélectionnés
-                user_events = NetplanningExtractor.extract_specific_days(
-                    latest_raw_planning.raw_content,
-                    days_to_extract=selected_days if selected_days else None,
-                    user_index=user_index
-                )
-                
-                # Fusionner les données
-                if user_name in user_events['users']:
-                    events_data['users'][user_name] = user_events['users'][user_name]
-        
-        # Calculer les statistiques globales
-        # Au lieu d'appeler directement EventExtractor, utilisons une autre approche
-        # Comme EventExtractor n'est pas non plus importé, nous allons simplifier le calcul des statistiques
-        total_events = 0
-        events_by_type = {}
-        
-        for user, user_data in events_data['users'].items():
-            for day_data in user_data.get('days', {}).values():
-                for time_slot, event in day_data.items():
-                    if not event.get('is_empty', True):
-                        total_events += 1
-                        event_type = event.get('type', 'unknown')
-                        events_by_type[event_type] = events_by_type.get(event_type, 0) + 1
-        
-        events_data['summary'] = {
-            'users_count': len(events_data['users']),
-            'total_events': total_events,
-            'events_by_type': events_by_type
-        }
-        
-        # Préparer les événements pour l'affichage en excluant weekends et jours fériés
-        events_log = []
-        for user, user_data in events_data['users'].items():
-            for day_str, day_data in user_data.get('days', {}).items():
-                # Inclure tous les créneaux horaires
-                for time_slot, event in day_data.items():
-                    # Ignorer les événements vides, weekends et jours fériés
-                    if (not event.get('is_empty', True) and 
-                        not event.get('is_weekend', False) and 
-                        not event.get('is_holiday', False)):
-                        events_log.append({
-                            'user': user,
-                            'day': day_str,
-                            'time_slot': time_slot,
-                            'content': event.get('content', ''),
-                            'type': event.get('type', 'unknown'),
-                            'comment': event.get('comment', ''),
-                            'last_modified': event.get('last_modified', ''),
-                            'author': event.get('author', '')
-                        })
-        
-        # Trier les événements
-        events_log.sort(key=lambda e: (
-            e['user'],
-            int(e['day']) if e['day'].isdigit() else 0,
-            {'morning': 0, 'day': 1, 'evening': 2}.get(e['time_slot'], 3)
-        ))
+        payload = cached_extraction(
+            latest_raw_planning, 'events', {'users': selected_users, 'days': selected_days},
+            lambda: build_events_payload(document, selected_users, selected_days)
+        )
         
         return jsonify({
             'success': True,
-            'events': events_data,
-            'summary': events_data['summary'],
-            'events_log': events_log
+            'events': payload['events'],
+            'summary': payload['events']['summary'],
+            'events_log': payload['events_log']
         })
         
     except Exception as e:
@@ -321,21 +361,90 @@ def extract_events():
             'traceback': traceback.format_exc()
         }), 500
 
+@teamplanning_bp.route('/extract-team', methods=['POST'])
+@login_required
+def extract_team():
+    """Extrait les événements de toute l'équipe en une seule requête (grille d'équipe)"""
+    latest_raw_planning, document = get_latest_planning_document()
+    
+    if not latest_raw_planning:
+        return jsonify({
+            'success': False,
+            'error': NO_PLANNING_ERROR
+        }), 404
+    
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        days = data.get('days') or None
+        slots = data.get('slots') or list(TIME_SLOT_NAMES)
+        team = cached_extraction(
+            latest_raw_planning, 'team', {'days': days, 'slots': slots},
+            lambda: NetplanningExtractor.extract_team(document, days, slots)
+        )
+    except (ValueError, TypeError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Paramètres d\'extraction invalides: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Erreur lors de l\'extraction de l\'équipe: {str(e)}'
+        }), 500
+    
+    return jsonify({
+        'success': True,
+        'raw_planning_id': latest_raw_planning.id,
+        'team': team
+    })
+
+@teamplanning_bp.route('/planning-delta')
+@login_required
+def planning_delta():
+    """Utilisateurs et jours modifiés entre le dernier planning et le précédent"""
+    latest_raw_planning, document = get_latest_planning_document()
+    
+    if not latest_raw_planning:
+        return jsonify({
+            'success': False,
+            'error': NO_PLANNING_ERROR
+        }), 404
+    
+    try:
+        # Le document n'est analysé que si les empreintes du planning ne sont pas encore enregistrées
+        delta = PlanningDelta.detect(latest_raw_planning, document)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Erreur lors de la détection des changements: {str(e)}'
+        }), 500
+    
+    return jsonify({
+        'success': True,
+        'raw_planning_id': latest_raw_planning.id,
+        'delta': delta
+    })
+
 @teamplanning_bp.route('/event-results')
+@login_required
 def event_results():
     """Affiche les résultats de l'extraction d'événements"""
-    # Récupérer le dernier planning brut
-    latest_raw_planning = RawPlanning.query.order_by(RawPlanning.created_at.desc()).first()
+    latest_raw_planning, document = get_latest_planning_document()
     
     if not latest_raw_planning:
         flash("Aucun planning n'a encore été récupéré.", "warning")
         return redirect(url_for('teamplanning.index'))
     
     # Extraire tous les événements (tous les utilisateurs, toutes les lignes)
-    events_data = NetplanningExtractor.extract_planning_events(
-        latest_raw_planning.raw_content,
-        limit_to_first_user=False,
-        extract_first_line_only=False
+    events_data = cached_extraction(
+        latest_raw_planning, 'planning_events',
+        {'limit_to_first_user': False, 'extract_first_line_only': False},
+        lambda: NetplanningExtractor.extract_planning_events(
+            document,
+            limit_to_first_user=False,
+            extract_first_line_only=False
+        )
     )
     
     # Calculer quelques statistiques
@@ -368,6 +477,7 @@ def event_results():
     )
 
 @teamplanning_bp.route('/monthly-view')
+@login_required
 def monthly_view():
     """Affiche la vue mensuelle du planning"""
     # Récupérer le dernier planning analysé
@@ -426,9 +536,10 @@ def monthly_view():
     )
 
 @teamplanning_bp.route('/debug-day/<int:day>', methods=['GET'])
+@login_required
 def debug_day(day):
     """Route de débogage pour analyser un jour spécifique"""
-    latest_raw_planning = RawPlanning.query.order_by(RawPlanning.created_at.desc()).first()
+    latest_raw_planning, document = get_latest_planning_document()
     
     if not latest_raw_planning:
         return jsonify({
@@ -437,7 +548,7 @@ def debug_day(day):
         }), 404
     
     try:
-        debug_info = NetplanningExtractor.debug_day(latest_raw_planning.raw_content, day)
+        debug_info = NetplanningExtractor.debug_day(document, day)
         return jsonify({
             'success': True,
             'debug_info': debug_info
@@ -449,20 +560,23 @@ def debug_day(day):
         }), 500
 
 @teamplanning_bp.route('/extract-metadata', methods=['POST'])
+@login_required
 def extract_metadata():
     """Extrait les métadonnées du planning (utilisateurs et dates)"""
-    # Récupérer le dernier planning brut
-    latest_raw_planning = RawPlanning.query.order_by(RawPlanning.created_at.desc()).first()
+    latest_raw_planning, document = get_latest_planning_document()
     
     if not latest_raw_planning:
         return jsonify({
             'success': False,
-            'error': 'Aucun planning n\'a été récupéré. Veuillez d\'abord récupérer des données Netplanning.'
+            'error': NO_PLANNING_ERROR
         }), 404
     
     try:
         # Utiliser la nouvelle méthode pour extraire uniquement les métadonnées
-        metadata = NetplanningExtractor.extract_metadata(latest_raw_planning.raw_content)
+        metadata = cached_extraction(
+            latest_raw_planning, 'metadata', {},
+            lambda: NetplanningExtractor.extract_metadata(document)
+        )
         
         return jsonify({
             'success': True,
@@ -2,9 +2,13 @@
 from flask import render_template
 from app.routes.teamplanning import teamplanning_bp
 from flask_login import login_required
+from app.models.planning import ParsedPlanning
 
 @teamplanning_bp.route('/')
 @login_required
 def index():
     """Page principale du module Teamplanning"""
-    return render_template('teamplanning/index.html')
\ No newline at end of file
+    # Récupérer le dernier planning analysé s'il existe
+    latest_planning = ParsedPlanning.query.order_by(ParsedPlanning.created_at.desc()).first()
+    
+    return render_template('teamplanning/index.html', latest_planning=latest_planning)
\ No newline at end of file
@@ -4,6 +4,15 @@ from flask_login import login_required, current_user
 
 tricount_bp = Blueprint('tricount', __name__, url_prefix='/tricount')
 
+# Modules de routes réservés aux administrateurs / à l'édition (hors GET)
+ADMIN_ROUTE_MODULES = ['admin_routes', 'import_routes', 'export_routes', 'category_routes', 'flag_routes',
+                       'auto_rules_management', 'auto_rules_application']
+EDIT_ROUTE_MODULES = ['reimbursement_routes', 'pending_rules_routes', 'categorize_routes', 'expense_routes']
+
+# Endpoints correspondants, résolus une fois à l'enregistrement du blueprint
+ADMIN_ENDPOINTS = set()
+EDIT_ENDPOINTS = set()
+
 @tricount_bp.before_request
 def check_tricount_access():
     """Vérifie l'accès au module Tricount"""
@@ -21,20 +30,16 @@ def check_tricount_access():
         return redirect(url_for('main.home'))
     
     # Vérifier les routes d'administration
-    admin_routes = ['admin_routes', 'import_routes', 'export_routes', 'category_routes', 'flag_routes', 'auto_rules_routes']
-    for route in admin_routes:
-        if route in request.endpoint:
-            if not current_user.has_permission('tricount', 'admin'):
-                flash('Vous n\'avez pas les droits d\'administration du module Tricount.', 'danger')
-                return redirect(url_for('tricount.index'))
+    if request.endpoint in ADMIN_ENDPOINTS:
+        if not current_user.has_permission('tricount', 'admin'):
+            flash('Vous n\'avez pas les droits d\'administration du module Tricount.', 'danger')
+            return redirect(url_for('tricount.index'))
     
     # Vérifier les routes d'édition
-    edit_routes = ['reimbursement_routes', 'pending_rules_routes', 'categorize_routes', 'expense_routes']
-    for route in edit_routes:
-        if route in request.endpoint and request.method != 'GET':
-            if not current_user.has_permission('tricount', 'edit'):
-                flash('Vous n\'avez pas les droits d\'édition du module Tricount.', 'danger')
-                return redirect(url_for('tricount.index'))
+    if request.endpoint in EDIT_ENDPOINTS and request.method != 'GET':
+        if not current_user.has_permission('tricount', 'edit'):
+            flash('Vous n\'avez pas les droits d\'édition du module Tricount.', 'danger')
+            return redirect(url_for('tricount.index'))
     
     return None
 
@@ -53,4 +58,21 @@ from app.routes.tricount.reimbursement_routes import *
 from app.routes.tricount.expense_history_routes import *
 from app.routes.tricount.expense_details_routes import *
 from app.routes.tricount.expense_status_routes import *
-from app.routes.tricount.compatibility_routes import *
\ No newline at end of file
+from app.routes.tricount.compatibility_routes import *
+
+
+@tricount_bp.record_once
+def resolve_protected_endpoints(state):
+    """
+    Résout les endpoints protégés d'après le module qui définit leur vue
+
+    Enregistrée après l'import des routes: exécutée une fois leurs règles ajoutées.
+    """
+    for endpoint, view in state.app.view_functions.items():
+        if not endpoint.startswith('tricount.'):
+            continue
+        module = view.__module__.rsplit('.', 1)[-1]
+        if module in ADMIN_ROUTE_MODULES:
+            ADMIN_ENDPOINTS.add(endpoint)
+        elif module in EDIT_ROUTE_MODULES:
+            EDIT_ENDPOINTS.add(endpoint)
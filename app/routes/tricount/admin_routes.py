@@ -2,9 +2,12 @@
 # Créez ce nouveau fichier s'il n'existe pas déjà
 
 from flask import render_template, redirect, url_for, flash, request
+from flask_login import current_user
 from app.routes.tricount import tricount_bp
 from app.extensions import db
+from app.models.job import Job
 from app.models.tricount import Expense
+from app.services.job_runner import JobRunner
 from app.services.tricount.bank_statement_parser import SocieteGeneraleParser
 import traceback
 
@@ -59,67 +62,91 @@ def extract_original_merchant(expense):
     
     return original_merchant
 
-@tricount_bp.route('/admin/fix-renamed-merchants', methods=['GET'])
-def fix_renamed_merchants():
-    """Page d'administration pour corriger les noms de marchands"""
+def run_fix_renamed_merchants(progress):
+    """
+    Traitement en arrière-plan (JobRunner) de la correction des noms de marchands
     
-    # Vérifier si une action a été demandée
-    action = request.args.get('action', '')
+    Args:
+        progress (JobProgress): Publication de l'avancement
     
-    if action == 'execute':
-        # Compteurs pour statistiques
-        results = {
-            'total': 0,
-            'modified': 0,
-            'skipped': 0,
-            'errors': 0,
-            'error_details': []
-        }
-        
-        # Récupérer toutes les dépenses avec un original_text
-        expenses = Expense.query.filter(Expense.original_text.isnot(None)).all()
-        results['total'] = len(expenses)
-        
-        for expense in expenses:
-            try:
-                # Extraire le nom du marchand du texte original
-                original_merchant = extract_original_merchant(expense)
-                
-                # Si on a trouvé un marchand original différent du merchant actuel
-                if original_merchant and original_merchant != expense.merchant and not expense.renamed_merchant:
-                    # Le nom actuel devient le nom renommé
-                    expense.renamed_merchant = expense.merchant
-                    
-                    # Le nom original devient le merchant
-                    expense.merchant = original_merchant
-                    
-                    results['modified'] += 1
-                else:
-                    results['skipped'] += 1
-                    
-            except Exception as e:
-                results['errors'] += 1
-                results['error_details'].append({
-                    'expense_id': expense.id,
-                    'error': str(e),
-                    'traceback': traceback.format_exc()
-                })
+    Returns:
+        dict: Statistiques de la migration (total, modified, skipped, errors, error_details, message)
+    """
+    # Compteurs pour statistiques
+    results = {
+        'total': 0,
+        'modified': 0,
+        'skipped': 0,
+        'errors': 0,
+        'error_details': []
+    }
+    
+    # Récupérer toutes les dépenses avec un original_text
+    expenses = Expense.query.filter(Expense.original_text.isnot(None)).all()
+    results['total'] = len(expenses)
+    
+    for index, expense in enumerate(expenses):
+        if index % 200 == 0:
+            progress(90 * index // max(len(expenses), 1), f"Analyse des dépenses ({index}/{len(expenses)})")
         
-        # Sauvegarder les modifications
         try:
-            db.session.commit()
-            flash(f"Migration terminée: {results['modified']} marchands migrés, {results['skipped']} ignorés, {results['errors']} erreurs", 'success')
+            # Extraire le nom du marchand du texte original
+            original_merchant = extract_original_merchant(expense)
+            
+            # Si on a trouvé un marchand original différent du merchant actuel
+            if original_merchant and original_merchant != expense.merchant and not expense.renamed_merchant:
+                # Le nom actuel devient le nom renommé
+                expense.renamed_merchant = expense.merchant
+                
+                # Le nom original devient le merchant
+                expense.merchant = original_merchant
+                
+                results['modified'] += 1
+            else:
+                results['skipped'] += 1
+                
         except Exception as e:
-            db.session.rollback()
-            flash(f"Erreur lors de l'enregistrement des modifications: {str(e)}", 'danger')
+            results['errors'] += 1
             results['error_details'].append({
-                'expense_id': 'commit',
+                'expense_id': expense.id,
                 'error': str(e),
                 'traceback': traceback.format_exc()
             })
-        
+    
+    # Sauvegarder les modifications
+    progress(90, 'Enregistrement des modifications')
+    try:
+        db.session.commit()
+        results['message'] = f"Migration terminée: {results['modified']} marchands migrés, {results['skipped']} ignorés, {results['errors']} erreurs"
+    except Exception as e:
+        db.session.rollback()
+        results['message'] = f"Erreur lors de l'enregistrement des modifications: {str(e)}"
+        results['error_details'].append({
+            'expense_id': 'commit',
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    
+    return results
+
+@tricount_bp.route('/admin/fix-renamed-merchants', methods=['GET'])
+def fix_renamed_merchants():
+    """Page d'administration pour corriger les noms de marchands"""
+    
+    # Vérifier si une action a été demandée
+    action = request.args.get('action', '')
+    
+    if action == 'execute':
+        # La migration parcourt toutes les dépenses: elle s'exécute en arrière-plan
+        job = JobRunner.submit('tricount.fix_renamed_merchants', run_fix_renamed_merchants, user_id=current_user.id)
+        return redirect(url_for('tricount.fix_renamed_merchants', job_id=job.id))
+    
+    # Suivi d'une migration lancée: résultats une fois terminée, progression sinon
+    job_id = request.args.get('job_id', type=int)
+    job = db.session.get(Job, job_id) if job_id else None
+    if job and job.status == Job.SUCCEEDED:
         return render_template('tricount/admin/fix_renamed_merchants.html', 
-                              results=results, 
+                              results=job.get_result(), 
                               executed=True)
     
     # Afficher la page sans exécuter la migration
@@ -153,4 +180,5 @@ def fix_renamed_merchants():
     
     return render_template('tricount/admin/fix_renamed_merchants.html', 
                           preview_data=preview_data, 
-                          executed=False)
\ No newline at end of file
+                          executed=False,
+                          job=job)
\ No newline at end of file
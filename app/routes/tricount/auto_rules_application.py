@@ -4,6 +4,7 @@ Routes pour l'application des règles d'auto-catégorisation
 Ce fichier gère l'application des règles aux dépenses
 """
 from flask import render_template, redirect, url_for, flash, request, jsonify
+from flask_login import current_user
 from app.routes.tricount import tricount_bp
 from app.extensions import db
 from app.models.tricount import (
@@ -11,6 +12,8 @@ from app.models.tricount import (
     ModificationSource
 )
 from app.services.tricount.auto_categorization import AutoCategorizationService
+from app.services.tricount.bulk_rule_application import BulkRuleApplicationService
+from app.services.job_runner import JobRunner
 from app.utils.rename_helpers import apply_rule_rename
 from app.utils.error_utils import handle_request_error
 from datetime import datetime
@@ -38,61 +41,16 @@ def auto_categorize(expense_id):
 
 @tricount_bp.route('/auto-rules/apply/<int:rule_id>', methods=['POST'])
 def apply_auto_rule(rule_id):
-    """Appliquer manuellement une règle d'auto-catégorisation"""
+    """Appliquer manuellement une règle d'auto-catégorisation (traitement en arrière-plan)"""
     try:
         rule = AutoCategorizationRule.query.get_or_404(rule_id)
         
-        # Récupérer les dépenses sans catégorie
-        uncategorized = Expense.query.filter_by(category_id=None).all()
-        
-        # Compter les dépenses affectées
-        count = 0
-        pending_count = 0
-        
-        for expense in uncategorized:
-            if rule.matches_expense(expense):
-                # Vérifier si cette règle nécessite une confirmation
-                if rule.requires_confirmation:
-                    # Vérifier si cette application n'existe pas déjà
-                    existing = PendingRuleApplication.query.filter_by(
-                        rule_id=rule.id, 
-                        expense_id=expense.id
-                    ).first()
-                    
-                    if not existing:
-                        pending_application = PendingRuleApplication(
-                            rule_id=rule.id,
-                            expense_id=expense.id
-                        )
-                        db.session.add(pending_application)
-                        pending_count += 1
-                else:
-                    # N'appliquer que les actions activées dans la règle
-                    if rule.apply_category and rule.category_id:
-                        expense.category_id = rule.category_id
-                        expense.category_modified_by = ModificationSource.AUTO_RULE.value
-                    
-                    if rule.apply_flag and rule.flag_id:
-                        expense.flag_id = rule.flag_id
-                        expense.flag_modified_by = ModificationSource.AUTO_RULE.value
-                        
-                    if rule.apply_rename and rule.rename_pattern:
-                        # Utiliser la fonction helper pour le renommage
-                        apply_rule_rename(expense, rule)
-                    
-                    # Enregistrer la relation entre la règle et la dépense
-                    rule.affected_expenses.append(expense)
-                    count += 1
-        
-        db.session.commit()
-        
-        if rule.requires_confirmation and pending_count > 0:
-            flash(f'{pending_count} dépenses ajoutées à la liste d\'attente pour confirmation.', 'info')
-            flash(f'<a href="{url_for("tricount.pending_rules_list")}">Voir les dépenses en attente de confirmation</a>', 'info')
-        elif rule.requires_confirmation and pending_count == 0:
-            flash('Aucune dépense ne correspond aux critères de cette règle.', 'info')
-        else:
-            flash(f'Règle appliquée avec succès à {count} dépenses.', 'success')
+        job = JobRunner.submit(
+            'tricount.apply_rule', BulkRuleApplicationService.apply_rule_job, rule.id,
+            user_id=current_user.id
+        )
+        flash(f'Application de la règle "{rule.name}" lancée en arrière-plan.', 'info')
+        return redirect(url_for('tricount.auto_rules_list', job_id=job.id))
     except Exception as e:
         db.session.rollback()
         flash(f'Erreur lors de l\'application de la règle: {str(e)}', 'danger')
@@ -187,54 +145,15 @@ def create_auto_rule():
         
         # Appliquer immédiatement si demandé
         if apply_now:
-            count = 0
-            uncategorized = Expense.query.filter_by(category_id=None).all()
-            
-            for expense in uncategorized:
-                if rule.matches_expense(expense):
-                    # Appliquer les actions activées (respecter les modifications manuelles)
-                    if apply_category and category_id:
-                        if expense.category_modified_by != ModificationSource.MANUAL.value:
-                            expense.category_id = category_id
-                            expense.category_modified_by = ModificationSource.AUTO_RULE.value
-                    
-                    if apply_flag and flag_id:
-                        if expense.flag_modified_by != ModificationSource.MANUAL.value:
-                            expense.flag_id = flag_id
-                            expense.flag_modified_by = ModificationSource.AUTO_RULE.value
-                    
-                    if apply_rename_merchant and rename_merchant_pattern:
-                        if expense.merchant_modified_by != ModificationSource.MANUAL.value:
-                            # Utiliser la fonction helper pour le renommage
-                            apply_rule_rename(expense, rule, ModificationSource.AUTO_RULE.value)
-                    
-                    # Enregistrer la relation règle-dépense
-                    rule.affected_expenses.append(expense)
-                    count += 1
+            # Appliquer les actions activées (respecter les modifications manuelles)
+            count = BulkRuleApplicationService.apply_rule(rule, respect_manual=True)
             
             db.session.commit()
             flash(f'Règle appliquée avec succès à {count} dépenses.', 'success')
         
         # Si la règle nécessite une confirmation, ajouter aux applications en attente
         elif requires_confirmation:
-            pending_count = 0
-            uncategorized = Expense.query.filter_by(category_id=None).all()
-            
-            for expense in uncategorized:
-                if rule.matches_expense(expense):
-                    # Vérifier si cette application n'existe pas déjà
-                    existing = PendingRuleApplication.query.filter_by(
-                        rule_id=rule.id, 
-                        expense_id=expense.id
-                    ).first()
-                    
-                    if not existing:
-                        pending_application = PendingRuleApplication(
-                            rule_id=rule.id,
-                            expense_id=expense.id
-                        )
-                        db.session.add(pending_application)
-                        pending_count += 1
+            pending_count = BulkRuleApplicationService.queue_pending(rule)
             
             db.session.commit()
             if pending_count > 0:
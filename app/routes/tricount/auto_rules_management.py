@@ -10,14 +10,19 @@ from app.models.tricount import (
     AutoCategorizationRule, Expense, Category, Flag, PendingRuleApplication, 
     ModificationSource
 )
+from app.models.job import Job
 from app.utils.error_utils import handle_request_error
 from datetime import datetime
 
 @tricount_bp.route('/auto-rules')
 def auto_rules_list():
-    """Liste des règles d'auto-catégorisation"""
+    """Liste des règles d'auto-catégorisation (et suivi d'une application en cours)"""
     rules = AutoCategorizationRule.query.all()
-    return render_template('tricount/auto_rules.html', rules=rules)
+    
+    job_id = request.args.get('job_id', type=int)
+    job = db.session.get(Job, job_id) if job_id else None
+    
+    return render_template('tricount/auto_rules.html', rules=rules, job=job)
 
 @tricount_bp.route('/auto-rules/delete/<int:rule_id>', methods=['POST'])
 def delete_auto_rule(rule_id):
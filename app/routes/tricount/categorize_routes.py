@@ -5,16 +5,28 @@ from app.models.tricount import Expense, Category, Flag
 from sqlalchemy import or_, desc, asc, case, text
 from sqlalchemy.sql.expression import cast
 from sqlalchemy.types import Integer
+from app.utils.sorting import keyset_paginate
+from app.utils.sql_query_utils import expense_list_options, category_list_options
+from app.utils.query_counter import query_budget
+
+# Tris compatibles avec la pagination par clé: (expression SQL, attribut de l'objet).
+# updated_at est renseigné à la création et à chaque modification.
+CATEGORIZE_KEYSET_SORTS = {
+    'date': (Expense.date, 'date'),
+    'updated': (Expense.updated_at, 'updated_at'),
+    'amount': (Expense.amount, 'amount')
+}
 
 @tricount_bp.route('/categorize')
+@query_budget(10)
 def categorize_expenses():
     """Page pour catégoriser les dépenses"""
     # Paramètres de tri - changement du tri par défaut
     sort_by = request.args.get('sort_by', 'updated')
     sort_order = request.args.get('sort_order', 'desc')
     
-    # Construire la requête de base
-    query = Expense.query
+    # Construire la requête de base (catégorie et flag chargés avec les dépenses)
+    query = Expense.query.options(*expense_list_options())
     
     # Filtrer pour obtenir les dépenses incomplètes (sans catégorie OU sans flag)
     query = query.filter(
@@ -68,8 +80,8 @@ def categorize_expenses():
     # Exécuter la requête
     expenses = query.all()
     
-    # Récupérer toutes les catégories et tous les flags
-    categories = Category.query.all()
+    # Récupérer toutes les catégories (avec leurs flags) et tous les flags
+    categories = Category.query.options(*category_list_options()).all()
     flags = Flag.query.all()
     
     # Préparation des données pour le JavaScript
@@ -91,12 +103,15 @@ def categorize_expenses():
                           sort_order=sort_order)
 
 @tricount_bp.route('/categorize/get-expenses')
+@query_budget(6)
 def get_expenses_for_categorization():
     """API pour obtenir les dépenses à catégoriser avec pagination et tri"""
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 9, type=int)
     sort_by = request.args.get('sort_by', 'updated')  # Changé pour correspondre au nouveau tri par défaut
     sort_order = request.args.get('sort_order', 'desc')
+    cursor = request.args.get('cursor')
+    with_total = request.args.get('with_total', '1') != '0'
     
     # Construire la requête
     query = Expense.query.filter(
@@ -106,16 +121,13 @@ def get_expenses_for_categorization():
         )
     )
     
-    # Appliquer le tri
-    if sort_by == 'date':
-        order_func = desc if sort_order == 'desc' else asc
-        query = query.order_by(order_func(Expense.date))
-    elif sort_by == 'updated':
-        order_func = desc if sort_order == 'desc' else asc
-        query = query.order_by(order_func(Expense.updated_at))
-    elif sort_by == 'amount':
-        order_func = desc if sort_order == 'desc' else asc
-        query = query.order_by(order_func(Expense.amount))
+    if sort_by in CATEGORIZE_KEYSET_SORTS:
+        # Pagination par clé (colonne de tri, id) avec curseur opaque.
+        # Le total est optionnel: with_total=0 évite le COUNT(*)
+        sort_column, sort_attr = CATEGORIZE_KEYSET_SORTS[sort_by]
+        total = query.count() if with_total else None
+        paginated = keyset_paginate(query, sort_by, sort_column, sort_attr, sort_order, Expense.id,
+                                    page=page, per_page=per_page, cursor=cursor, total=total)
     else:
         # Tri par niveau de complétion - même approche compatible qu'au-dessus
         completion_score = (
@@ -124,12 +136,11 @@ def get_expenses_for_categorization():
         )
         
         if sort_order == 'asc':
-            query = query.order_by(asc(completion_score), desc(Expense.date))
+            query = query.order_by(asc(completion_score), desc(Expense.date), desc(Expense.id))
         else:
-            query = query.order_by(desc(completion_score), desc(Expense.date))
-    
-    # Paginer les résultats
-    paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+            query = query.order_by(desc(completion_score), desc(Expense.date), desc(Expense.id))
+        
+        paginated = query.paginate(page=page, per_page=per_page, error_out=False)
     
     # Transformer les dépenses en dictionnaire pour JSON
     expenses_data = []
@@ -153,8 +164,11 @@ def get_expenses_for_categorization():
     return jsonify({
         'success': True,
         'expenses': expenses_data,
-        'page': page,
+        'page': paginated.page,
         'per_page': per_page,
         'total': paginated.total,
-        'pages': paginated.pages
+        'pages': paginated.pages if paginated.total is not None else None,
+        'has_next': paginated.has_next,
+        'prev_cursor': getattr(paginated, 'prev_cursor', None),
+        'next_cursor': getattr(paginated, 'next_cursor', None)
     })
\ No newline at end of file
@@ -11,6 +11,7 @@ from flask import request, redirect, url_for, jsonify, current_app
 from app.routes.tricount import tricount_bp
 from app.extensions import db
 from app.models.tricount import Expense
+from app.utils.error_sink import ErrorSink
 import traceback
 import json
 from datetime import datetime
@@ -70,12 +71,10 @@ def log_compatibility_call(original_route, target_route, route_type="API", addit
             stack_trace=json.dumps(info, indent=2)
         )
         
-        db.session.add(error_entry)
-        db.session.commit()
+        ErrorSink.enqueue(error_entry)
     except Exception as e:
         # Ne pas laisser une erreur dans la journalisation perturber l'exécution normale
         current_app.logger.error(f"Erreur lors de la journalisation de redirection: {str(e)}")
-        db.session.rollback()
 
 # Compatibilité pour les routes de détail d'expense
 @tricount_bp.route('/expense/<int:expense_type>/detail/<int:expense_id>', methods=['GET'])
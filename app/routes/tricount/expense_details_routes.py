@@ -11,12 +11,14 @@ from app.utils.error_utils import log_redirection_error, handle_request_error
 from datetime import datetime
 import traceback
 
-def prepare_expense_response_data(expense):
+def prepare_expense_response_data(expense, rules_by_expense=None):
     """
     Prépare les données d'une dépense pour la réponse JSON.
     
     Args:
         expense (Expense): Objet dépense
+        rules_by_expense (dict, optional): {expense_id: rule_id} préchargé pour une liste
+            (voir prepare_expenses_response_data); sinon une requête est faite pour la dépense
         
     Returns:
         dict: Données formatées
@@ -70,13 +72,48 @@ def prepare_expense_response_data(expense):
         }
     
     # Vérifier si une règle a été créée à partir de cette dépense
-    rule = AutoCategorizationRule.query.filter_by(created_by_expense_id=expense.id).first()
-    if rule:
-        expense_data['rule_id'] = rule.id
+    if rules_by_expense is None:
+        rule = AutoCategorizationRule.query.filter_by(created_by_expense_id=expense.id).first()
+        rule_id = rule.id if rule else None
+    else:
+        rule_id = rules_by_expense.get(expense.id)
+    
+    if rule_id:
+        expense_data['rule_id'] = rule_id
         expense_data['has_rule'] = True
     
     return expense_data
 
+def prepare_expenses_response_data(expenses):
+    """
+    Prépare les données JSON d'une liste de dépenses.
+    
+    Les règles créées à partir des dépenses sont chargées en une seule requête
+    au lieu d'une requête par dépense.
+    
+    Args:
+        expenses (list): Dépenses (catégorie et flag de préférence préchargés)
+        
+    Returns:
+        list: Données formatées de chaque dépense
+    """
+    expense_ids = [expense.id for expense in expenses]
+    rules_by_expense = {}
+    
+    if expense_ids:
+        rules = db.session.query(
+            AutoCategorizationRule.created_by_expense_id,
+            AutoCategorizationRule.id
+        ).filter(
+            AutoCategorizationRule.created_by_expense_id.in_(expense_ids)
+        ).order_by(AutoCategorizationRule.id.desc())
+        
+        # Parcours décroissant: la règle de plus petit ID l'emporte
+        for expense_id, rule_id in rules:
+            rules_by_expense[expense_id] = rule_id
+    
+    return [prepare_expense_response_data(expense, rules_by_expense) for expense in expenses]
+
 @tricount_bp.route('/expense/<int:expense_id>/details', methods=['GET'])
 def get_expense_details(expense_id):
     """Récupère les détails d'une dépense pour les formulaires d'édition et de consultation"""
@@ -4,9 +4,19 @@ from app.routes.tricount import tricount_bp
 from app.extensions import db
 from app.models.tricount import Expense, Category, Flag, ModificationSource, DeclarationStatus
 from datetime import datetime
-from sqlalchemy import or_
+from app.services.tricount.expense_search import ExpenseSearchService
+from app.utils.sorting import keyset_paginate, estimate_query_count
+from app.utils.sql_query_utils import expense_list_options
+from app.utils.query_counter import query_budget
+
+# Tris de la liste des dépenses: (expression SQL, attribut de l'objet)
+EXPENSE_KEYSET_SORTS = {
+    'date': (Expense.date, 'date'),
+    'amount': (Expense.amount, 'amount')
+}
 
 @tricount_bp.route('/expenses')
+@query_budget(10)
 def expenses_list():
     """Liste des dépenses"""
     # Filtres
@@ -25,8 +35,8 @@ def expenses_list():
     sort_by = request.args.get('sort', 'date')
     order = request.args.get('order', 'desc')
     
-    # Construire la requête
-    query = Expense.query
+    # Construire la requête (catégorie et flag chargés avec la page)
+    query = Expense.query.options(*expense_list_options())
     
     # Filtre par catégorie
     if category_id is not None:
@@ -54,36 +64,31 @@ def expenses_list():
         except ValueError:
             end_date = None
     
-    # Filtre par recherche textuelle
+    # Filtre par recherche textuelle (plein texte sous PostgreSQL)
     if search_query:
-        search_term = f"%{search_query}%"
-        query = query.filter(
-            or_(
-                Expense.merchant.ilike(search_term),
-                Expense.renamed_merchant.ilike(search_term),
-                Expense.description.ilike(search_term),
-                Expense.notes.ilike(search_term)
-            )
-        )
-    
-    # Appliquer le tri
-    if sort_by == 'date':
-        query = query.order_by(Expense.date.desc() if order == 'desc' else Expense.date)
-    elif sort_by == 'amount':
-        query = query.order_by(Expense.amount.desc() if order == 'desc' else Expense.amount)
-    else:
-        query = query.order_by(Expense.date.desc())  # Tri par défaut
+        query = ExpenseSearchService.apply_search(query, search_query)
+    
+    # Tri par clé (colonne de tri, id): date ou montant
+    if sort_by not in EXPENSE_KEYSET_SORTS:
+        sort_by = 'date'
+    if order not in ('asc', 'desc'):
+        order = 'desc'
+    sort_column, sort_attr = EXPENSE_KEYSET_SORTS[sort_by]
     
     # Configuration de pagination
     max_per_page = 50
     page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     
-    # Toujours paginer, que des filtres soient appliqués ou non
+    # Toujours paginer, que des filtres soient appliqués ou non.
+    # Précédent/Suivant utilisent un curseur (pas d'OFFSET), le total est estimé
     paginated = True
-    expenses = query.paginate(page=page, per_page=max_per_page, error_out=False)
+    expenses = keyset_paginate(query, sort_by, sort_column, sort_attr, order, Expense.id,
+                               page=page, per_page=max_per_page, cursor=cursor,
+                               total=estimate_query_count(query))
     
-    # Vérifier si le nombre total de résultats dépasse la limite par page
-    exceeds_limit = expenses.total > max_per_page
+    # Vérifier si les résultats dépassent la limite par page
+    exceeds_limit = expenses.has_next or expenses.has_prev
     
     # Catégories et flags pour les filtres
     categories = Category.query.all()
@@ -105,6 +110,40 @@ def expenses_list():
                           exceeds_limit=exceeds_limit,
                           max_per_page=max_per_page)
 
+@tricount_bp.route('/expenses/search')
+def search_expenses():
+    """API de recherche plein texte: dépenses classées par pertinence et surlignées"""
+    search_query = request.args.get('q', '')
+    limit = min(request.args.get('limit', 50, type=int), 200)
+    
+    filters = {
+        'category_id': request.args.get('category_id', type=int),
+        'flag_id': request.args.get('flag_id', type=int),
+        'start_date': request.args.get('start_date'),
+        'end_date': request.args.get('end_date'),
+        'status_values': request.args.getlist('status')
+    }
+    
+    results = ExpenseSearchService.search_expenses(search_query, filters, limit=limit)
+    
+    return jsonify({
+        'success': True,
+        'query': search_query,
+        'results': [
+            {
+                'id': result['expense'].id,
+                'date': result['expense'].date.strftime('%d/%m/%Y'),
+                'amount': float(result['expense'].amount),
+                'is_debit': result['expense'].is_debit,
+                'merchant': result['expense'].display_name,
+                'rank': result['rank'],
+                'merchant_html': str(result['merchant_html']),
+                'description_html': str(result['description_html'])
+            }
+            for result in results
+        ]
+    })
+
 @tricount_bp.route('/update_expense', methods=['POST'])
 def update_expense():
     """Met à jour les informations d'une dépense"""
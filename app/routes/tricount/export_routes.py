@@ -1,7 +1,11 @@
 # app/routes/tricount/export_routes.py
 from flask import render_template, redirect, url_for, flash, request, make_response
 from app.routes.tricount import tricount_bp
-from app.models.tricount import Expense
+from app.extensions import db
+from app.models.tricount import Expense, Flag
+from app.utils.sql_query_utils import expense_list_options
+from app.utils.query_counter import query_budget
+from sqlalchemy import case, func
 import csv
 from io import StringIO
 
@@ -11,18 +15,26 @@ def export_options():
     # Obtenir tous les flags
     flags = Flag.query.all()
     
-    # Statistiques pour chaque flag
+    # Statistiques pour chaque flag, en une seule requête d'agrégation
+    stats_rows = db.session.query(
+        Expense.flag_id,
+        func.count(Expense.id),
+        func.coalesce(func.sum(case((Expense.is_debit == True, Expense.amount), else_=0)), 0),
+        func.min(Expense.date),
+        func.max(Expense.date)
+    ).filter(Expense.flag_id != None).group_by(Expense.flag_id).all()
+    stats_by_flag = {row[0]: row[1:] for row in stats_rows}
+    
     flag_stats = {}
     
     for flag in flags:
-        expenses = Expense.query.filter_by(flag_id=flag.id).all()
-        total = sum(expense.amount for expense in expenses if expense.is_debit)
+        count, total, start_date, end_date = stats_by_flag.get(flag.id, (0, 0, None, None))
         
         flag_stats[flag.id] = {
-            'count': len(expenses),
+            'count': count,
             'total': total,
-            'start_date': min([expense.date.strftime('%d/%m/%Y') for expense in expenses]) if expenses else None,
-            'end_date': max([expense.date.strftime('%d/%m/%Y') for expense in expenses]) if expenses else None
+            'start_date': start_date.strftime('%d/%m/%Y') if start_date else None,
+            'end_date': end_date.strftime('%d/%m/%Y') if end_date else None
         }
     
     return render_template('tricount/export.html',
@@ -97,6 +109,7 @@ def export_tricount():
     return response
 
 @tricount_bp.route('/export/n2f', methods=['POST'])
+@query_budget(4)
 def export_n2f():
     """Exporter les dépenses professionnelles pour N2F"""
     employee_name = request.form.get('employee_name', '')
@@ -107,8 +120,8 @@ def export_n2f():
         flash('Le nom de l\'employé est requis.', 'warning')
         return redirect(url_for('tricount.export_options'))
     
-    # Récupérer les dépenses professionnelles
-    expenses = Expense.query.filter_by(is_professional=True).order_by(Expense.date.asc()).all()
+    # Récupérer les dépenses professionnelles (catégorie chargée avec les dépenses)
+    expenses = Expense.query.options(*expense_list_options()).filter_by(is_professional=True).order_by(Expense.date.asc()).all()
     
     if not expenses:
         flash('Aucune dépense professionnelle à exporter pour N2F.', 'warning')
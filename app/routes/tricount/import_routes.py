@@ -4,7 +4,7 @@ from app.routes.tricount import tricount_bp
 from app.extensions import db
 from app.models.tricount import Expense
 from app.services.tricount import SocieteGeneraleParser, N26Parser
-from sqlalchemy.exc import IntegrityError
+from app.services.tricount.bulk_import import BulkImportService
 
 @tricount_bp.route('/import', methods=['GET'])
 def import_expenses():
@@ -16,52 +16,16 @@ def process_transactions(transactions, source):
     Traite une liste de transactions pour les importer dans la base de données
     
     Args:
-        transactions (list): Liste des transactions à importer
+        transactions (iterable): Transactions à importer (liste ou générateur)
         source (str): Source des transactions (societe_generale, n26, etc.)
         
     Returns:
         tuple: (imported_count, duplicate_count, success)
     """
-    imported_count = 0
-    duplicate_count = 0
+    # Import par lots: une requête de dédoublonnage et un INSERT par lot
+    result = BulkImportService.import_transactions(transactions, source)
     
-    for transaction in transactions:
-        # Créer un identifiant unique pour éviter les doublons
-        unique_id = Expense.generate_unique_identifier(
-            transaction['date'],
-            transaction['description'],
-            transaction['amount']
-        )
-        
-        # Vérifier si cette dépense existe déjà
-        existing = Expense.query.filter_by(unique_identifier=unique_id).first()
-        if existing:
-            duplicate_count += 1
-            continue
-        
-        # Créer une nouvelle dépense
-        expense = Expense(
-            date=transaction['date'],
-            description=transaction['description'],
-            amount=transaction['amount'],
-            is_debit=transaction.get('is_debit', True),
-            merchant=transaction.get('merchant', ''),
-            payment_method=transaction.get('payment_method', ''),
-            reference=transaction.get('reference', ''),
-            original_text=transaction.get('original_text', ''),
-            unique_identifier=unique_id,
-            source=source  # Ajouter la source
-        )
-        
-        db.session.add(expense)
-        imported_count += 1
-    
-    try:
-        db.session.commit()
-        return (imported_count, duplicate_count, True)
-    except IntegrityError:
-        db.session.rollback()
-        return (imported_count, duplicate_count, False)
+    return (result['imported'], result['duplicates'], result['success'])
 
 @tricount_bp.route('/import/societe-generale', methods=['GET', 'POST'])
 def import_expenses_societe_generale():
@@ -86,7 +50,7 @@ def import_expenses_societe_generale():
         if success:
             flash(f'{imported_count} transactions importées avec succès. {duplicate_count} transactions ignorées (doublons).', 'success')
         else:
-            flash('Erreur lors de l\'importation des transactions. Certaines transactions pourraient être des doublons.', 'danger')
+            flash(f'Importation partielle: {imported_count} transactions importées, {duplicate_count} doublons ignorés. Certaines transactions n\'ont pas pu être importées.', 'warning')
         
         return redirect(url_for('tricount.expenses_list'))
     
@@ -112,36 +76,26 @@ def import_expenses_n26():
             flash('Le fichier doit être au format CSV.', 'warning')
             return redirect(url_for('tricount.import_expenses_n26'))
         
-        # Lire le contenu du fichier
+        # Analyser le fichier CSV N26 en flux: décodage incrémental et import par lots
+        # de taille fixe, la mémoire reste bornée quelle que soit la taille du fichier
         try:
-            csv_content = csv_file.read().decode('utf-8')
+            transactions = N26Parser.iter_csv_stream(csv_file.stream)
+            imported_count, duplicate_count, success = process_transactions(transactions, 'n26')
         except UnicodeDecodeError:
-            try:
-                # Essayer avec un autre encodage si utf-8 échoue
-                csv_file.seek(0)  # Revenir au début du fichier
-                csv_content = csv_file.read().decode('latin-1')
-            except:
-                flash('Impossible de lire le fichier CSV. Vérifiez l\'encodage du fichier.', 'danger')
-                return redirect(url_for('tricount.import_expenses_n26'))
-        
-        # Analyser le fichier CSV N26
-        try:
-            transactions = N26Parser.parse_csv(csv_content)
+            flash('Impossible de lire le fichier CSV. Vérifiez l\'encodage du fichier.', 'danger')
+            return redirect(url_for('tricount.import_expenses_n26'))
         except Exception as e:
             flash(f'Erreur lors de l\'analyse du fichier CSV: {str(e)}', 'danger')
             return redirect(url_for('tricount.import_expenses_n26'))
         
-        if not transactions:
+        if imported_count == 0 and duplicate_count == 0 and success:
             flash('Aucune transaction n\'a pu être extraite du fichier fourni.', 'warning')
             return redirect(url_for('tricount.import_expenses_n26'))
         
-        # Traiter les transactions avec la source
-        imported_count, duplicate_count, success = process_transactions(transactions, 'n26')
-        
         if success:
             flash(f'{imported_count} transactions importées avec succès. {duplicate_count} transactions ignorées (doublons).', 'success')
         else:
-            flash('Erreur lors de l\'importation des transactions. Certaines transactions pourraient être des doublons.', 'danger')
+            flash(f'Importation partielle: {imported_count} transactions importées, {duplicate_count} doublons ignorés. Certaines transactions n\'ont pas pu être importées.', 'warning')
         
         return redirect(url_for('tricount.expenses_list'))
     
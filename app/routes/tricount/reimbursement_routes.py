@@ -7,9 +7,14 @@ from flask import render_template, redirect, url_for, flash, request, jsonify, R
 from app.routes.tricount import tricount_bp
 from app.extensions import db
 from app.models.tricount import Expense, Flag, Category, DeclarationStatus
-from app.utils.sql_query_utils import build_reimbursement_query, apply_sort_to_query
+from app.utils.sql_query_utils import (
+    build_reimbursement_query, build_reimbursement_summary_query, apply_sort_to_query, category_list_options
+)
 from app.utils.error_utils import handle_request_error, log_redirection_error
+from app.utils.sorting import keyset_paginate
+from app.utils.query_counter import query_budget
 from datetime import datetime
+from decimal import Decimal
 import json
 import csv
 from io import StringIO
@@ -73,8 +78,9 @@ def get_filter_params_from_request(is_post=True):
         if order not in ['asc', 'desc']:
             order = 'desc'
         
-        # Pagination
+        # Pagination (numéro de page et curseur opaque optionnel)
         page = source.get('page', 1, type=int)
+        cursor = source.get('cursor') or None
         
         params = {
             'flag_id': flag_id,
@@ -85,7 +91,8 @@ def get_filter_params_from_request(is_post=True):
             'show_all': show_all,
             'sort_by': sort_by,
             'order': order,
-            'page': page
+            'page': page,
+            'cursor': cursor
         }
         
         return params
@@ -105,43 +112,140 @@ def get_filter_params_from_request(is_post=True):
             'show_all': False,
             'sort_by': 'date',
             'order': 'desc',
-            'page': 1
+            'page': 1,
+            'cursor': None
         }
 
-def calculate_summary(expenses):
+def calculate_summary(params):
     """
-    Calcule les statistiques des dépenses remboursables.
+    Calcule les statistiques des dépenses remboursables en une requête d'agrégation SQL.
     
     Args:
-        expenses (list): Liste des dépenses
+        params (dict): Paramètres de filtrage validés
     
     Returns:
-        dict: Statistiques calculées
+        dict: Statistiques calculées (montants en Decimal) et nombre de dépenses
     """
-    total_amount = 0
-    total_declared = 0
-    total_reimbursed = 0
+    row = build_reimbursement_summary_query(
+        flag_id=params['flag_id'],
+        status_values=params['status_values'],
+        start_date=params['start_date'],
+        end_date=params['end_date'],
+        search_query=params['search_query'],
+        show_all=params['show_all']
+    ).one()
     
-    for expense in expenses:
-        if expense.is_debit:
-            total_amount += float(expense.amount)
-            if expense.declaration_status == DeclarationStatus.DECLARED.value:
-                total_declared += float(expense.amount)
-            elif expense.declaration_status == DeclarationStatus.REIMBURSED.value:
-                total_reimbursed += float(expense.amount)
+    total_amount = Decimal(row.total_amount or 0)
+    total_declared = Decimal(row.total_declared or 0)
+    total_reimbursed = Decimal(row.total_reimbursed or 0)
     
     # Calculer le pourcentage déclaré
-    percentage_declared = 0
+    percentage_declared = Decimal('0')
     if total_amount > 0:
         percentage_declared = (total_declared + total_reimbursed) / total_amount * 100
     
     return {
+        'count': row.count,
         'total_amount': total_amount,
         'total_declared': total_declared,
         'total_reimbursed': total_reimbursed,
         'percentage_declared': percentage_declared
     }
 
+def summary_to_json(summary):
+    """
+    Convertit le résumé en valeurs numériques JSON (le JavaScript attend des nombres).
+    
+    Args:
+        summary (dict): Résumé retourné par calculate_summary
+    
+    Returns:
+        dict: Résumé sérialisable
+    """
+    return {
+        'count': summary['count'],
+        'total_amount': float(summary['total_amount'].quantize(Decimal('0.01'))),
+        'total_declared': float(summary['total_declared'].quantize(Decimal('0.01'))),
+        'total_reimbursed': float(summary['total_reimbursed'].quantize(Decimal('0.01'))),
+        'percentage_declared': float(summary['percentage_declared'])
+    }
+
+def paginate_with_summary(query, page, summary, per_page=20):
+    """
+    Pagine une requête en réutilisant le nombre total calculé par le résumé.
+    
+    Seules les lignes de la page sont chargées (LIMIT/OFFSET), sans COUNT(*) supplémentaire.
+    
+    Args:
+        query: Requête filtrée et triée
+        page (int): Numéro de page
+        summary (dict): Résumé contenant le nombre total de dépenses
+        per_page (int): Nombre de lignes par page
+    
+    Returns:
+        Pagination: Objet de pagination Flask-SQLAlchemy
+    """
+    expenses = query.paginate(page=page, per_page=per_page, error_out=False, count=False)
+    expenses.total = summary['count']
+    return expenses
+
+# Tris compatibles avec la pagination par clé: (expression SQL, attribut de l'objet)
+REIMBURSEMENT_KEYSET_SORTS = {
+    'date': (Expense.date, 'date'),
+    'amount': (Expense.signed_amount, 'signed_amount')
+}
+
+def paginate_reimbursements(query, params, summary, per_page=20):
+    """
+    Pagine les dépenses remboursables, par clé (date/montant, id) lorsque le tri le permet.
+    
+    Le total provient du résumé déjà calculé: aucun COUNT(*) supplémentaire.
+    Les autres tris (marchand, statut, flag...) conservent la pagination par OFFSET.
+    
+    Args:
+        query: Requête filtrée et triée
+        params (dict): Paramètres de filtrage validés (tri, page, curseur)
+        summary (dict): Résumé contenant le nombre total de dépenses
+        per_page (int): Nombre de lignes par page
+    
+    Returns:
+        KeysetPage ou Pagination: Page de résultats
+    """
+    keyset_sort = REIMBURSEMENT_KEYSET_SORTS.get(params['sort_by'])
+    if keyset_sort is None:
+        return paginate_with_summary(query, params['page'], summary, per_page)
+    
+    sort_column, sort_attr = keyset_sort
+    return keyset_paginate(
+        query, params['sort_by'], sort_column, sort_attr, params['order'], Expense.id,
+        page=params['page'], per_page=per_page, cursor=params['cursor'], total=summary['count']
+    )
+
+def pagination_to_json(expenses):
+    """
+    Convertit une page de résultats en données de pagination JSON.
+    
+    Args:
+        expenses: Page de résultats (KeysetPage ou Pagination Flask-SQLAlchemy)
+    
+    Returns:
+        dict: Données de pagination, avec les curseurs s'ils existent
+    """
+    if hasattr(expenses, 'to_dict'):
+        return expenses.to_dict()
+    
+    return {
+        'page': expenses.page,
+        'pages': expenses.pages,
+        'total': expenses.total,
+        'has_prev': expenses.has_prev,
+        'has_next': expenses.has_next,
+        'prev_num': expenses.prev_num,
+        'next_num': expenses.next_num,
+        'prev_cursor': None,
+        'next_cursor': None
+    }
+
 def prepare_category_data(categories, flags):
     """
     Prépare les données des catégories pour JavaScript.
@@ -202,6 +306,7 @@ def prepare_flag_data(flags):
     return flag_data
 
 @tricount_bp.route('/reimbursements', methods=['POST'])
+@query_budget(12)
 def reimbursements_list():
     """Page principale de gestion des remboursements."""
     try:
@@ -228,15 +333,13 @@ def reimbursements_list():
         
         # Récupérer les flags et les catégories pour l'interface
         flags = Flag.query.all()
-        categories = Category.query.all()
+        categories = Category.query.options(*category_list_options()).all()
         
-        # Calculer les totaux pour le résumé avant pagination
-        all_expenses = query.all()
-        summary = calculate_summary(all_expenses)
+        # Calculer les totaux en SQL (sans charger les dépenses)
+        summary = calculate_summary(params)
         
-        # Pagination
-        per_page = 20
-        expenses = query.paginate(page=params['page'], per_page=per_page, error_out=False)
+        # Pagination: seules les lignes affichées sont chargées
+        expenses = paginate_reimbursements(query, params, summary)
         
         # Préparer les données JavaScript
         category_data = prepare_category_data(categories, flags)
@@ -245,26 +348,18 @@ def reimbursements_list():
         # Si c'est une requête AJAX, renvoyer du JSON
         if is_ajax:
             # Import local pour éviter les cycles d'import
-            from app.routes.tricount.expense_details_routes import prepare_expense_response_data
+            from app.routes.tricount.expense_details_routes import prepare_expenses_response_data
             
             # Préparer les données pour la réponse JSON
-            expenses_data = [prepare_expense_response_data(expense) for expense in expenses.items]
+            expenses_data = prepare_expenses_response_data(expenses.items)
             
             # Données de pagination
-            pagination_data = {
-                'page': expenses.page,
-                'pages': expenses.pages,
-                'total': expenses.total,
-                'has_prev': expenses.has_prev,
-                'has_next': expenses.has_next,
-                'prev_num': expenses.prev_num,
-                'next_num': expenses.next_num
-            }
+            pagination_data = pagination_to_json(expenses)
             
             return jsonify({
                 'success': True,
                 'expenses': expenses_data,
-                'summary': summary,
+                'summary': summary_to_json(summary),
                 'pagination': pagination_data
             })
         
@@ -321,6 +416,7 @@ def reimbursements_list_get():
     return form_html
 
 @tricount_bp.route('/reimbursements/rows', methods=['POST'])
+@query_budget(8)
 def get_reimbursement_rows():
     """Génère les lignes du tableau avec les macros Jinja pour AJAX."""
     try:
@@ -339,34 +435,24 @@ def get_reimbursement_rows():
             order=params['order']
         )
         
-        # Calculer les totaux pour le résumé avant pagination
-        all_expenses = query.all()
-        summary = calculate_summary(all_expenses)
+        # Calculer les totaux en SQL (sans charger les dépenses)
+        summary = calculate_summary(params)
         
-        # Pagination
-        per_page = 20
-        expenses = query.paginate(page=params['page'], per_page=per_page, error_out=False)
+        # Pagination: seules les lignes affichées sont chargées
+        expenses = paginate_reimbursements(query, params, summary)
         
         # Génération du HTML pour la réponse
         rows_html = render_template('tricount/partials/reimbursement_rows.html', 
                                   expenses=expenses.items)
         
         # Données de pagination
-        pagination_data = {
-            'page': expenses.page,
-            'pages': expenses.pages,
-            'total': expenses.total,
-            'has_prev': expenses.has_prev,
-            'has_next': expenses.has_next,
-            'prev_num': expenses.prev_num,
-            'next_num': expenses.next_num
-        }
+        pagination_data = pagination_to_json(expenses)
         
         # Renvoyer une réponse plus détaillée
         response_data = {
             'success': True,
             'html': rows_html,
-            'summary': summary,
+            'summary': summary_to_json(summary),
             'pagination': pagination_data
         }
         
@@ -382,28 +468,18 @@ def get_reimbursement_summary():
         # Extraire les paramètres de filtrage
         params = get_filter_params_from_request(request.method == 'POST')
         
-        # Construire la requête
-        query = build_reimbursement_query(
-            flag_id=params['flag_id'],
-            status_values=params['status_values'],
-            start_date=params['start_date'],
-            end_date=params['end_date'],
-            search_query=params['search_query'],
-            show_all=params['show_all']
-        )
-        
-        # Récupérer les dépenses et calculer les statistiques
-        expenses = query.all()
-        summary = calculate_summary(expenses)
+        # Calculer les statistiques en une requête d'agrégation
+        summary = calculate_summary(params)
         
         return jsonify({
             'success': True,
-            'summary': summary
+            'summary': summary_to_json(summary)
         })
     except Exception as e:
         return handle_request_error("get_reimbursement_summary", e, is_ajax=True)
 
 @tricount_bp.route('/reimbursements/export', methods=['GET', 'POST'])
+@query_budget(6)
 def export_reimbursements():
     """Exporte les données de remboursement au format CSV."""
     try:
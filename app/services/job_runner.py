@@ -0,0 +1,120 @@
+# app/services/job_runner.py
+"""
+Exécution des traitements longs en arrière-plan.
+
+Un pool de threads propre au processus exécute les traitements (analyse d'un
+planning, application d'une règle à toutes les dépenses, correction des noms de
+marchands) hors de la requête HTTP: la route crée un Job, renvoie aussitôt son
+identifiant, et l'interface suit l'avancement via GET /jobs/<id>.
+
+Chaque traitement reçoit en premier argument un JobProgress pour publier son
+avancement. La ligne du Job est mise à jour sur une connexion dédiée: la
+transaction du traitement n'est validée qu'à la fin, en cas de succès.
+"""
+import json
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Lock
+from flask import current_app
+from app.extensions import db
+from app.models.job import Job
+
+DEFAULT_WORKERS = 2
+
+
+class JobProgress:
+    """Publication de l'avancement d'un traitement"""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+
+    def __call__(self, progress, message=None):
+        """
+        Args:
+            progress (int): Avancement en pourcentage (borné entre 0 et 100)
+            message (str): Étape en cours (optionnel)
+        """
+        values = {'progress': max(0, min(100, int(progress)))}
+        if message is not None:
+            values['message'] = message[:255]
+        JobRunner.update(self.job_id, **values)
+
+
+class JobRunner:
+    """Soumission et exécution des traitements en arrière-plan"""
+
+    _executor = None
+    _lock = Lock()
+
+    @classmethod
+    def get_executor(cls):
+        """Pool de threads, créé à la première soumission (JOB_WORKERS threads)"""
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=current_app.config.get('JOB_WORKERS', DEFAULT_WORKERS),
+                    thread_name_prefix='qb-job'
+                )
+            return cls._executor
+
+    @staticmethod
+    def update(job_id, **values):
+        """
+        Met à jour la ligne d'un traitement sur une connexion dédiée
+
+        Args:
+            job_id (int): ID du traitement
+            **values: Colonnes à modifier
+        """
+        table = Job.__table__
+        with db.engine.begin() as connection:
+            connection.execute(table.update().where(table.c.id == job_id).values(**values))
+
+    @classmethod
+    def submit(cls, name, func, *args, user_id=None, **kwargs):
+        """
+        Crée un traitement et le confie au pool de threads
+
+        Args:
+            name (str): Nom du traitement (ex: 'tricount.apply_rule')
+            func (callable): Fonction appelée avec (JobProgress, *args, **kwargs); son
+                résultat doit être sérialisable en JSON
+            user_id (int): Utilisateur à l'origine du traitement (optionnel)
+
+        Returns:
+            Job: Traitement créé (statut 'pending')
+        """
+        job = Job(name=name, status=Job.PENDING, user_id=user_id)
+        db.session.add(job)
+        db.session.commit()
+
+        app = current_app._get_current_object()
+        cls.get_executor().submit(cls._run, app, job.id, func, args, kwargs)
+        return job
+
+    @classmethod
+    def _run(cls, app, job_id, func, args, kwargs):
+        """Exécute un traitement dans son propre contexte d'application"""
+        with app.app_context():
+            cls.update(job_id, status=Job.RUNNING, started_at=datetime.utcnow())
+            try:
+                result = func(JobProgress(job_id), *args, **kwargs)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error(f"Échec du traitement {job_id}: {str(e)}\n{traceback.format_exc()}")
+                cls.update(job_id, status=Job.FAILED, error=str(e), finished_at=datetime.utcnow())
+                return
+            finally:
+                db.session.remove()
+
+            values = {
+                'status': Job.SUCCEEDED,
+                'progress': 100,
+                'result': json.dumps(result, default=str),
+                'finished_at': datetime.utcnow()
+            }
+            if isinstance(result, dict) and result.get('message'):
+                values['message'] = str(result['message'])[:255]
+            cls.update(job_id, **values)
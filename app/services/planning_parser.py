@@ -1,10 +1,13 @@
 # app/services/planning_parser.py
-from bs4 import BeautifulSoup
+import calendar
 import hashlib
 import json
 import re
 from datetime import datetime, timedelta
+from sqlalchemy import insert, literal, select
+from sqlalchemy.exc import SQLAlchemyError
 from app.models.planning import RawPlanning, ParsedPlanning, PlanningEntry
+from app.services.teamplanning import PlanningDocument, PlanningDelta
 from app.extensions import db
 
 class PlanningParser:
@@ -16,13 +19,27 @@ class PlanningParser:
         return hashlib.sha256(content.encode('utf-8')).hexdigest()
     
     @staticmethod
-    def save_raw_content(content):
-        """Sauvegarde le contenu brut s'il n'existe pas déjà"""
-        content_hash = PlanningParser.compute_content_hash(content)
+    def save_raw_content(content, content_hash=None):
+        """
+        Sauvegarde le contenu brut s'il n'existe pas déjà
+        
+        Args:
+            content (str): HTML de la page de planning
+            content_hash (str): Hash du contenu s'il est déjà connu (calculé pendant le téléchargement)
+        
+        Returns:
+            tuple: (RawPlanning, True si le contenu est nouveau)
+        """
+        if content_hash is None:
+            content_hash = PlanningParser.compute_content_hash(content)
         
         # Vérifier si ce contenu existe déjà
         existing = RawPlanning.query.filter_by(content_hash=content_hash).first()
         if existing:
+            # Contenu purgé par la rétention (prune_raw_plannings): le restaurer
+            if existing.raw_content is None:
+                existing.raw_content = content
+                db.session.commit()
             return existing, False
             
         # Créer une nouvelle entrée
@@ -38,8 +55,19 @@ class PlanningParser:
         return raw_planning, True
     
     @staticmethod
-    def parse_planning(raw_planning_id):
-        """Analyse le contenu brut pour extraire les données de planning"""
+    def parse_planning(raw_planning_id, delta=None):
+        """
+        Analyse le contenu brut pour extraire les données de planning
+        
+        Args:
+            raw_planning_id (int): ID du planning brut
+            delta (dict): Changements par rapport au planning précédent (PlanningDelta.detect):
+                les entrées des personnes inchangées sont recopiées au lieu d'être reconstruites
+                (le document est toujours extrait en entier: planning_data couvre toute l'équipe)
+        
+        Returns:
+            ParsedPlanning: Planning analysé
+        """
         raw_planning = RawPlanning.query.get(raw_planning_id)
         if not raw_planning:
             raise ValueError(f"Planning brut avec ID {raw_planning_id} non trouvé")
@@ -48,8 +76,11 @@ class PlanningParser:
         if raw_planning.parsed and hasattr(raw_planning, 'parsed_planning'):
             return raw_planning.parsed_planning
             
-        # Analyser le contenu HTML
-        soup = BeautifulSoup(raw_planning.raw_content, 'html.parser')
+        if raw_planning.raw_content is None:
+            raise ValueError(f"Le contenu du planning brut {raw_planning_id} a été purgé")
+            
+        # Analyser le contenu HTML (arbre partagé avec les routes d'extraction)
+        soup = PlanningDocument.for_raw_planning(raw_planning).soup
         
         # Extraire les informations du planning
         planning_data = PlanningParser._extract_planning_data(soup)
@@ -69,13 +100,58 @@ class PlanningParser:
         
         # Marquer le planning brut comme analysé
         raw_planning.parsed = True
-        db.session.commit()
         
-        # Créer les entrées individuelles
-        PlanningParser._create_planning_entries(parsed_planning.id, planning_data)
+        # Entrées réutilisables: planning précédent de la même période, personnes inchangées
+        previous_parsed = None
+        unchanged_people = PlanningDelta.reusable_names(delta)
+        if unchanged_people:
+            previous_parsed = ParsedPlanning.query.filter_by(
+                raw_planning_id=delta['previous_raw_planning_id'], month=month, year=year
+            ).first()
+        if previous_parsed is None:
+            unchanged_people = set()
+        
+        # Planning analysé et entrées individuelles sont validés dans la même transaction
+        try:
+            db.session.flush()
+            PlanningParser._create_planning_entries(
+                parsed_planning, planning_data, previous_parsed, unchanged_people
+            )
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            raise
         
         return parsed_planning
     
+    @staticmethod
+    def parse_job(progress, raw_planning_id):
+        """
+        Traitement en arrière-plan (JobRunner) d'un planning brut nouvellement récupéré
+        
+        Args:
+            progress (JobProgress): Publication de l'avancement
+            raw_planning_id (int): ID du planning brut
+        
+        Returns:
+            dict: {'parsed_planning_id', 'delta', 'message'}
+        """
+        raw_planning = db.session.get(RawPlanning, raw_planning_id)
+        if not raw_planning:
+            raise ValueError(f"Planning brut avec ID {raw_planning_id} non trouvé")
+        
+        progress(10, 'Détection des changements')
+        delta = PlanningDelta.detect(raw_planning, PlanningDocument.for_raw_planning(raw_planning))
+        
+        progress(50, 'Analyse du planning')
+        parsed_planning = PlanningParser.parse_planning(raw_planning_id, delta=delta)
+        
+        return {
+            'parsed_planning_id': parsed_planning.id,
+            'delta': delta,
+            'message': 'Planning analysé'
+        }
+    
     @staticmethod
     def _extract_month_year(soup):
         """Extrait le mois et l'année du planning"""
@@ -192,55 +268,111 @@ class PlanningParser:
         return morning, day_shift, evening
     
     @staticmethod
-    def _create_planning_entries(parsed_planning_id, planning_data):
-        """Crée des entrées individuelles dans la base de données à partir des données analysées"""
-        from datetime import datetime, timedelta
-        import calendar
+    def _planning_first_day(parsed_planning):
+        """
+        Détermine le premier jour et le nombre de jours du mois d'un planning analysé
         
-        parsed_planning = ParsedPlanning.query.get(parsed_planning_id)
-        if not parsed_planning:
-            return
+        Args:
+            parsed_planning (ParsedPlanning): Planning analysé (mois en toutes lettres, année)
         
-        # Déterminer le premier jour du mois
+        Returns:
+            tuple: (premier jour du mois (datetime), nombre de jours du mois)
+        """
         try:
             month_index = {"january": 1, "février": 2, "mars": 3, "avril": 4, "mai": 5, "juin": 6,
                           "juillet": 7, "août": 8, "septembre": 9, "octobre": 10, "novembre": 11, "décembre": 12}
             
-            month_name = parsed_planning.month.lower()
-            month_num = month_index.get(month_name, datetime.now().month)
-            year = parsed_planning.year
-            
-            first_day = datetime(year, month_num, 1)
+            month_num = month_index.get(parsed_planning.month.lower(), datetime.now().month)
+            first_day = datetime(parsed_planning.year, month_num, 1)
             
             # Déterminer le nombre de jours dans ce mois
-            _, days_in_month = calendar.monthrange(year, month_num)
+            _, days_in_month = calendar.monthrange(parsed_planning.year, month_num)
         except (ValueError, KeyError):
             # En cas d'erreur, utiliser le mois courant
             now = datetime.now()
             first_day = datetime(now.year, now.month, 1)
             _, days_in_month = calendar.monthrange(now.year, now.month)
         
-        # Créer les entrées pour chaque personne et chaque jour
+        return first_day, days_in_month
+    
+    @staticmethod
+    def _build_entry_rows(parsed_planning, planning_data, skip_people=()):
+        """
+        Construit les lignes de la table planning_entries (une par personne et par jour)
+        
+        Args:
+            parsed_planning (ParsedPlanning): Planning analysé, déjà doté d'un identifiant
+            planning_data (dict): Données extraites par _extract_planning_data
+            skip_people (set): Personnes dont les lignes ne sont pas construites
+        
+        Returns:
+            list: Dictionnaires de colonnes prêts pour un INSERT multi-lignes
+        """
+        first_day, days_in_month = PlanningParser._planning_first_day(parsed_planning)
+        
+        # Jours valides pour ce mois, avec leur date calculée une seule fois
+        dates = {}
+        for day_num in planning_data["days"]:
+            if day_num < 1 or day_num > days_in_month:
+                print(f"Avertissement: jour {day_num} hors limites pour {parsed_planning.month} "
+                      f"{parsed_planning.year} (max: {days_in_month})")
+                continue
+            dates[day_num] = (first_day + timedelta(days=day_num - 1)).date()
+        
+        rows = []
         for person in planning_data["people"]:
-            for day_num in planning_data["days"]:
-                # Vérifier si le jour est valide pour ce mois
-                if day_num < 1 or day_num > days_in_month:
-                    print(f"Avertissement: jour {day_num} hors limites pour {month_name} {year} (max: {days_in_month})")
-                    continue
-                
-                day_data = planning_data["entries"].get(person, {}).get(day_num, {})
-                
-                entry_date = first_day + timedelta(days=day_num-1)
-                
-                entry = PlanningEntry(
-                    parsed_planning_id=parsed_planning_id,
-                    person_name=person,
-                    date=entry_date,
-                    morning=day_data.get("morning"),
-                    day=day_data.get("day"),
-                    evening=day_data.get("evening")
-                )
-                
-                db.session.add(entry)
+            if person in skip_people:
+                continue
+            person_entries = planning_data["entries"].get(person, {})
+            for day_num, entry_date in dates.items():
+                day_data = person_entries.get(day_num, {})
+                rows.append({
+                    'parsed_planning_id': parsed_planning.id,
+                    'person_name': person,
+                    'date': entry_date,
+                    'morning': day_data.get("morning"),
+                    'day': day_data.get("day"),
+                    'evening': day_data.get("evening")
+                })
+        
+        return rows
+    
+    @staticmethod
+    def _create_planning_entries(parsed_planning, planning_data, previous_parsed=None, unchanged_people=()):
+        """
+        Insère en masse les entrées individuelles d'un planning analysé
+        
+        Les lignes sont insérées par un seul INSERT multi-lignes (executemany), sans
+        passer par l'unité de travail de l'ORM, dans la transaction courante: la
+        validation reste à la charge de l'appelant. Les entrées des personnes
+        inchangées depuis le planning précédent sont recopiées par INSERT ... SELECT.
+        
+        Args:
+            parsed_planning (ParsedPlanning): Planning analysé, déjà doté d'un identifiant
+            planning_data (dict): Données extraites par _extract_planning_data
+            previous_parsed (ParsedPlanning): Planning précédent de la même période (optionnel)
+            unchanged_people (iterable): Personnes dont le bloc n'a pas changé depuis previous_parsed
+                (PlanningDelta.reusable_names: aucun homonyme modifié, ajouté ou retiré)
+        
+        Returns:
+            int: Nombre d'entrées insérées
+        """
+        table = PlanningEntry.__table__
+        reused = set(unchanged_people) & set(planning_data["people"]) if previous_parsed else set()
+        
+        copied = 0
+        if reused:
+            columns = ['parsed_planning_id', 'person_name', 'date', 'morning', 'day', 'evening']
+            source = select(
+                literal(parsed_planning.id), table.c.person_name, table.c.date,
+                table.c.morning, table.c.day, table.c.evening
+            ).where(
+                table.c.parsed_planning_id == previous_parsed.id,
+                table.c.person_name.in_(sorted(reused))
+            )
+            copied = db.session.execute(insert(table).from_select(columns, source)).rowcount
         
-        db.session.commit()
\ No newline at end of file
+        rows = PlanningParser._build_entry_rows(parsed_planning, planning_data, skip_people=reused)
+        if rows:
+            db.session.execute(insert(table), rows)
+        return copied + len(rows)
@@ -3,9 +3,14 @@
 Module d'extraction et de traitement des données Teamplanning
 """
 
+from app.services.teamplanning.extractor_base import TIME_SLOT_NAMES
 from app.services.teamplanning.user_extractor import UserExtractor
 from app.services.teamplanning.date_extractor import DateExtractor
 from app.services.teamplanning.event_extractor import EventExtractor
+from app.services.teamplanning.planning_document import PlanningDocument
+from app.services.teamplanning.extraction_cache import ExtractionCache
+from app.services.teamplanning.planning_delta import PlanningDelta
+from app.services.teamplanning.netplanning_client import NetplanningClient
 
 """
 Façade unifiée pour toutes les fonctionnalités d'extraction Netplanning.
@@ -19,7 +24,7 @@ class NetplanningExtractor:
     Extrait uniquement les métadonnées du planning (utilisateurs et dates)
     
     Args:
-        html_content (str): Contenu HTML brut
+        html_content (str|PlanningDocument): Contenu HTML brut ou document déjà analysé
         
     Returns:
         dict: Métadonnées du planning
@@ -27,11 +32,14 @@ class NetplanningExtractor:
 
     @staticmethod
     def extract_metadata(html_content):
+        # Un seul parsing pour les utilisateurs et les dates
+        document = PlanningDocument.of(html_content)
+        
         # Extraire les utilisateurs
-        users = UserExtractor.extract_users(html_content)
+        users = UserExtractor.extract_users(document)
         
         # Extraire les informations de dates
-        dates_info = DateExtractor.extract_planning_dates(html_content)
+        dates_info = DateExtractor.extract_planning_dates(document)
         
         return {
             'users': users,
@@ -45,7 +53,7 @@ class NetplanningExtractor:
         Extrait des jours spécifiques en utilisant la même méthode que debug_day
         
         Args:
-            html_content (str): Contenu HTML brut
+            html_content (str|PlanningDocument): Contenu HTML brut ou document déjà analysé
             days_to_extract (list): Liste des jours à extraire, ou None pour tous
             user_index (int): Indice de l'utilisateur à extraire
             
@@ -60,7 +68,7 @@ class NetplanningExtractor:
         Extrait les noms des utilisateurs du HTML Netplanning
         
         Args:
-            html_content (str): Contenu HTML brut
+            html_content (str|PlanningDocument): Contenu HTML brut ou document déjà analysé
             
         Returns:
             list: Liste des noms d'utilisateurs trouvés
@@ -73,7 +81,7 @@ class NetplanningExtractor:
         Extrait les dates du planning depuis le HTML
         
         Args:
-            html_content (str): Contenu HTML brut
+            html_content (str|PlanningDocument): Contenu HTML brut ou document déjà analysé
             
         Returns:
             dict: Informations sur les dates (mois, année, jours)
@@ -86,7 +94,7 @@ class NetplanningExtractor:
         Extrait les événements du planning HTML
         
         Args:
-            html_content (str): Contenu HTML brut
+            html_content (str|PlanningDocument): Contenu HTML brut ou document déjà analysé
             limit_to_first_user (bool): Si True, extrait seulement pour le premier utilisateur
             extract_first_line_only (bool): Si True, extrait seulement les événements du matin
             
@@ -99,13 +107,28 @@ class NetplanningExtractor:
             extract_first_line_only
         )
     
+    @staticmethod
+    def extract_team(html_content, days=None, slots=TIME_SLOT_NAMES):
+        """
+        Extrait les événements de toute l'équipe en un seul passage
+        
+        Args:
+            html_content (str|PlanningDocument): Contenu HTML brut ou document déjà analysé
+            days (list): Jours à extraire, ou None pour tous
+            slots (iterable): Créneaux à extraire parmi 'morning', 'day' et 'evening'
+            
+        Returns:
+            dict: Période, créneaux, événements compacts par utilisateur et statistiques
+        """
+        return EventExtractor.extract_team(html_content, days, slots)
+    
     @staticmethod
     def debug_day(html_content, day_to_debug, user_index=0):
         """
         Fonction de débogage pour analyser un jour spécifique
         
         Args:
-            html_content (str): Contenu HTML brut
+            html_content (str|PlanningDocument): Contenu HTML brut ou document déjà analysé
             day_to_debug (int): Jour à déboguer
             user_index (int): Indice de l'utilisateur (0 par défaut)
             
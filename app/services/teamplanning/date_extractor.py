@@ -18,12 +18,25 @@ class DateExtractor(ExtractorBase):
         Extrait les dates du planning depuis le HTML
         
         Args:
-            html_content (str): Contenu HTML brut
+            html_content (str|PlanningDocument): Contenu HTML brut ou document déjà analysé
             
         Returns:
             dict: Informations sur les dates (mois, année, jours)
         """
-        soup = cls.create_soup(html_content)
+        return cls.get_document(html_content).dates
+    
+    @classmethod
+    def _parse_planning_dates(cls, document):
+        """
+        Analyse les dates du planning à partir d'un document
+        
+        Args:
+            document (PlanningDocument): Document analysé
+            
+        Returns:
+            dict: Informations sur les dates (mois, année, jours)
+        """
+        soup = document.soup
         
         # Informations à extraire
         dates_info = {
@@ -35,7 +48,7 @@ class DateExtractor(ExtractorBase):
         
         try:
             # Trouver le tableau principal
-            table, thead, _ = cls.find_table_and_sections(soup)
+            table, thead, _ = document.sections
             if not table or not thead:
                 return dates_info
                 
@@ -4,8 +4,10 @@ Module pour extraire les événements du planning Netplanning
 """
 
 import re
-from app.services.teamplanning.extractor_base import ExtractorBase
-from app.services.teamplanning.user_extractor import UserExtractor
+from app.services.teamplanning.extractor_base import ExtractorBase, TIME_SLOT_NAMES
+
+# Champs conservés dans la représentation compacte d'un événement (si renseignés)
+COMPACT_EVENT_FIELDS = ('content', 'type', 'comment', 'last_modified', 'author', 'is_holiday')
 
 class EventExtractor(ExtractorBase):
     """
@@ -17,14 +19,14 @@ class EventExtractor(ExtractorBase):
         Extrait des jours spécifiques pour un utilisateur donné en utilisant les ID de classe
         
         Args:
-            html_content (str): Contenu HTML brut
+            html_content (str|PlanningDocument): Contenu HTML brut ou document déjà analysé
             days_to_extract (list): Liste des jours à extraire, ou None pour tous
-            user_index (int): Indice de l'utilisateur à extraire
+            user_index (int): Indice de l'utilisateur dans la liste triée des utilisateurs
             
         Returns:
             dict: Informations sur les événements
         """
-        soup = cls.create_soup(html_content)
+        document = cls.get_document(html_content)
         
         # Structure pour stocker les résultats
         events_data = {
@@ -33,8 +35,7 @@ class EventExtractor(ExtractorBase):
         }
         
         try:
-            # Extraire d'abord tous les utilisateurs
-            all_users = UserExtractor.extract_users(html_content)
+            all_users = document.users
             if not all_users or user_index >= len(all_users):
                 events_data['error'] = f"Utilisateur à l'indice {user_index} non trouvé"
                 return events_data
@@ -42,96 +43,16 @@ class EventExtractor(ExtractorBase):
             # Utilisateur cible
             user_name = all_users[user_index]
             
-            # Initialiser les données pour cet utilisateur
-            events_data['users'][user_name] = {
-                'days': {}  # Dictionnaire où les clés sont les numéros de jours
-            }
-            
-            # Trouver l'ID utilisateur
-            user_id = None
-            user_tds = soup.find_all('td', class_='nom_ress')
-            
-            for i, td in enumerate(user_tds):
-                if i == user_index:
-                    # Extraire l'ID utilisateur de la classe
-                    classes = td.get('class', [])
-                    for cls in classes:
-                        if cls.isdigit() and len(cls) >= 5:  # Les ID utilisateur semblent être des nombres à 5 chiffres ou plus
-                            user_id = cls
-                            break
-                    break
-            
+            # L'ID utilisateur est porté par la cellule nom_ress de son tbody
+            user_id = document.user_id(user_name)
             if not user_id:
                 events_data['error'] = f"Impossible de déterminer l'ID utilisateur pour {user_name}"
                 return events_data
-                
-            # Trouver tous les créneaux horaires ID
-            # Nous allons chercher dans une cellule qui contient l'ID utilisateur pour trouver les ID des créneaux
-            time_slot_ids = []
-            time_slot_names = ['morning', 'day', 'evening']
-            
-            # Trouver un td qui contient l'ID utilisateur, puis extraire les autres IDs
-            example_td = soup.find('td', class_=lambda c: c and user_id in c.split())
-            if example_td:
-                classes = example_td.get('class', [])
-                # Le deuxième ID dans la classe semble être l'ID du créneau
-                for cls in classes:
-                    if cls.isdigit() and cls != user_id and len(cls) >= 6:  # Les ID de créneau semblent être des nombres à 6 chiffres
-                        time_slot_ids.append(cls)
-                        break
             
-            # Si nous n'avons pas trouvé l'ID du créneau, on va parcourir plus de cellules
-            if not time_slot_ids:
-                # Trouver toutes les cellules qui ont l'ID utilisateur
-                all_user_cells = soup.find_all('td', class_=lambda c: c and user_id in c.split())
-                for cell in all_user_cells:
-                    classes = cell.get('class', [])
-                    for cls in classes:
-                        if cls.isdigit() and cls != user_id and len(cls) >= 6:
-                            if cls not in time_slot_ids:
-                                time_slot_ids.append(cls)
-                    if len(time_slot_ids) >= 3:  # Arrêter une fois que nous avons 3 IDs (matin, jour, soir)
-                        break
-            
-            # Maintenant, on peut faire une hypothèse sur l'ordre des ID créneaux: 
-            # Le plus petit pour le matin, le suivant pour le jour, le plus grand pour le soir
-            time_slot_ids.sort()
-            
-            # Si nous n'avons pas assez d'ID de créneaux, nous utiliserons ceux fournis
-            if len(time_slot_ids) < 3:
-                time_slot_ids = ['512719', '512720', '512721']  # Utiliser les valeurs par défaut que vous avez observées
-            
-            # Jours à extraire
-            if days_to_extract is None:
-                days_to_extract = list(range(1, 32))  # Par défaut, tous les jours de 1 à 31
-            
-            # Pour chaque créneau horaire
-            for slot_idx, slot_id in enumerate(time_slot_ids[:3]):  # Limiter aux 3 premiers (en cas d'IDs supplémentaires)
-                time_slot = time_slot_names[slot_idx]
-                
-                # Trouver toutes les cellules pour ce créneau et cet utilisateur
-                slot_cells = soup.find_all('td', class_=lambda c: c and user_id in c.split() and slot_id in c.split())
-                
-                # Pour chaque cellule trouvée
-                for cell in slot_cells:
-                    # Extraire le jour
-                    for cls in cell.get('class', []):
-                        try:
-                            day = int(cls)
-                            if 1 <= day <= 31:  # Vérifier que c'est un jour valide
-                                if day in days_to_extract:
-                                    # Extraire les informations
-                                    event_info = cls._extract_event_info(cell)
-                                    
-                                    # Stocker l'événement
-                                    day_str = str(day)
-                                    if day_str not in events_data['users'][user_name]['days']:
-                                        events_data['users'][user_name]['days'][day_str] = {}
-                                    
-                                    events_data['users'][user_name]['days'][day_str][time_slot] = event_info
-                                break  # Sortir de la boucle une fois le jour trouvé
-                        except ValueError:
-                            continue  # Ignorer les classes qui ne sont pas des nombres
+            # Événements par jour et par créneau (cellules indexées une seule fois par document)
+            events_data['users'][user_name] = {
+                'days': document.user_events(user_id, days_to_extract)
+            }
             
             # Calculer des statistiques
             events_count = 0
@@ -164,14 +85,14 @@ class EventExtractor(ExtractorBase):
         Extrait les événements du planning HTML pour tous les utilisateurs
         
         Args:
-            html_content (str): Contenu HTML brut
+            html_content (str|PlanningDocument): Contenu HTML brut ou document déjà analysé
             limit_to_first_user (bool): Si True, extrait seulement pour le premier utilisateur
             extract_first_line_only (bool): Si True, extrait seulement les événements du matin
             
         Returns:
             dict: Informations sur les événements par utilisateur et par jour
         """
-        soup = cls.create_soup(html_content)
+        document = cls.get_document(html_content)
         
         # Structure pour stocker les résultats
         events_data = {
@@ -182,16 +103,16 @@ class EventExtractor(ExtractorBase):
         
         try:
             # Extraire d'abord la liste complète des utilisateurs
-            all_users = UserExtractor.extract_users(html_content)
+            all_users = document.users
             
             # Limiter aux utilisateurs qu'on va traiter
             target_users = all_users[:1] if limit_to_first_user else all_users
             
             # Pour chaque utilisateur cible
             for user_idx, user_name in enumerate(target_users):
-                # Extraire les événements spécifiques à cet utilisateur
+                # Extraire les événements spécifiques à cet utilisateur (même document)
                 user_data = cls.extract_specific_days(
-                    html_content, 
+                    document, 
                     days_to_extract=None,  # Tous les jours
                     user_index=user_idx
                 )
@@ -222,6 +143,93 @@ class EventExtractor(ExtractorBase):
         
         return events_data
 
+    @classmethod
+    def extract_team(cls, html_content, days=None, slots=TIME_SLOT_NAMES):
+        """
+        Extrait les événements de toute l'équipe en un seul passage
+        
+        Les blocs tbody (un par utilisateur) sont parcourus une fois et les cellules
+        proviennent de l'index par jeton de classe du document: le coût est
+        linéaire en nombre de cellules, quel que soit le nombre d'utilisateurs.
+        Seuls les événements renseignés sont conservés; les week-ends se déduisent
+        des jours de la semaine de la période.
+        
+        Args:
+            html_content (str|PlanningDocument): Contenu HTML brut ou document déjà analysé
+            days (list): Jours à extraire, ou None pour tous
+            slots (iterable): Créneaux à extraire parmi 'morning', 'day' et 'evening'
+            
+        Returns:
+            dict: `period` (mois, année, jours, jours de la semaine), `slots`,
+                `users` (liste de {'name', 'user_id', 'days': {jour: {créneau: événement}}},
+                triée par nom) et `summary`
+            
+        Raises:
+            ValueError: Si un créneau demandé est inconnu
+        """
+        slots = list(slots)
+        unknown_slots = [slot for slot in slots if slot not in TIME_SLOT_NAMES]
+        if unknown_slots:
+            raise ValueError(f"Créneaux inconnus: {', '.join(unknown_slots)}")
+        
+        if days is not None:
+            days = {int(day) for day in days}
+        
+        document = cls.get_document(html_content)
+        dates_info = document.dates
+        
+        team = {
+            'period': {
+                'month': dates_info.get('month'),
+                'year': dates_info.get('year'),
+                'days': [day for day in dates_info.get('days', []) if days is None or day in days],
+                'weekdays': dates_info.get('weekdays', [])
+            },
+            'slots': slots,
+            'users': [],
+            'summary': {}
+        }
+        
+        seen = set()
+        for row in document.user_rows:
+            # Même règle que la liste des utilisateurs: un nom n'apparaît qu'une fois
+            if row['name'] in seen:
+                continue
+            seen.add(row['name'])
+            
+            user_days = {}
+            if row['user_id']:
+                for day, day_data in document.user_events(row['user_id'], days).items():
+                    compact_day = {
+                        slot: cls._compact_event(day_data[slot])
+                        for slot in slots
+                        if slot in day_data and cls._is_team_event(day_data[slot])
+                    }
+                    if compact_day:
+                        user_days[day] = compact_day
+            
+            team['users'].append({'name': row['name'], 'user_id': row['user_id'], 'days': user_days})
+        
+        team['users'].sort(key=lambda user: user['name'])
+        team['summary'] = cls._calculate_events_summary(
+            {user['name']: user for user in team['users']}
+        )
+        
+        return team
+    
+    @staticmethod
+    def _is_team_event(event_info):
+        """Indique si un événement figure dans l'extraction d'équipe (ni vide, ni simple week-end)"""
+        if event_info.get('is_empty', True):
+            return False
+        # Une cellule de week-end sans contenu ni commentaire n'apporte rien à la grille
+        return event_info.get('type') != 'weekend' or bool(event_info.get('content') or event_info.get('comment'))
+    
+    @staticmethod
+    def _compact_event(event_info):
+        """Représentation compacte d'un événement: champs renseignés uniquement"""
+        return {field: event_info[field] for field in COMPACT_EVENT_FIELDS if event_info.get(field)}
+
     @classmethod
     def debug_cell(cls, cell, day_index=None):
         """
@@ -259,14 +267,14 @@ class EventExtractor(ExtractorBase):
         Fonction de débogage pour analyser un jour spécifique
         
         Args:
-            html_content (str): Contenu HTML brut
+            html_content (str|PlanningDocument): Contenu HTML brut ou document déjà analysé
             day_to_debug (int): Jour à déboguer
             user_index (int): Indice de l'utilisateur (0 par défaut)
             
         Returns:
             dict: Informations détaillées sur le jour
         """
-        soup = cls.create_soup(html_content)
+        soup = cls.get_document(html_content).soup
         debug_info = {'day': day_to_debug, 'cells_found': 0, 'cell_details': []}
         
         try:
@@ -0,0 +1,199 @@
+# app/services/teamplanning/extraction_cache.py
+"""
+Cache des résultats d'extraction Netplanning, indexé par (content_hash, extraction, paramètres).
+
+Deux niveaux:
+- un LRU en mémoire, propre au processus (TEAMPLANNING_EXTRACTION_CACHE_SIZE entrées)
+- la table `planning_extraction_cache`, partagée entre processus et redémarrages
+
+Le contenu d'un planning brut étant identifié par son SHA-256, et la clé des
+paramètres incluant la version du code d'extraction (EXTRACTION_VERSION) et le
+backend de parsing, une entrée ne peut pas devenir fausse: un déploiement qui
+corrige une extraction ou un changement de TEAMPLANNING_HTML_PARSER produit de
+nouvelles clés. L'arrivée d'un nouveau RawPlanning supprime les entrées des
+autres contenus, devenues inutiles.
+"""
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from threading import Lock
+from flask import current_app, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.models.planning import RawPlanning, PlanningExtractionCache
+from app.services.teamplanning.extractor_base import EXTRACTION_VERSION, ExtractorBase
+from app.utils.sql_query_utils import insert_ignoring_conflicts
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_SIZE = 64
+
+
+def make_params_key(params, parser=None):
+    """
+    Empreinte stable des paramètres d'une extraction
+
+    Inclut la version du code d'extraction et le backend de parsing effectif: les
+    résultats calculés par un autre code ou un autre parser ne sont pas réutilisés.
+
+    Args:
+        params (dict): Paramètres sérialisables en JSON
+        parser (str): Backend de parsing, ou None pour TEAMPLANNING_HTML_PARSER
+
+    Returns:
+        str: SHA-256 hexadécimal du JSON normalisé (clés triées)
+    """
+    key = {
+        'params': params or {},
+        'version': EXTRACTION_VERSION,
+        'parser': ExtractorBase.get_parser_backend(parser),
+    }
+    normalized = json.dumps(key, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class ExtractionCache:
+    """Cache à deux niveaux des résultats d'extraction d'un planning"""
+
+    _memory = OrderedDict()
+    _lock = Lock()
+
+    @staticmethod
+    def _memory_size():
+        """Nombre maximal d'entrées du niveau mémoire"""
+        if has_app_context():
+            return current_app.config.get('TEAMPLANNING_EXTRACTION_CACHE_SIZE', DEFAULT_MEMORY_SIZE)
+        return DEFAULT_MEMORY_SIZE
+
+    @classmethod
+    def _remember(cls, key, result):
+        """Ajoute une entrée au niveau mémoire en évinçant la moins récemment utilisée"""
+        with cls._lock:
+            cls._memory[key] = result
+            cls._memory.move_to_end(key)
+            while len(cls._memory) > cls._memory_size():
+                cls._memory.popitem(last=False)
+
+    @staticmethod
+    def _load(content_hash, extractor, params_key):
+        """
+        Lit une entrée du niveau persistant (None si absente ou table indisponible)
+
+        La lecture se fait sur une connexion dédiée: une erreur n'annule pas la
+        transaction de la session de la requête.
+        """
+        table = PlanningExtractionCache.__table__
+        try:
+            with db.engine.connect() as connection:
+                result = connection.execute(
+                    select(table.c.result).where(
+                        table.c.content_hash == content_hash,
+                        table.c.extractor == extractor,
+                        table.c.params_key == params_key
+                    )
+                ).scalar()
+        except SQLAlchemyError as e:
+            logger.warning("Cache d'extraction persistant indisponible: %s", e)
+            return None
+        return json.loads(result) if result is not None else None
+
+    @staticmethod
+    def _store(content_hash, extractor, params_key, result):
+        """
+        Écrit une entrée dans le niveau persistant (une écriture concurrente est ignorée)
+
+        L'écriture est validée dans une transaction dédiée, sans valider ni annuler
+        les modifications en attente dans la session de la requête.
+        """
+        statement = insert_ignoring_conflicts(PlanningExtractionCache.__table__, bind=db.engine).values(
+            content_hash=content_hash,
+            extractor=extractor,
+            params_key=params_key,
+            result=json.dumps(result)
+        ).on_conflict_do_nothing(index_elements=['content_hash', 'extractor', 'params_key'])
+
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(statement)
+        except SQLAlchemyError as e:
+            logger.warning("Écriture du cache d'extraction impossible: %s", e)
+
+    @classmethod
+    def get_or_compute(cls, content_hash, extractor, params, compute):
+        """
+        Retourne le résultat d'une extraction, en ne le calculant qu'en cas d'absence
+
+        Le résultat renvoyé est partagé entre les appels: il ne doit pas être modifié.
+
+        Args:
+            content_hash (str): RawPlanning.content_hash du planning extrait
+            extractor (str): Nom de l'extraction (ex: 'users', 'dates', 'team')
+            params (dict): Paramètres de l'extraction, sérialisables en JSON
+            compute (callable): Fonction sans argument produisant un résultat sérialisable en JSON
+
+        Returns:
+            Résultat de l'extraction
+        """
+        params_key = make_params_key(params)
+        key = (content_hash, extractor, params_key)
+
+        with cls._lock:
+            if key in cls._memory:
+                cls._memory.move_to_end(key)
+                return cls._memory[key]
+
+        result = cls._load(content_hash, extractor, params_key)
+        if result is None:
+            result = compute()
+            cls._store(content_hash, extractor, params_key, result)
+
+        cls._remember(key, result)
+        return result
+
+    @classmethod
+    def clear_memory(cls, keep_hash=None):
+        """
+        Vide le niveau mémoire
+
+        Args:
+            keep_hash (str): content_hash dont les entrées sont conservées (None = tout vider)
+        """
+        with cls._lock:
+            for key in [key for key in cls._memory if key[0] != keep_hash]:
+                del cls._memory[key]
+
+    @classmethod
+    def invalidate(cls, keep_hash=None):
+        """
+        Supprime les entrées des deux niveaux, sauf celles d'un contenu donné
+
+        Args:
+            keep_hash (str): content_hash à conserver (None = tout supprimer)
+
+        Returns:
+            int: Nombre d'entrées persistantes supprimées
+        """
+        cls.clear_memory(keep_hash)
+
+        query = PlanningExtractionCache.query
+        if keep_hash is not None:
+            query = query.filter(PlanningExtractionCache.content_hash != keep_hash)
+        deleted = query.delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+
+@event.listens_for(RawPlanning, 'after_insert')
+def _invalidate_extraction_cache(mapper, connection, target):
+    """Un nouveau planning brut rend obsolètes les résultats des contenus précédents"""
+    ExtractionCache.clear_memory(keep_hash=target.content_hash)
+
+    # Même transaction que l'insertion: la suppression est annulée avec elle
+    table = PlanningExtractionCache.__table__
+    try:
+        with connection.begin_nested():
+            connection.execute(table.delete().where(table.c.content_hash != target.content_hash))
+    except SQLAlchemyError as e:
+        logger.warning("Invalidation du cache d'extraction persistant impossible: %s", e)
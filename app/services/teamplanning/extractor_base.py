@@ -1,9 +1,60 @@
 # app/services/teamplanning/extractor_base.py
 """
 Classe de base et utilitaires pour l'extraction de données Netplanning
+
+Le backend de parsing HTML est choisi par la configuration TEAMPLANNING_HTML_PARSER:
+- `html.parser`: parser pur Python de la bibliothèque standard (toujours disponible)
+- `lxml`: parser C de lxml, nettement plus rapide sur les plannings volumineux
+Les deux produisent le même arbre BeautifulSoup pour les pages Netplanning, donc
+des extractions identiques. Si lxml n'est pas installé, html.parser est utilisé.
 """
 
+import logging
 from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+# Backends de parsing: nom de configuration -> fonctionnalité demandée à BeautifulSoup
+PARSER_BACKENDS = {
+    'html.parser': 'html.parser',
+    'lxml': 'lxml',
+}
+
+DEFAULT_PARSER_BACKEND = 'html.parser'
+
+# Créneaux horaires d'une journée, dans l'ordre des lignes d'un utilisateur
+TIME_SLOT_NAMES = ('morning', 'day', 'evening')
+
+# Version du code d'extraction, incluse dans les clés du cache d'extraction:
+# à incrémenter à chaque correction qui change le résultat d'une extraction
+EXTRACTION_VERSION = 1
+
+
+def register_parser_backend(name, features):
+    """
+    Déclare un backend de parsing supplémentaire
+    
+    Args:
+        name (str): Nom utilisable dans TEAMPLANNING_HTML_PARSER
+        features (str): Fonctionnalité de constructeur d'arbre BeautifulSoup (ex: 'html5lib')
+    """
+    PARSER_BACKENDS[name] = features
+
+
+def is_parser_available(name):
+    """
+    Indique si un backend de parsing est déclaré et installé
+    
+    Args:
+        name (str): Nom du backend
+        
+    Returns:
+        bool: True si BeautifulSoup dispose du constructeur correspondant
+    """
+    features = PARSER_BACKENDS.get(name)
+    return features is not None and builder_registry.lookup(features) is not None
 
 class ExtractorBase:
     """
@@ -11,17 +62,63 @@ class ExtractorBase:
     """
     
     @staticmethod
-    def create_soup(html_content):
+    def get_parser_backend(parser=None):
+        """
+        Détermine le backend de parsing à utiliser
+        
+        Args:
+            parser (str): Backend demandé explicitement, ou None pour la configuration
+            
+        Returns:
+            str: Nom d'un backend déclaré et installé
+            
+        Raises:
+            ValueError: Si le backend demandé n'est pas déclaré
+        """
+        if parser is None:
+            parser = DEFAULT_PARSER_BACKEND
+            if has_app_context():
+                parser = current_app.config.get('TEAMPLANNING_HTML_PARSER', DEFAULT_PARSER_BACKEND)
+        
+        if parser not in PARSER_BACKENDS:
+            raise ValueError(f"Backend de parsing inconnu: {parser} (disponibles: {', '.join(PARSER_BACKENDS)})")
+        
+        if not is_parser_available(parser):
+            logger.warning("Backend de parsing %s non installé, utilisation de %s", parser, DEFAULT_PARSER_BACKEND)
+            return DEFAULT_PARSER_BACKEND
+        
+        return parser
+    
+    @staticmethod
+    def create_soup(html_content, parser=None):
         """
         Crée un objet BeautifulSoup à partir du contenu HTML
         
         Args:
             html_content (str): Contenu HTML brut
+            parser (str): Backend de parsing, ou None pour TEAMPLANNING_HTML_PARSER
             
         Returns:
             BeautifulSoup: Objet BeautifulSoup pour le parsing
         """
-        return BeautifulSoup(html_content, 'html.parser')
+        backend = ExtractorBase.get_parser_backend(parser)
+        return BeautifulSoup(html_content, PARSER_BACKENDS[backend])
+    
+    @staticmethod
+    def get_document(source, parser=None):
+        """
+        Retourne le document analysé correspondant à une source
+        
+        Args:
+            source (str|PlanningDocument): Contenu HTML brut ou document déjà analysé
+            parser (str): Backend de parsing pour du HTML brut (None = configuration)
+            
+        Returns:
+            PlanningDocument: Document partagé entre les extracteurs
+        """
+        # Import local: planning_document dépend des extracteurs
+        from app.services.teamplanning.planning_document import PlanningDocument
+        return PlanningDocument.of(source, parser)
     
     @staticmethod
     def find_table_and_sections(soup):
@@ -0,0 +1,223 @@
+# app/services/teamplanning/netplanning_client.py
+"""
+Client HTTP de Netplanning.
+
+Une seule session `requests` est partagée par le processus: son pool de
+connexions garde la connexion TLS ouverte d'une récupération à l'autre, et les
+erreurs transitoires (connexion, 502/503/504) sont retentées avec un délai
+croissant. Quand le serveur fournit un ETag ou une date Last-Modified, la
+récupération suivante avec le même cookie est conditionnelle: une réponse 304
+évite de télécharger à nouveau la page. Le corps est lu par blocs et haché au
+fil de la lecture.
+"""
+import hashlib
+import logging
+from collections import OrderedDict
+from http.cookiejar import DefaultCookiePolicy
+from threading import Lock
+import requests
+from flask import current_app, has_app_context
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+NETPLANNING_URL = 'https://www.netplanning.fr/'
+
+# Headers pour simuler un navigateur
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'fr,fr-FR;q=0.8,en-US;q=0.5,en;q=0.3',
+    'Referer': 'https://www.netplanning.fr/',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Cache-Control': 'max-age=0',
+}
+
+DEFAULTS = {
+    'NETPLANNING_URL': NETPLANNING_URL,
+    'NETPLANNING_TIMEOUT': 10,
+    'NETPLANNING_RETRIES': 3,
+    'NETPLANNING_POOL_SIZE': 4,
+}
+
+# Taille des blocs lus sur le flux de la réponse
+CHUNK_SIZE = 64 * 1024
+
+# Nombre de cookies dont les validateurs (ETag, Last-Modified) sont conservés
+MAX_VALIDATORS = 32
+
+
+class _RejectCookiesPolicy(DefaultCookiePolicy):
+    """La session partagée ne conserve aucun cookie reçu: chaque requête porte celui de l'utilisateur"""
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+def _setting(name):
+    """Valeur de configuration du client (configuration Flask, sinon valeur par défaut)"""
+    if has_app_context():
+        return current_app.config.get(name, DEFAULTS[name])
+    return DEFAULTS[name]
+
+
+class NetplanningClient:
+    """Récupération de la page de planning Netplanning"""
+
+    _session = None
+    _session_lock = Lock()
+
+    # Validateurs de la dernière réponse par cookie (haché): {empreinte: (etag, last_modified, content_hash)}
+    _validators = OrderedDict()
+    _validators_lock = Lock()
+
+    @classmethod
+    def get_session(cls):
+        """
+        Session partagée, créée à la première utilisation
+
+        Returns:
+            requests.Session: Session avec pool de connexions et retentatives
+        """
+        with cls._session_lock:
+            if cls._session is None:
+                retry = Retry(
+                    total=_setting('NETPLANNING_RETRIES'),
+                    backoff_factor=0.5,
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=frozenset(['GET']),
+                    raise_on_status=False
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=_setting('NETPLANNING_POOL_SIZE'),
+                    max_retries=retry
+                )
+
+                session = requests.Session()
+                session.headers.update(BROWSER_HEADERS)
+                session.cookies.set_policy(_RejectCookiesPolicy())
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                cls._session = session
+            return cls._session
+
+    @classmethod
+    def reset(cls):
+        """Ferme la session partagée et oublie les validateurs (nouvelle configuration, tests)"""
+        with cls._session_lock:
+            if cls._session is not None:
+                cls._session.close()
+                cls._session = None
+        with cls._validators_lock:
+            cls._validators.clear()
+
+    @staticmethod
+    def _cookie_key(cookie):
+        """Empreinte du cookie: la valeur elle-même n'est jamais conservée"""
+        return hashlib.sha256(cookie.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _remember_validators(cls, cookie_key, response, content_hash):
+        """Conserve l'ETag et la date Last-Modified de la réponse, s'il y en a"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+
+        with cls._validators_lock:
+            if not etag and not last_modified:
+                cls._validators.pop(cookie_key, None)
+                return
+            cls._validators[cookie_key] = (etag, last_modified, content_hash)
+            cls._validators.move_to_end(cookie_key)
+            while len(cls._validators) > MAX_VALIDATORS:
+                cls._validators.popitem(last=False)
+
+    @staticmethod
+    def _read_body(response):
+        """
+        Lit le corps de la réponse par blocs en le hachant au fil de la lecture
+
+        Le hash doit être celui de PlanningParser.compute_content_hash (SHA-256 du
+        texte encodé en UTF-8): le hash du flux n'est utilisé tel quel que si le
+        corps est de l'UTF-8 valide, sinon il est recalculé sur le texte décodé.
+
+        Returns:
+            tuple: (contenu décodé, SHA-256 hexadécimal)
+        """
+        digest = hashlib.sha256()
+        chunks = []
+        for chunk in response.iter_content(CHUNK_SIZE):
+            digest.update(chunk)
+            chunks.append(chunk)
+        body = b''.join(chunks)
+
+        encoding = response.encoding or 'utf-8'
+        if encoding.lower().replace('_', '-') in ('utf-8', 'utf8'):
+            try:
+                return body.decode('utf-8'), digest.hexdigest()
+            except UnicodeDecodeError:
+                pass
+
+        content = body.decode(encoding, errors='replace')
+        return content, hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def fetch(cls, cookie, conditional=True):
+        """
+        Récupère la page de planning avec le cookie de session d'un utilisateur
+
+        Args:
+            cookie (str): Valeur du cookie PHPSESSID
+            conditional (bool): Envoie If-None-Match / If-Modified-Since si la
+                réponse précédente pour ce cookie fournissait des validateurs
+
+        Returns:
+            dict: {
+                'status_code': code HTTP,
+                'not_modified': True si la page n'a pas changé (304),
+                'content': HTML décodé (None si 304 ou erreur),
+                'content_hash': SHA-256 du contenu (celui de la réponse précédente si 304)
+            }
+
+        Raises:
+            requests.exceptions.RequestException: Erreur de connexion après les retentatives
+        """
+        cookie_key = cls._cookie_key(cookie)
+        headers = {}
+        validators = None
+        if conditional:
+            with cls._validators_lock:
+                validators = cls._validators.get(cookie_key)
+            if validators:
+                etag, last_modified, _ = validators
+                if etag:
+                    headers['If-None-Match'] = etag
+                if last_modified:
+                    headers['If-Modified-Since'] = last_modified
+
+        result = {'status_code': None, 'not_modified': False, 'content': None, 'content_hash': None}
+
+        with cls.get_session().get(
+            _setting('NETPLANNING_URL'),
+            cookies={'PHPSESSID': cookie},  # Le nom peut varier, mais PHPSESSID est courant pour PHP
+            headers=headers,
+            timeout=_setting('NETPLANNING_TIMEOUT'),
+            stream=True
+        ) as response:
+            result['status_code'] = response.status_code
+
+            if response.status_code == 304 and validators:
+                result['not_modified'] = True
+                result['content_hash'] = validators[2]
+                return result
+
+            if response.status_code != 200:
+                return result
+
+            result['content'], result['content_hash'] = cls._read_body(response)
+            cls._remember_validators(cookie_key, response, result['content_hash'])
+
+        return result
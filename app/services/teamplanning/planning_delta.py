@@ -0,0 +1,195 @@
+# app/services/teamplanning/planning_delta.py
+"""
+Détection des changements entre deux plannings Netplanning successifs.
+
+Un planning récupéré diffère souvent du précédent par quelques octets seulement
+(horodatage, une cellule modifiée): la comparaison du SHA-256 complet ne dit pas
+ce qui a changé. Chaque bloc utilisateur (tbody) et chacun de ses jours reçoit
+une empreinte, enregistrée dans la table `planning_user_blocks`; comparer deux
+plannings revient alors à comparer deux jeux d'empreintes, sans ré-analyser le
+planning précédent.
+"""
+import json
+import logging
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.models.planning import RawPlanning, PlanningUserBlock
+from app.services.teamplanning.planning_document import PlanningDocument
+
+logger = logging.getLogger(__name__)
+
+
+class PlanningDelta:
+    """Empreintes des blocs utilisateur et comparaison de deux plannings bruts"""
+
+    @staticmethod
+    def load_blocks(raw_planning_id):
+        """
+        Lit les empreintes enregistrées d'un planning brut
+
+        Args:
+            raw_planning_id (int): ID du planning brut
+
+        Returns:
+            dict: Empreintes au format de PlanningDocument.user_blocks, ou None si absentes
+        """
+        rows = PlanningUserBlock.query.filter_by(raw_planning_id=raw_planning_id).all()
+        if not rows:
+            return None
+        return {
+            row.user_key: {
+                'name': row.user_name,
+                'block_hash': row.block_hash,
+                'day_hashes': row.get_day_hashes()
+            }
+            for row in rows
+        }
+
+    @staticmethod
+    def save_blocks(raw_planning_id, blocks):
+        """
+        Enregistre les empreintes d'un planning brut (insertion en masse, validée)
+
+        Args:
+            raw_planning_id (int): ID du planning brut
+            blocks (dict): Empreintes au format de PlanningDocument.user_blocks
+        """
+        if not blocks:
+            return
+        db.session.execute(insert(PlanningUserBlock.__table__), [
+            {
+                'raw_planning_id': raw_planning_id,
+                'user_key': key,
+                'user_name': block['name'],
+                'block_hash': block['block_hash'],
+                'day_hashes': json.dumps(block['day_hashes'])
+            }
+            for key, block in blocks.items()
+        ])
+        db.session.commit()
+
+    @classmethod
+    def blocks_for(cls, raw_planning, document=None):
+        """
+        Empreintes d'un planning brut, calculées et enregistrées si nécessaire
+
+        Args:
+            raw_planning (RawPlanning): Planning brut
+            document (PlanningDocument): Document déjà analysé du planning (optionnel)
+
+        Returns:
+            dict: Empreintes par utilisateur, ou None si le contenu a été purgé sans empreintes
+        """
+        blocks = cls.load_blocks(raw_planning.id)
+        if blocks is not None:
+            return blocks
+
+        if document is None:
+            if raw_planning.raw_content is None:
+                return None
+            document = PlanningDocument(raw_planning.raw_content)
+
+        blocks = document.user_blocks
+        cls.save_blocks(raw_planning.id, blocks)
+        return blocks
+
+    @staticmethod
+    def compare(previous_blocks, current_blocks):
+        """
+        Compare les empreintes de deux plannings
+
+        Args:
+            previous_blocks (dict): Empreintes du planning précédent
+            current_blocks (dict): Empreintes du nouveau planning
+
+        Returns:
+            dict: {
+                'changed_users': [{'name', 'user_key', 'days': [jours modifiés]}] triés par nom,
+                'added_users': [noms], 'removed_users': [noms], 'unchanged_users': [noms]
+            }
+        """
+        changed, unchanged, added = [], [], []
+
+        for key, block in current_blocks.items():
+            previous = previous_blocks.get(key)
+            if previous is None:
+                added.append(block['name'])
+                continue
+            if previous['block_hash'] == block['block_hash']:
+                unchanged.append(block['name'])
+                continue
+
+            # Un bloc modifié sans jour modifié (nom, ligne d'en-tête...) a une liste de jours vide
+            old_days, new_days = previous['day_hashes'], block['day_hashes']
+            days = sorted(
+                int(day) for day in set(old_days) | set(new_days)
+                if old_days.get(day) != new_days.get(day)
+            )
+            changed.append({'name': block['name'], 'user_key': key, 'days': days})
+
+        removed = [block['name'] for key, block in previous_blocks.items() if key not in current_blocks]
+
+        return {
+            'changed_users': sorted(changed, key=lambda user: user['name']),
+            'added_users': sorted(added),
+            'removed_users': sorted(removed),
+            'unchanged_users': sorted(unchanged)
+        }
+
+    @staticmethod
+    def reusable_names(delta):
+        """
+        Noms des personnes dont les entrées du planning précédent peuvent être recopiées
+
+        Les blocs sont comparés par identifiant Netplanning mais les entrées sont
+        enregistrées par nom: un nom porté aussi par un utilisateur modifié, ajouté
+        ou retiré n'est pas réutilisable.
+
+        Args:
+            delta (dict): Résultat de compare() ou detect()
+
+        Returns:
+            set: Noms dont tous les blocs sont inchangés
+        """
+        if not delta:
+            return set()
+        excluded = {user['name'] for user in delta.get('changed_users', [])}
+        excluded.update(delta.get('added_users', []), delta.get('removed_users', []))
+        return set(delta.get('unchanged_users', [])) - excluded
+
+    @classmethod
+    def detect(cls, raw_planning, document=None):
+        """
+        Changements d'un planning brut par rapport au planning récupéré juste avant
+
+        Args:
+            raw_planning (RawPlanning): Nouveau planning brut
+            document (PlanningDocument): Document déjà analysé du nouveau planning (optionnel)
+
+        Returns:
+            dict: Résultat de compare() complété des IDs 'raw_planning_id' et
+                'previous_raw_planning_id', ou None s'il n'y a rien à comparer
+        """
+        previous = RawPlanning.query.filter(
+            RawPlanning.id != raw_planning.id,
+            RawPlanning.created_at <= raw_planning.created_at
+        ).order_by(RawPlanning.created_at.desc(), RawPlanning.id.desc()).first()
+        if previous is None:
+            return None
+
+        try:
+            current_blocks = cls.blocks_for(raw_planning, document)
+            previous_blocks = cls.blocks_for(previous)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.warning("Détection des changements du planning impossible: %s", e)
+            return None
+
+        if current_blocks is None or previous_blocks is None:
+            return None
+
+        delta = cls.compare(previous_blocks, current_blocks)
+        delta['raw_planning_id'] = raw_planning.id
+        delta['previous_raw_planning_id'] = previous.id
+        return delta
@@ -0,0 +1,299 @@
+# app/services/teamplanning/planning_document.py
+"""
+Document Netplanning analysé une seule fois et partagé entre les extracteurs.
+
+Le HTML d'un planning mensuel pèse plusieurs mégaoctets: chaque extracteur
+reconstruisait son propre arbre BeautifulSoup. PlanningDocument analyse le HTML
+à la première demande puis expose paresseusement (et met en cache):
+- les lignes utilisateur (nom, identifiant Netplanning) et la liste triée des noms
+- les informations de dates
+- l'index des cellules par utilisateur, créneau et jour
+- les événements par utilisateur
+- les empreintes des blocs utilisateur (détection des changements entre deux plannings)
+
+Les cellules sont indexées par jeton de classe (ID utilisateur, ID de créneau,
+numéro du jour...) en un seul parcours du document: extraire tous les jours de
+tous les utilisateurs reste linéaire en nombre de cellules.
+"""
+import hashlib
+from functools import cached_property
+from threading import Lock
+from app.services.teamplanning.extractor_base import ExtractorBase, TIME_SLOT_NAMES
+from app.services.teamplanning.user_extractor import UserExtractor
+from app.services.teamplanning.date_extractor import DateExtractor
+from app.services.teamplanning.event_extractor import EventExtractor
+
+# Identifiants de créneaux observés, utilisés si le document n'en contient pas assez
+DEFAULT_TIME_SLOT_IDS = ('512719', '512720', '512721')
+
+
+def _is_user_id(token):
+    """Les identifiants utilisateur sont des nombres d'au moins 5 chiffres"""
+    return token.isdigit() and len(token) >= 5
+
+
+def _is_slot_id(token, user_id):
+    """Les identifiants de créneau sont des nombres d'au moins 6 chiffres"""
+    return token.isdigit() and token != user_id and len(token) >= 6
+
+
+def _cell_day(tokens):
+    """Premier jeton de classe correspondant à un jour du mois (1 à 31), ou None"""
+    for token in tokens:
+        if token.isdigit() and 1 <= int(token) <= 31:
+            return int(token)
+    return None
+
+
+class PlanningDocument:
+    """
+    Planning Netplanning analysé une seule fois, avec accès paresseux aux données
+    """
+
+    # Dernier document construit pour un planning brut (voir for_raw_planning)
+    _latest = None
+    _latest_lock = Lock()
+
+    def __init__(self, html_content, parser=None):
+        """
+        Args:
+            html_content (str): Contenu HTML brut
+            parser (str): Backend de parsing (None = configuration TEAMPLANNING_HTML_PARSER)
+        """
+        self.html_content = html_content
+        self.parser = parser
+        self._cell_indexes = {}
+        self._user_events = {}
+
+    @classmethod
+    def of(cls, source, parser=None):
+        """
+        Retourne le document correspondant à une source
+
+        Args:
+            source (str|PlanningDocument): Contenu HTML brut ou document déjà analysé
+            parser (str): Backend de parsing pour du HTML brut (None = configuration)
+
+        Returns:
+            PlanningDocument: Le document lui-même, ou un nouveau document pour du HTML
+        """
+        if isinstance(source, cls):
+            return source
+        return cls(source, parser)
+
+    @classmethod
+    def for_raw_planning(cls, raw_planning):
+        """
+        Retourne le document d'un planning brut, partagé entre les requêtes successives
+
+        Les routes Teamplanning extraient tour à tour utilisateurs, dates, métadonnées
+        et événements du même planning: le dernier document est conservé pour que
+        le HTML ne soit analysé qu'une fois.
+
+        Args:
+            raw_planning (RawPlanning): Planning brut
+
+        Returns:
+            PlanningDocument: Document analysé (paresseusement)
+        """
+        with cls._latest_lock:
+            if cls._latest is None or cls._latest[0] != raw_planning.content_hash:
+                cls._latest = (raw_planning.content_hash, cls(raw_planning.raw_content))
+            return cls._latest[1]
+
+    @cached_property
+    def soup(self):
+        """Arbre BeautifulSoup du document (construit à la première demande)"""
+        return ExtractorBase.create_soup(self.html_content, self.parser)
+
+    @cached_property
+    def sections(self):
+        """Tuple (tableau, thead, liste des tbody) du tableau principal"""
+        return ExtractorBase.find_table_and_sections(self.soup)
+
+    @cached_property
+    def user_rows(self):
+        """
+        Lignes utilisateur dans l'ordre du document
+
+        Returns:
+            list: Dictionnaires {'name', 'user_id', 'tbody'} (user_id peut être None)
+        """
+        table, _, tbodies = self.sections
+        if not table or not tbodies:
+            return []
+
+        rows = []
+        # Le premier tbody contient les en-têtes
+        for tbody in tbodies[1:]:
+            person_td = tbody.find('td', class_='nom_ress')
+            if not person_td:
+                continue
+
+            name = UserExtractor._extract_user_name(person_td)
+            if not name or not name.strip():
+                continue
+
+            user_id = next((token for token in person_td.get('class', []) if _is_user_id(token)), None)
+            rows.append({'name': name.strip(), 'user_id': user_id, 'tbody': tbody})
+
+        return rows
+
+    @cached_property
+    def users(self):
+        """Noms des utilisateurs, sans doublon, triés par ordre alphabétique"""
+        return sorted({row['name'] for row in self.user_rows})
+
+    @cached_property
+    def user_ids(self):
+        """Identifiant Netplanning par nom (première ligne portant un identifiant)"""
+        ids = {}
+        for row in self.user_rows:
+            if row['user_id']:
+                ids.setdefault(row['name'], row['user_id'])
+        return ids
+
+    @cached_property
+    def class_index(self):
+        """
+        Index des cellules par jeton de classe, construit en un seul parcours
+
+        Returns:
+            dict: {jeton: [cellules td portant ce jeton, dans l'ordre du document]}
+        """
+        index = {}
+        for cell in self.soup.find_all('td', class_=True):
+            # Un jeton répété dans l'attribut class ne doit indexer la cellule qu'une fois
+            for token in dict.fromkeys(cell.get('class', [])):
+                index.setdefault(token, []).append(cell)
+        return index
+
+    def cells_with_class(self, token):
+        """
+        Cellules portant un jeton de classe
+
+        Args:
+            token (str): Jeton de classe (ID utilisateur, ID de créneau, jour, couleur...)
+
+        Returns:
+            list: Cellules td dans l'ordre du document
+        """
+        return self.class_index.get(token, [])
+
+    @cached_property
+    def dates(self):
+        """Informations de dates (voir DateExtractor.extract_planning_dates)"""
+        return DateExtractor._parse_planning_dates(self)
+
+    @cached_property
+    def user_blocks(self):
+        """
+        Empreintes du bloc (tbody) de chaque utilisateur et de chacun de ses jours
+
+        La période (mois et année) entre dans les empreintes: deux blocs identiques
+        de deux mois différents ne sont pas confondus.
+
+        Returns:
+            dict: {clé (ID Netplanning, ou nom à défaut): {'name', 'block_hash', 'day_hashes': {jour (str): empreinte}}}
+        """
+        period = f"{self.dates.get('month')}/{self.dates.get('year')}|".encode('utf-8')
+
+        blocks = {}
+        for row in self.user_rows:
+            key = row['user_id'] or row['name']
+            if key in blocks:
+                continue
+
+            day_cells = {}
+            if row['user_id']:
+                index = self.cell_index(row['user_id'])
+                for slot_id in index['slot_ids']:
+                    for day, cell in index['cells'].get(slot_id, {}).items():
+                        day_cells.setdefault(str(day), []).append(str(cell))
+
+            blocks[key] = {
+                'name': row['name'],
+                'block_hash': hashlib.sha256(period + str(row['tbody']).encode('utf-8')).hexdigest(),
+                'day_hashes': {
+                    day: hashlib.sha256(period + ''.join(cells).encode('utf-8')).hexdigest()[:16]
+                    for day, cells in day_cells.items()
+                }
+            }
+
+        return blocks
+
+    def user_id(self, user_name):
+        """
+        Identifiant Netplanning d'un utilisateur
+
+        Args:
+            user_name (str): Nom tel que renvoyé par `users`
+
+        Returns:
+            str: Identifiant, ou None si l'utilisateur ou son identifiant est introuvable
+        """
+        return self.user_ids.get(user_name)
+
+    def cell_index(self, user_id):
+        """
+        Index des cellules d'un utilisateur par créneau et par jour
+
+        Args:
+            user_id (str): Identifiant Netplanning de l'utilisateur
+
+        Returns:
+            dict: {'slot_ids': [matin, journée, soir], 'cells': {slot_id: {jour: cellule}}}
+        """
+        if user_id in self._cell_indexes:
+            return self._cell_indexes[user_id]
+
+        found_slot_ids = []
+        cells = {}
+        for cell in self.cells_with_class(user_id):
+            tokens = cell.get('class', [])
+            day = _cell_day(tokens)
+            for token in tokens:
+                if not _is_slot_id(token, user_id):
+                    continue
+                if token not in found_slot_ids:
+                    found_slot_ids.append(token)
+                if day is not None:
+                    cells.setdefault(token, {})[day] = cell
+
+        # Hypothèse sur l'ordre: le plus petit ID pour le matin, le plus grand pour le soir
+        slot_ids = sorted(found_slot_ids)[:len(TIME_SLOT_NAMES)]
+        if len(slot_ids) < len(TIME_SLOT_NAMES):
+            slot_ids = list(DEFAULT_TIME_SLOT_IDS)
+
+        index = {'slot_ids': slot_ids, 'cells': cells}
+        self._cell_indexes[user_id] = index
+        return index
+
+    def user_events(self, user_id, days=None):
+        """
+        Événements d'un utilisateur, par jour et par créneau
+
+        Les informations de chaque cellule sont calculées une seule fois; le
+        dictionnaire renvoyé est une copie que l'appelant peut modifier.
+
+        Args:
+            user_id (str): Identifiant Netplanning de l'utilisateur
+            days (iterable): Jours à conserver, ou None pour tous
+
+        Returns:
+            dict: {jour (str): {créneau: informations de l'événement}}
+        """
+        if user_id not in self._user_events:
+            index = self.cell_index(user_id)
+            events = {}
+            for time_slot, slot_id in zip(TIME_SLOT_NAMES, index['slot_ids']):
+                for day, cell in index['cells'].get(slot_id, {}).items():
+                    events.setdefault(str(day), {})[time_slot] = EventExtractor._extract_event_info(cell)
+            self._user_events[user_id] = events
+
+        wanted = None if days is None else {str(day) for day in days}
+        return {
+            day: dict(slots)
+            for day, slots in self._user_events[user_id].items()
+            if wanted is None or day in wanted
+        }
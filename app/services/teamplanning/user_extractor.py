@@ -16,33 +16,13 @@ class UserExtractor(ExtractorBase):
         Extrait les noms des utilisateurs du HTML Netplanning
         
         Args:
-            html_content (str): Contenu HTML brut
+            html_content (str|PlanningDocument): Contenu HTML brut ou document déjà analysé
             
         Returns:
-            list: Liste des noms d'utilisateurs trouvés
+            list: Liste des noms d'utilisateurs trouvés, triée par ordre alphabétique
         """
-        soup = cls.create_soup(html_content)
-        users = []
-        
-        # Trouver le tableau principal
-        table, _, tbodies = cls.find_table_and_sections(soup)
-        
-        if not table or not tbodies:
-            return []
-        
-        # Parcourir tous les tbody (sauf le premier qui contient les en-têtes)
-        for tbody in tbodies[1:]:  # Ignorer le premier tbody
-            # Chercher le td qui contient le nom de la personne
-            person_td = tbody.find('td', class_='nom_ress')
-            
-            if person_td:
-                full_name = cls._extract_user_name(person_td)
-                
-                # Ajouter à la liste s'il n'est pas déjà présent et non vide
-                if full_name and full_name.strip() and full_name not in users:
-                    users.append(full_name.strip())
-        
-        return sorted(users)  # Trier par ordre alphabétique
+        # Le document parcourt les tbody (sauf le premier qui contient les en-têtes)
+        return list(cls.get_document(html_content).users)
     
     @staticmethod
     def _extract_user_name(user_td):
@@ -1,4 +1,6 @@
 # app/services/tricount/__init__.py
 
 from app.services.tricount.bank_statement_parser import SocieteGeneraleParser, N26Parser
-from app.services.tricount.auto_categorization import AutoCategorizationService
\ No newline at end of file
+from app.services.tricount.auto_categorization import AutoCategorizationService
+from app.services.tricount.rule_engine import RuleEngine
+from app.services.tricount.expense_search import ExpenseSearchService
@@ -1,5 +1,6 @@
 # app/services/tricount/auto_categorization.py
 from app.models.tricount import Expense, AutoCategorizationRule, PendingRuleApplication, ModificationSource
+from app.services.tricount.rule_engine import RuleEngine
 from app.utils.rename_helpers import apply_rule_rename
 from app.extensions import db
 from datetime import datetime
@@ -74,66 +75,74 @@ class AutoCategorizationService:
         pass
     
     @staticmethod
-    def apply_rules_to_expense(expense, respect_manual=True):
+    def apply_rules_to_expense(expense, respect_manual=True, rule_ids=None):
         """
         Applique les règles d'auto-catégorisation à une dépense
         
         Args:
             expense (Expense): Dépense à catégoriser
             respect_manual (bool): Si True, ne pas écraser les modifications manuelles
+            rule_ids (list): Règles correspondantes déjà calculées par le moteur (traitement par lot)
             
         Returns:
             dict: Résultat de l'application des règles
         """
-        # Récupérer toutes les règles
-        rules = AutoCategorizationRule.query.all()
+        # Récupérer uniquement les règles correspondantes via le moteur compilé
+        if rule_ids is None:
+            rule_ids = RuleEngine.get().match(expense)
+        rules_by_id = {}
+        if rule_ids:
+            rules_by_id = {
+                rule.id: rule
+                for rule in AutoCategorizationRule.query.filter(AutoCategorizationRule.id.in_(rule_ids)).all()
+            }
+        rules = [rules_by_id[rule_id] for rule_id in rule_ids if rule_id in rules_by_id]
         
         applied = False
         pending = False
         
         for rule in rules:
-            if rule.matches_expense(expense):
-                # Si la règle nécessite une confirmation, l'ajouter aux applications en attente
-                if rule.requires_confirmation:
-                    # Vérifier si cette règle n'est pas déjà en attente pour cette dépense
-                    existing = PendingRuleApplication.query.filter_by(
-                        rule_id=rule.id, 
-                        expense_id=expense.id
-                    ).first()
+            # Si la règle nécessite une confirmation, l'ajouter aux applications en attente
+            if rule.requires_confirmation:
+                # Vérifier si cette règle n'est pas déjà en attente pour cette dépense
+                existing = PendingRuleApplication.query.filter_by(
+                    rule_id=rule.id, 
+                    expense_id=expense.id
+                ).first()
                     
-                    if not existing:
-                        pending_application = PendingRuleApplication(
-                            rule_id=rule.id,
-                            expense_id=expense.id
-                        )
-                        db.session.add(pending_application)
-                        pending = True
-                else:
-                    # Appliquer directement les modifications selon les options activées
-                    if rule.apply_category and rule.category_id:
-                        # Ne pas écraser une catégorie définie manuellement
-                        if not (expense.category_modified_by == ModificationSource.MANUAL.value and respect_manual):
-                            expense.category_id = rule.category_id
-                            expense.category_modified_by = ModificationSource.AUTO_RULE.value
+                if not existing:
+                    pending_application = PendingRuleApplication(
+                        rule_id=rule.id,
+                        expense_id=expense.id
+                    )
+                    db.session.add(pending_application)
+                    pending = True
+            else:
+                # Appliquer directement les modifications selon les options activées
+                if rule.apply_category and rule.category_id:
+                    # Ne pas écraser une catégorie définie manuellement
+                    if not (expense.category_modified_by == ModificationSource.MANUAL.value and respect_manual):
+                        expense.category_id = rule.category_id
+                        expense.category_modified_by = ModificationSource.AUTO_RULE.value
                     
-                    if rule.apply_flag and rule.flag_id:
-                        # Ne pas écraser un flag défini manuellement
-                        if not (expense.flag_modified_by == ModificationSource.MANUAL.value and respect_manual):
-                            expense.flag_id = rule.flag_id
-                            expense.flag_modified_by = ModificationSource.AUTO_RULE.value
+                if rule.apply_flag and rule.flag_id:
+                    # Ne pas écraser un flag défini manuellement
+                    if not (expense.flag_modified_by == ModificationSource.MANUAL.value and respect_manual):
+                        expense.flag_id = rule.flag_id
+                        expense.flag_modified_by = ModificationSource.AUTO_RULE.value
                     
-                    if rule.apply_rename and rule.rename_pattern:
-                        # Ne pas renommer si modifié manuellement
-                        if not (expense.merchant_modified_by == ModificationSource.MANUAL.value and respect_manual):
-                            # Appliquer le renommage si configuré
-                            apply_rule_rename(expense, rule)
+                if rule.apply_rename and rule.rename_pattern:
+                    # Ne pas renommer si modifié manuellement
+                    if not (expense.merchant_modified_by == ModificationSource.MANUAL.value and respect_manual):
+                        # Appliquer le renommage si configuré
+                        apply_rule_rename(expense, rule)
                     
-                    # Enregistrer la relation entre la règle et la dépense
-                    rule.affected_expenses.append(expense)
-                    applied = True
+                # Enregistrer la relation entre la règle et la dépense
+                rule.affected_expenses.append(expense)
+                applied = True
                     
-                    # Sortir de la boucle après la première règle appliquée
-                    break
+                # Sortir de la boucle après la première règle appliquée
+                break
         
         if pending or applied:
             db.session.commit()
@@ -203,9 +212,15 @@ class AutoCategorizationService:
         # Récupérer les dépenses non catégorisées
         uncategorized = Expense.query.filter_by(category_id=None).all()
         
+        # Une seule passe du moteur compilé pour écarter les dépenses sans règle
+        matches = RuleEngine.get().match_batch(uncategorized)
+        
         count = 0
         for expense in uncategorized:
-            if AutoCategorizationService.apply_rules_to_expense(expense):
+            if expense.id not in matches:
+                continue
+            result = AutoCategorizationService.apply_rules_to_expense(expense, rule_ids=matches[expense.id])
+            if result['applied'] or result['pending']:
                 count += 1
         
         # Sauvegarder les modifications
@@ -247,9 +262,10 @@ class AutoCategorizationService:
         if not matching_expenses:
             return []
         
-        # Trouver les règles existantes qui correspondent à ces dépenses
+        # Trouver les règles existantes qui correspondent à ces dépenses (une seule passe)
         conflicts = []
         existing_rules = AutoCategorizationRule.query.all()
+        matches = RuleEngine.get().match_batch(matching_expenses)
         
         for rule in existing_rules:
             # Ignorer les règles avec la même destination (catégorie et flag)
@@ -258,10 +274,10 @@ class AutoCategorizationService:
                 continue
                 
             # Vérifier chaque dépense pour un conflit
-            conflict_expenses = []
-            for expense in matching_expenses:
-                if rule.matches_expense(expense):
-                    conflict_expenses.append(expense)
+            conflict_expenses = [
+                expense for expense in matching_expenses
+                if rule.id in matches.get(expense.id, ())
+            ]
                     
             # S'il y a des dépenses en conflit, ajouter à la liste des conflits
             if conflict_expenses:
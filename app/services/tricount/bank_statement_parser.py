@@ -1,8 +1,25 @@
 # app/services/tricount/bank_statement_parser.py
 import re
+import io
+import csv
+import decimal
+from io import StringIO
+from decimal import Decimal
 from datetime import datetime
 from app.utils.money_helpers import clean_amount_string
 
+# Motifs Société Générale compilés une seule fois à l'import du module
+SG_DATE_LINE = re.compile(r'^(\w+)\s+(\d+)\s+(\w+)\s+(\d{4})$')
+SG_CARD_LINE = re.compile(r'^CARTE\s+([^\s]+)\s+(\d{2}/\d{2})\s+(.+)$')
+SG_TRANSFER_RECEIVED_LINE = re.compile(r'^VIR\s+RECU\s+DE:\s+(.+)$')
+SG_TRANSFER_SENT_LINE = re.compile(r'^(VIR\s+PERM|VIR\s+INSTANTANE\s+EMIS)\s+POUR:\s+(.+)$')
+SG_DIRECT_DEBIT_LINE = re.compile(r'^PRELEVEMENT\s+EUROPEEN\s+(DE|POUR\s+CPTE\s+DE):\s*(.+)$')
+SG_MOTIF_LINE = re.compile(r'^Motif\s*:\s*(.+)$')
+SG_DEBIT_AMOUNT_LINE = re.compile(r'^moins-\s*([\d\s,]+)\s*€$')
+SG_CREDIT_AMOUNT_LINE = re.compile(r'^([\d\s,]+)\s*€$')
+SG_REF = re.compile(r'REF:\s+([^\s]+)')
+SG_MANDAT = re.compile(r'MANDAT\s+([^\s]+)')
+
 class SocieteGeneraleParser:
     """Parser pour les relevés de compte de Société Générale"""
     
@@ -11,6 +28,9 @@ class SocieteGeneraleParser:
         """
         Parse le texte copié depuis le relevé Société Générale et extrait les transactions
         
+        Les lignes sont tokenisées une seule fois, puis chaque ligne est aiguillée
+        vers son analyseur par une recherche en dictionnaire sur son premier mot.
+        
         Args:
             text (str): Texte brut du relevé bancaire
             
@@ -20,218 +40,190 @@ class SocieteGeneraleParser:
         transactions = []
         current_date = None
         
-        # Nettoyer le texte
-        text = text.strip()
-        
-        # Diviser en lignes
-        lines = text.split('\n')
+        # Nettoyer le texte et diviser en lignes (chaque ligne est nettoyée une seule fois)
+        lines = [line.strip() for line in text.strip().split('\n')]
+        line_count = len(lines)
+        handlers = SocieteGeneraleParser._LINE_HANDLERS
         
         i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # Rechercher une ligne de date
-            date_match = re.match(r'^(\w+)\s+(\d+)\s+(\w+)\s+(\d{4})$', line)
-            if date_match:
-                # Extraire et formater la date
-                day_name, day, month, year = date_match.groups()
-                month_num = SocieteGeneraleParser._convert_month_to_num(month)
-                current_date = datetime(int(year), month_num, int(day))
-                i += 1
-                continue
+        while i < line_count:
+            line = lines[i]
             
-            # Rechercher une ligne de transaction carte
-            card_transaction_match = re.match(r'^CARTE\s+([^\s]+)\s+(\d{2}/\d{2})\s+(.+)$', line)
-            if card_transaction_match and current_date and i + 1 < len(lines):
-                card_num, transaction_date, description = card_transaction_match.groups()
-                
-                # Ligne suivante contient le montant
-                amount_line = lines[i + 1].strip()
-                amount_match = re.match(r'^moins-\s*([\d\s,]+)\s*€$', amount_line)
-                
-                if amount_match:
-                    amount_str = amount_match.group(1)
-                    amount = clean_amount_string(amount_str)
-                    
-                    # Créer la transaction
-                    transaction = {
-                        'date': current_date,
-                        'description': description,
-                        'amount': amount,
-                        'is_debit': True,  # C'est une dépense (moins-)
-                        'payment_method': f'CARTE {card_num}',
-                        'transaction_date': SocieteGeneraleParser._parse_transaction_date(transaction_date, current_date),
-                        'merchant': SocieteGeneraleParser._extract_merchant(description),
-                        'original_text': line + '\n' + amount_line
-                    }
-                    
-                    transactions.append(transaction)
-                    i += 2  # Avancer de 2 lignes (ligne de transaction + ligne de montant)
+            # Rechercher une ligne de date (se termine toujours par l'année)
+            if line[-1:].isdigit():
+                date_match = SG_DATE_LINE.match(line)
+                if date_match:
+                    # Extraire et formater la date
+                    day_name, day, month, year = date_match.groups()
+                    month_num = SocieteGeneraleParser._convert_month_to_num(month)
+                    current_date = datetime(int(year), month_num, int(day))
+                    i += 1
                     continue
             
-            # Rechercher un virement reçu
-            vir_recu_match = re.match(r'^VIR\s+RECU\s+DE:\s+(.+)$', line)
-            if vir_recu_match and current_date and i + 1 < len(lines):
-                sender = vir_recu_match.group(1)
-                
-                # Ligne suivante peut contenir un motif ou un montant
-                next_line = lines[i + 1].strip()
-                motif_match = re.match(r'^Motif\s*:\s*(.+)$', next_line)
-                
-                if motif_match:
-                    motif = motif_match.group(1)
-                    
-                    # La ligne suivante devrait contenir le montant
-                    if i + 2 < len(lines):
-                        amount_line = lines[i + 2].strip()
-                        amount_match = re.match(r'^([\d\s,]+)\s*€$', amount_line)
-                        
-                        if amount_match:
-                            amount_str = amount_match.group(1)
-                            amount = clean_amount_string(amount_str)
-                            
-                            transaction = {
-                                'date': current_date,
-                                'description': f"Virement reçu de {sender} - {motif}",
-                                'amount': amount,
-                                'is_debit': False,  # C'est un crédit
-                                'payment_method': 'VIREMENT',
-                                'merchant': sender,
-                                'reference': motif,
-                                'original_text': '\n'.join([line, next_line, amount_line])
-                            }
-                            
-                            transactions.append(transaction)
-                            i += 3  # Avancer de 3 lignes
-                            continue
-                else:
-                    # Vérifier si c'est directement un montant
-                    amount_match = re.match(r'^([\d\s,]+)\s*€$', next_line)
-                    if amount_match:
-                        amount_str = amount_match.group(1)
-                        amount = clean_amount_string(amount_str)
-                        
-                        transaction = {
-                            'date': current_date,
-                            'description': f"Virement reçu de {sender}",
-                            'amount': amount,
-                            'is_debit': False,  # C'est un crédit
-                            'payment_method': 'VIREMENT',
-                            'merchant': sender,
-                            'original_text': '\n'.join([line, next_line])
-                        }
-                        
+            # Aiguillage sur le premier mot de la ligne
+            if current_date and i + 1 < line_count:
+                first_token = line.split(None, 1)[0] if line else ''
+                handler = handlers.get(first_token)
+                if handler:
+                    parsed = handler(lines, i, current_date)
+                    if parsed:
+                        transaction, consumed = parsed
                         transactions.append(transaction)
-                        i += 2  # Avancer de 2 lignes
+                        i += consumed
                         continue
             
-            # Rechercher un virement émis
-            vir_emis_match = re.match(r'^(VIR\s+PERM|VIR\s+INSTANTANE\s+EMIS)\s+POUR:\s+(.+)$', line)
-            if vir_emis_match and current_date and i + 1 < len(lines):
-                vir_type, recipient = vir_emis_match.groups()
-                
-                # Ligne suivante peut contenir un motif ou un montant
-                next_line = lines[i + 1].strip()
-                motif_match = re.match(r'^Motif\s*:\s*(.+)$', next_line)
-                
-                if motif_match:
-                    motif = motif_match.group(1)
-                    
-                    # La ligne suivante devrait contenir le montant
-                    if i + 2 < len(lines):
-                        amount_line = lines[i + 2].strip()
-                        amount_match = re.match(r'^moins-\s*([\d\s,]+)\s*€$', amount_line)
-                        
-                        if amount_match:
-                            amount_str = amount_match.group(1)
-                            amount = clean_amount_string(amount_str)
-                            
-                            transaction = {
-                                'date': current_date,
-                                'description': f"{vir_type} à {recipient} - {motif}",
-                                'amount': amount,
-                                'is_debit': True,  # C'est un débit
-                                'payment_method': vir_type,
-                                'merchant': recipient,
-                                'reference': motif,
-                                'original_text': '\n'.join([line, next_line, amount_line])
-                            }
-                            
-                            transactions.append(transaction)
-                            i += 3  # Avancer de 3 lignes
-                            continue
-                else:
-                    # Vérifier si c'est directement un montant
-                    amount_match = re.match(r'^moins-\s*([\d\s,]+)\s*€$', next_line)
-                    if amount_match:
-                        amount_str = amount_match.group(1)
-                        amount = clean_amount_string(amount_str)
-                        
-                        transaction = {
-                            'date': current_date,
-                            'description': f"{vir_type} à {recipient}",
-                            'amount': amount,
-                            'is_debit': True,  # C'est un débit
-                            'payment_method': vir_type,
-                            'merchant': recipient,
-                            'original_text': '\n'.join([line, next_line])
-                        }
-                        
-                        transactions.append(transaction)
-                        i += 2  # Avancer de 2 lignes
-                        continue
-            
-            # Rechercher un prélèvement
-            prelevement_match = re.match(r'^PRELEVEMENT\s+EUROPEEN\s+(DE|POUR\s+CPTE\s+DE):\s*(.+)$', line)
-            if prelevement_match and current_date and i + 1 < len(lines):
-                _, creditor = prelevement_match.groups()
-                
-                # Ligne suivante peut contenir un motif ou un montant
-                next_line = lines[i + 1].strip()
-                motif_match = re.match(r'^Motif\s*:\s*(.+)$', next_line)
-                
-                if motif_match:
-                    motif = motif_match.group(1)
-                    
-                    # La ligne suivante devrait contenir le montant
-                    if i + 2 < len(lines):
-                        amount_line = lines[i + 2].strip()
-                        amount_match = re.match(r'^moins-\s*([\d\s,]+)\s*€$', amount_line)
-                        
-                        if amount_match:
-                            amount_str = amount_match.group(1)
-                            amount = clean_amount_string(amount_str)
-                            
-                            # Extraire une référence ou un mandat s'il existe
-                            ref_match = re.search(r'REF:\s+([^\s]+)', motif)
-                            mandat_match = re.search(r'MANDAT\s+([^\s]+)', motif)
-                            
-                            reference = None
-                            if ref_match:
-                                reference = ref_match.group(1)
-                            elif mandat_match:
-                                reference = f"MANDAT {mandat_match.group(1)}"
-                            
-                            transaction = {
-                                'date': current_date,
-                                'description': f"Prélèvement {creditor} - {motif}",
-                                'amount': amount,
-                                'is_debit': True,  # C'est un débit
-                                'payment_method': 'PRELEVEMENT',
-                                'merchant': creditor,
-                                'reference': reference or motif,
-                                'original_text': '\n'.join([line, next_line, amount_line])
-                            }
-                            
-                            transactions.append(transaction)
-                            i += 3  # Avancer de 3 lignes
-                            continue
-            
             # Si aucun des motifs n'a été trouvé, passer à la ligne suivante
             i += 1
         
         return transactions
     
+    @staticmethod
+    def _parse_card(lines, i, current_date):
+        """Analyse une transaction carte (ligne CARTE + ligne de montant)"""
+        card_transaction_match = SG_CARD_LINE.match(lines[i])
+        if not card_transaction_match:
+            return None
+        
+        card_num, transaction_date, description = card_transaction_match.groups()
+        
+        # Ligne suivante contient le montant
+        amount_line = lines[i + 1]
+        amount_match = SG_DEBIT_AMOUNT_LINE.match(amount_line)
+        if not amount_match:
+            return None
+        
+        transaction = {
+            'date': current_date,
+            'description': description,
+            'amount': clean_amount_string(amount_match.group(1)),
+            'is_debit': True,  # C'est une dépense (moins-)
+            'payment_method': f'CARTE {card_num}',
+            'transaction_date': SocieteGeneraleParser._parse_transaction_date(transaction_date, current_date),
+            'merchant': SocieteGeneraleParser._extract_merchant(description),
+            'original_text': lines[i] + '\n' + amount_line
+        }
+        return transaction, 2
+    
+    @staticmethod
+    def _parse_transfer(lines, i, current_date):
+        """Analyse un virement reçu ou émis (ligne VIR + motif optionnel + montant)"""
+        line = lines[i]
+        
+        vir_recu_match = SG_TRANSFER_RECEIVED_LINE.match(line)
+        if vir_recu_match:
+            sender = vir_recu_match.group(1)
+            parsed = SocieteGeneraleParser._parse_motif_and_amount(lines, i, SG_CREDIT_AMOUNT_LINE)
+            if parsed:
+                motif, amount, original_lines = parsed
+                transaction = {
+                    'date': current_date,
+                    'description': f"Virement reçu de {sender} - {motif}" if motif is not None else f"Virement reçu de {sender}",
+                    'amount': amount,
+                    'is_debit': False,  # C'est un crédit
+                    'payment_method': 'VIREMENT',
+                    'merchant': sender
+                }
+                if motif is not None:
+                    transaction['reference'] = motif
+                transaction['original_text'] = '\n'.join(original_lines)
+                return transaction, len(original_lines)
+            return None
+        
+        vir_emis_match = SG_TRANSFER_SENT_LINE.match(line)
+        if vir_emis_match:
+            vir_type, recipient = vir_emis_match.groups()
+            parsed = SocieteGeneraleParser._parse_motif_and_amount(lines, i, SG_DEBIT_AMOUNT_LINE)
+            if parsed:
+                motif, amount, original_lines = parsed
+                transaction = {
+                    'date': current_date,
+                    'description': f"{vir_type} à {recipient} - {motif}" if motif is not None else f"{vir_type} à {recipient}",
+                    'amount': amount,
+                    'is_debit': True,  # C'est un débit
+                    'payment_method': vir_type,
+                    'merchant': recipient
+                }
+                if motif is not None:
+                    transaction['reference'] = motif
+                transaction['original_text'] = '\n'.join(original_lines)
+                return transaction, len(original_lines)
+        
+        return None
+    
+    @staticmethod
+    def _parse_direct_debit(lines, i, current_date):
+        """Analyse un prélèvement (ligne PRELEVEMENT + motif obligatoire + montant)"""
+        prelevement_match = SG_DIRECT_DEBIT_LINE.match(lines[i])
+        if not prelevement_match:
+            return None
+        
+        _, creditor = prelevement_match.groups()
+        parsed = SocieteGeneraleParser._parse_motif_and_amount(lines, i, SG_DEBIT_AMOUNT_LINE, motif_required=True)
+        if not parsed:
+            return None
+        
+        motif, amount, original_lines = parsed
+        
+        # Extraire une référence ou un mandat s'il existe
+        ref_match = SG_REF.search(motif)
+        mandat_match = SG_MANDAT.search(motif)
+        
+        reference = None
+        if ref_match:
+            reference = ref_match.group(1)
+        elif mandat_match:
+            reference = f"MANDAT {mandat_match.group(1)}"
+        
+        transaction = {
+            'date': current_date,
+            'description': f"Prélèvement {creditor} - {motif}",
+            'amount': amount,
+            'is_debit': True,  # C'est un débit
+            'payment_method': 'PRELEVEMENT',
+            'merchant': creditor,
+            'reference': reference or motif,
+            'original_text': '\n'.join(original_lines)
+        }
+        return transaction, 3
+    
+    @staticmethod
+    def _parse_motif_and_amount(lines, i, amount_pattern, motif_required=False):
+        """
+        Analyse les lignes qui suivent une ligne de virement ou de prélèvement
+        
+        Args:
+            lines (list): Lignes nettoyées du relevé
+            i (int): Index de la ligne d'en-tête
+            amount_pattern (Pattern): Motif de la ligne de montant (débit ou crédit)
+            motif_required (bool): Si True, la ligne "Motif" est obligatoire
+            
+        Returns:
+            tuple: (motif ou None, montant, lignes d'origine) ou None
+        """
+        next_line = lines[i + 1]
+        motif_match = SG_MOTIF_LINE.match(next_line)
+        
+        if motif_match:
+            # La ligne suivante devrait contenir le montant
+            if i + 2 < len(lines):
+                amount_line = lines[i + 2]
+                amount_match = amount_pattern.match(amount_line)
+                if amount_match:
+                    amount = clean_amount_string(amount_match.group(1))
+                    return motif_match.group(1), amount, [lines[i], next_line, amount_line]
+            return None
+        
+        if motif_required:
+            return None
+        
+        # Vérifier si c'est directement un montant
+        amount_match = amount_pattern.match(next_line)
+        if amount_match:
+            amount = clean_amount_string(amount_match.group(1))
+            return None, amount, [lines[i], next_line]
+        
+        return None
+    
     @staticmethod
     def _convert_month_to_num(month_name):
         """Convertit un nom de mois en français en numéro de mois"""
@@ -269,9 +261,19 @@ class SocieteGeneraleParser:
         
         return merchant
 
+# Table d'aiguillage: premier mot de la ligne -> analyseur
+SocieteGeneraleParser._LINE_HANDLERS = {
+    'CARTE': SocieteGeneraleParser._parse_card,
+    'VIR': SocieteGeneraleParser._parse_transfer,
+    'PRELEVEMENT': SocieteGeneraleParser._parse_direct_debit,
+}
+
 class N26Parser:
     """Parser pour les relevés de compte au format CSV de N26"""
     
+    # Encodages essayés successivement pour les fichiers uploadés
+    ENCODINGS = ('utf-8', 'latin-1')
+    
     @staticmethod
     def parse_csv(csv_content):
         """
@@ -283,88 +285,158 @@ class N26Parser:
         Returns:
             list: Liste des transactions extraites sous forme de dictionnaires
         """
-        transactions = []
+        return list(N26Parser.iter_rows(csv.DictReader(StringIO(csv_content))))
+    
+    @staticmethod
+    def iter_csv_stream(binary_stream, encodings=ENCODINGS):
+        """
+        Décode un flux binaire de manière incrémentale et génère les transactions une à une
         
-        # Utiliser le module csv pour analyser le contenu
-        import csv
-        from io import StringIO
-        from decimal import Decimal
+        La mémoire utilisée reste bornée quelle que soit la taille du fichier. Si un
+        encodage échoue en cours de lecture, le flux est relu depuis le début avec
+        l'encodage suivant en sautant les transactions déjà produites.
         
-        csv_file = StringIO(csv_content)
-        reader = csv.DictReader(csv_file)
+        Args:
+            binary_stream: Flux binaire positionnable (fichier uploadé)
+            encodings (tuple): Encodages à essayer dans l'ordre
+            
+        Yields:
+            dict: Transaction extraite
+        """
+        binary_stream = N26Parser._readable_stream(binary_stream)
+        produced = 0
         
-        for row in reader:
-            # Extraire les informations pertinentes
-            booking_date = row.get('Booking Date')
-            value_date = row.get('Value Date')
-            partner_name = row.get('Partner Name', '')
-            partner_iban = row.get('Partner Iban', '')
-            transaction_type = row.get('Type', '')
-            payment_reference = row.get('Payment Reference', '')
-            amount_str = row.get('Amount (EUR)', '0')
-            original_amount = row.get('Original Amount', '0')
-            original_currency = row.get('Original Currency', 'EUR')
+        for index, encoding in enumerate(encodings):
+            binary_stream.seek(0)
+            text_stream = io.TextIOWrapper(binary_stream, encoding=encoding, newline='')
+            try:
+                rows = N26Parser.iter_rows(csv.DictReader(text_stream))
+                for position, transaction in enumerate(rows):
+                    if position < produced:
+                        continue
+                    produced += 1
+                    yield transaction
+                return
+            except UnicodeDecodeError:
+                if index == len(encodings) - 1:
+                    raise
+            finally:
+                # Ne pas fermer le flux sous-jacent avec le wrapper texte
+                text_stream.detach()
+    
+    @staticmethod
+    def _readable_stream(binary_stream):
+        """
+        Flux utilisable par io.TextIOWrapper
+        
+        Werkzeug stocke les fichiers uploadés dans un SpooledTemporaryFile, qui
+        n'implémente readable() qu'à partir de Python 3.11: on enveloppe alors le
+        fichier réel qu'il contient (BytesIO ou fichier temporaire sur disque).
+        
+        Args:
+            binary_stream: Flux binaire (fichier uploadé)
             
-            # Vérification des données essentielles
-            if not booking_date or not amount_str:
-                continue
+        Returns:
+            Flux binaire disposant de readable()
+        """
+        if hasattr(binary_stream, 'readable'):
+            return binary_stream
+        return getattr(binary_stream, '_file', binary_stream)
+    
+    @staticmethod
+    def iter_rows(reader):
+        """
+        Génère les transactions à partir des lignes d'un csv.DictReader
+        
+        Args:
+            reader (iterable): Lignes CSV sous forme de dictionnaires
             
-            # Convertir la date
-            try:
-                # Format N26: YYYY-MM-DD
-                date_obj = datetime.strptime(booking_date, '%Y-%m-%d')
-            except (ValueError, TypeError):
-                # En cas d'erreur, utiliser la date actuelle
-                date_obj = datetime.utcnow()
+        Yields:
+            dict: Transaction extraite
+        """
+        for row in reader:
+            transaction = N26Parser._parse_row(row)
+            if transaction is not None:
+                yield transaction
+    
+    @staticmethod
+    def _parse_row(row):
+        """
+        Convertit une ligne CSV N26 en transaction
+        
+        Args:
+            row (dict): Ligne CSV
             
-            # Déterminer si c'est un débit ou un crédit
-            # N26 utilise des montants négatifs pour les débits
+        Returns:
+            dict: Transaction extraite, ou None si la ligne est incomplète
+        """
+        # Extraire les informations pertinentes
+        booking_date = row.get('Booking Date')
+        value_date = row.get('Value Date')
+        partner_name = row.get('Partner Name', '')
+        partner_iban = row.get('Partner Iban', '')
+        transaction_type = row.get('Type', '')
+        payment_reference = row.get('Payment Reference', '')
+        amount_str = row.get('Amount (EUR)', '0')
+        original_amount = row.get('Original Amount', '0')
+        original_currency = row.get('Original Currency', 'EUR')
+        
+        # Vérification des données essentielles
+        if not booking_date or not amount_str:
+            return None
+        
+        # Convertir la date
+        try:
+            # Format N26: YYYY-MM-DD
+            date_obj = datetime.strptime(booking_date, '%Y-%m-%d')
+        except (ValueError, TypeError):
+            # En cas d'erreur, utiliser la date actuelle
+            date_obj = datetime.utcnow()
+        
+        # Déterminer si c'est un débit ou un crédit
+        # N26 utilise des montants négatifs pour les débits
+        try:
+            amount = Decimal(amount_str.replace(',', '.'))
+            is_debit = amount < 0
+            # Stocker le montant en valeur absolue
+            amount = abs(amount)
+        except (ValueError, decimal.InvalidOperation):
+            # Si la conversion échoue, essayer de nettoyer davantage
+            amount_str = amount_str.replace(',', '.')
             try:
-                amount = Decimal(amount_str.replace(',', '.'))
-                is_debit = amount < 0
-                # Stocker le montant en valeur absolue
+                amount = Decimal(''.join(c for c in amount_str if c.isdigit() or c == '.'))
+                is_debit = '-' in amount_str
                 amount = abs(amount)
             except (ValueError, decimal.InvalidOperation):
-                # Si la conversion échoue, essayer de nettoyer davantage
-                amount_str = amount_str.replace(',', '.')
-                try:
-                    amount = Decimal(''.join(c for c in amount_str if c.isdigit() or c == '.'))
-                    is_debit = '-' in amount_str
-                    amount = abs(amount)
-                except (ValueError, decimal.InvalidOperation):
-                    # Dernier recours, mettre 0
-                    amount = Decimal('0')
-                    is_debit = True
-            
-            # Identifier le type de paiement
-            payment_method = N26Parser._determine_payment_method(transaction_type, partner_name)
-            
-            # Créer la description
-            description = N26Parser._create_description(partner_name, payment_reference, transaction_type)
-            
-            # Créer une représentation de l'original pour référence
-            original_text = '|'.join([
-                booking_date, 
-                partner_name or '', 
-                transaction_type or '', 
-                payment_reference or '',
-                amount_str or '0'
-            ])
-            
-            transaction = {
-                'date': date_obj,
-                'description': description,
-                'amount': amount,
-                'is_debit': is_debit,
-                'payment_method': payment_method,
-                'merchant': partner_name,
-                'reference': payment_reference,
-                'original_text': original_text
-            }
-            
-            transactions.append(transaction)
+                # Dernier recours, mettre 0
+                amount = Decimal('0')
+                is_debit = True
         
-        return transactions
+        # Identifier le type de paiement
+        payment_method = N26Parser._determine_payment_method(transaction_type, partner_name)
+        
+        # Créer la description
+        description = N26Parser._create_description(partner_name, payment_reference, transaction_type)
+        
+        # Créer une représentation de l'original pour référence
+        original_text = '|'.join([
+            booking_date, 
+            partner_name or '', 
+            transaction_type or '', 
+            payment_reference or '',
+            amount_str or '0'
+        ])
+        
+        return {
+            'date': date_obj,
+            'description': description,
+            'amount': amount,
+            'is_debit': is_debit,
+            'payment_method': payment_method,
+            'merchant': partner_name,
+            'reference': payment_reference,
+            'original_text': original_text
+        }
     
     @staticmethod
     def _determine_payment_method(transaction_type, partner_name):
@@ -0,0 +1,159 @@
+# app/services/tricount/bulk_import.py
+"""
+Pipeline d'importation par lots des transactions bancaires.
+
+Pour chaque lot de transactions:
+- tous les identifiants uniques sont calculés en amont
+- les doublons existants sont détectés en une seule requête `IN (...)`
+- les nouvelles lignes sont écrites en un seul
+  `INSERT ... ON CONFLICT (unique_identifier) DO NOTHING RETURNING id`
+Les lots sont validés indépendamment: une erreur sur un lot n'annule pas les précédents.
+"""
+from itertools import islice
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.models.tricount import Expense
+from app.utils.sql_query_utils import insert_ignoring_conflicts
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Erreurs qui invalident un lot sans interrompre l'import complet
+BATCH_ERRORS = (SQLAlchemyError, KeyError, TypeError, AttributeError)
+
+
+def iter_batches(iterable, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Découpe un itérable en listes de taille fixe
+
+    Args:
+        iterable (iterable): Éléments à découper
+        batch_size (int): Taille maximale de chaque lot
+
+    Yields:
+        list: Lot d'éléments
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class BulkImportService:
+    """Service d'importation des transactions par lots"""
+
+    @staticmethod
+    def _build_row(transaction, unique_id, source):
+        """Convertit une transaction analysée en ligne de la table des dépenses"""
+        return {
+            'date': transaction['date'],
+            'description': transaction['description'],
+            'amount': transaction['amount'],
+            'is_debit': transaction.get('is_debit', True),
+            'merchant': transaction.get('merchant', ''),
+            'payment_method': transaction.get('payment_method', ''),
+            'reference': transaction.get('reference', ''),
+            'original_text': transaction.get('original_text', ''),
+            'unique_identifier': unique_id,
+            'source': source
+        }
+
+    @staticmethod
+    def import_batch(transactions, source):
+        """
+        Importe un lot de transactions en deux requêtes (dédoublonnage + insertion)
+
+        Args:
+            transactions (list): Transactions analysées
+            source (str): Source des transactions (societe_generale, n26, etc.)
+
+        Returns:
+            tuple: (imported_count, duplicate_count)
+        """
+        rows = {}
+        duplicate_count = 0
+
+        # Calculer tous les identifiants en amont (et écarter les doublons internes au lot)
+        for transaction in transactions:
+            unique_id = Expense.generate_unique_identifier(
+                transaction['date'],
+                transaction['description'],
+                transaction['amount']
+            )
+            if unique_id in rows:
+                duplicate_count += 1
+                continue
+            rows[unique_id] = BulkImportService._build_row(transaction, unique_id, source)
+
+        if not rows:
+            return (0, duplicate_count)
+
+        # Une seule requête pour détecter les dépenses déjà présentes
+        existing = {
+            unique_id for (unique_id,) in db.session.query(Expense.unique_identifier)
+            .filter(Expense.unique_identifier.in_(list(rows)))
+        }
+        duplicate_count += len(existing)
+
+        new_rows = [row for unique_id, row in rows.items() if unique_id not in existing]
+        if not new_rows:
+            return (0, duplicate_count)
+
+        # Les conflits concurrents sont ignorés puis comptés comme doublons
+        statement = insert_ignoring_conflicts(Expense.__table__).values(new_rows)
+        statement = statement.on_conflict_do_nothing(index_elements=['unique_identifier'])
+        statement = statement.returning(Expense.__table__.c.id)
+
+        imported_count = len(db.session.execute(statement).fetchall())
+        duplicate_count += len(new_rows) - imported_count
+
+        return (imported_count, duplicate_count)
+
+    @staticmethod
+    def import_transactions(transactions, source, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Importe des transactions par lots de taille fixe, un commit par lot
+
+        Args:
+            transactions (iterable): Transactions analysées (liste ou générateur)
+            source (str): Source des transactions (societe_generale, n26, etc.)
+            batch_size (int): Nombre de transactions par lot
+
+        Returns:
+            dict: Compteurs `imported`, `duplicates`, `failed` et indicateur `success`
+        """
+        result = {'imported': 0, 'duplicates': 0, 'failed': 0, 'success': True}
+
+        for batch in iter_batches(transactions, batch_size):
+            try:
+                imported_count, duplicate_count = BulkImportService.import_batch(batch, source)
+                db.session.commit()
+            except BATCH_ERRORS:
+                # Le lot en erreur est rejoué ligne par ligne pour conserver les lignes valides
+                db.session.rollback()
+                imported_count, duplicate_count = BulkImportService._import_rows(batch, source, result)
+
+            result['imported'] += imported_count
+            result['duplicates'] += duplicate_count
+
+        return result
+
+    @staticmethod
+    def _import_rows(transactions, source, result):
+        """Rejoue un lot transaction par transaction après une erreur"""
+        imported_count = 0
+        duplicate_count = 0
+
+        for transaction in transactions:
+            try:
+                imported, duplicates = BulkImportService.import_batch([transaction], source)
+                db.session.commit()
+                imported_count += imported
+                duplicate_count += duplicates
+            except BATCH_ERRORS:
+                db.session.rollback()
+                result['failed'] += 1
+                result['success'] = False
+
+        return (imported_count, duplicate_count)
@@ -0,0 +1,212 @@
+# app/services/tricount/bulk_rule_application.py
+"""
+Application ensembliste (set-based) des règles d'auto-catégorisation.
+
+Au lieu de charger chaque dépense en Python, les filtres d'une règle sont
+traduits en une clause SQL unique, puis appliqués en quelques requêtes:
+- un `UPDATE ... WHERE` pour l'application directe
+- un `INSERT ... SELECT` pour les applications en attente
+- un `INSERT ... SELECT ... ON CONFLICT DO NOTHING` pour `rule_expense_links`
+"""
+from datetime import datetime
+from sqlalchemy import and_, case, exists, func, literal, select
+from app.extensions import db
+from app.models.tricount import (
+    AutoCategorizationRule, Expense, PendingRuleApplication, ModificationSource, rule_expense_links
+)
+from app.utils.rename_helpers import apply_rule_rename
+from app.utils.sql_query_utils import contains_pattern, insert_ignoring_conflicts
+
+
+class BulkRuleApplicationService:
+    """Service d'application des règles en quelques requêtes SQL"""
+
+    @staticmethod
+    def build_match_condition(rule, uncategorized_only=True):
+        """
+        Traduit les filtres d'une règle en clause SQL
+
+        Args:
+            rule (AutoCategorizationRule): Règle à traduire
+            uncategorized_only (bool): Si True, se limiter aux dépenses sans catégorie
+
+        Returns:
+            ClauseElement: Condition SQL sur la table des dépenses
+        """
+        conditions = []
+
+        if uncategorized_only:
+            conditions.append(Expense.category_id == None)
+
+        if rule.merchant_contains:
+            conditions.append(Expense.merchant.ilike(contains_pattern(rule.merchant_contains), escape='\\'))
+
+        if rule.description_contains:
+            conditions.append(Expense.description.ilike(contains_pattern(rule.description_contains), escape='\\'))
+
+        if rule.min_amount is not None:
+            conditions.append(Expense.amount >= rule.min_amount)
+
+        if rule.max_amount is not None:
+            conditions.append(Expense.amount <= rule.max_amount)
+
+        return and_(*conditions)
+
+    @staticmethod
+    def link_expenses(rule, condition):
+        """
+        Enregistre la relation règle-dépense pour toutes les dépenses correspondantes
+
+        Args:
+            rule (AutoCategorizationRule): Règle appliquée
+            condition (ClauseElement): Condition de correspondance
+
+        Returns:
+            int: Nombre de liens créés
+        """
+        matching = select(
+            literal(rule.id), Expense.id, literal(datetime.utcnow())
+        ).where(condition)
+
+        statement = insert_ignoring_conflicts(rule_expense_links).from_select(
+            ['rule_id', 'expense_id', 'applied_at'], matching
+        ).on_conflict_do_nothing()
+
+        return db.session.execute(statement).rowcount
+
+    @staticmethod
+    def queue_pending(rule, uncategorized_only=True):
+        """
+        Ajoute les applications en attente de confirmation en une seule requête
+
+        Args:
+            rule (AutoCategorizationRule): Règle nécessitant une confirmation
+            uncategorized_only (bool): Si True, se limiter aux dépenses sans catégorie
+
+        Returns:
+            int: Nombre d'applications en attente créées
+        """
+        condition = BulkRuleApplicationService.build_match_condition(rule, uncategorized_only)
+
+        # Pas de contrainte d'unicité sur (rule_id, expense_id): anti-jointure NOT EXISTS
+        already_pending = exists().where(and_(
+            PendingRuleApplication.rule_id == rule.id,
+            PendingRuleApplication.expense_id == Expense.id
+        ))
+
+        matching = select(
+            literal(rule.id), Expense.id, literal(datetime.utcnow())
+        ).where(condition, ~already_pending)
+
+        statement = PendingRuleApplication.__table__.insert().from_select(
+            ['rule_id', 'expense_id', 'created_at'], matching
+        )
+
+        return db.session.execute(statement).rowcount
+
+    @staticmethod
+    def apply_rule(rule, respect_manual=False, source=ModificationSource.AUTO_RULE.value, uncategorized_only=True):
+        """
+        Applique directement une règle à toutes les dépenses correspondantes
+
+        Args:
+            rule (AutoCategorizationRule): Règle à appliquer
+            respect_manual (bool): Si True, ne pas écraser les modifications manuelles
+            source (str): Source de la modification
+            uncategorized_only (bool): Si True, se limiter aux dépenses sans catégorie
+
+        Returns:
+            int: Nombre de dépenses correspondantes
+        """
+        condition = BulkRuleApplicationService.build_match_condition(rule, uncategorized_only)
+
+        count = db.session.query(func.count(Expense.id)).filter(condition).scalar()
+        if not count:
+            return 0
+
+        # Les liens et le renommage doivent précéder l'UPDATE qui modifie la catégorie
+        BulkRuleApplicationService.link_expenses(rule, condition)
+
+        if rule.apply_rename and rule.rename_pattern:
+            # Les motifs sont des regex Python: renommage limité aux dépenses correspondantes
+            rename_query = Expense.query.filter(condition)
+            if respect_manual:
+                rename_query = rename_query.filter(
+                    Expense.merchant_modified_by != ModificationSource.MANUAL.value
+                )
+            for expense in rename_query.all():
+                apply_rule_rename(expense, rule, source)
+            db.session.flush()
+
+        values = {}
+        manual = ModificationSource.MANUAL.value
+
+        if rule.apply_category and rule.category_id:
+            if respect_manual:
+                values[Expense.category_id] = case(
+                    (Expense.category_modified_by == manual, Expense.category_id),
+                    else_=rule.category_id
+                )
+                values[Expense.category_modified_by] = case(
+                    (Expense.category_modified_by == manual, Expense.category_modified_by),
+                    else_=source
+                )
+            else:
+                values[Expense.category_id] = rule.category_id
+                values[Expense.category_modified_by] = source
+
+        if rule.apply_flag and rule.flag_id:
+            if respect_manual:
+                values[Expense.flag_id] = case(
+                    (Expense.flag_modified_by == manual, Expense.flag_id),
+                    else_=rule.flag_id
+                )
+                values[Expense.flag_modified_by] = case(
+                    (Expense.flag_modified_by == manual, Expense.flag_modified_by),
+                    else_=source
+                )
+            else:
+                values[Expense.flag_id] = rule.flag_id
+                values[Expense.flag_modified_by] = source
+
+        if values:
+            values[Expense.updated_at] = datetime.utcnow()
+            db.session.query(Expense).filter(condition).update(values, synchronize_session=False)
+
+        return count
+
+    @staticmethod
+    def apply_rule_job(progress, rule_id):
+        """
+        Traitement en arrière-plan (JobRunner) de l'application manuelle d'une règle
+
+        Les dépenses correspondantes sont mises en attente si la règle demande une
+        confirmation, modifiées directement sinon; la validation est faite par JobRunner.
+
+        Args:
+            progress (JobProgress): Publication de l'avancement
+            rule_id (int): ID de la règle à appliquer
+
+        Returns:
+            dict: {'rule_id', 'count', 'pending_count', 'message'}
+        """
+        rule = db.session.get(AutoCategorizationRule, rule_id)
+        if not rule:
+            raise ValueError(f"Règle avec ID {rule_id} non trouvée")
+
+        count = 0
+        pending_count = 0
+
+        if rule.requires_confirmation:
+            progress(10, 'Recherche des dépenses à confirmer')
+            pending_count = BulkRuleApplicationService.queue_pending(rule)
+            if pending_count:
+                message = f"{pending_count} dépenses ajoutées à la liste d'attente pour confirmation."
+            else:
+                message = 'Aucune dépense ne correspond aux critères de cette règle.'
+        else:
+            progress(10, 'Application de la règle aux dépenses')
+            count = BulkRuleApplicationService.apply_rule(rule)
+            message = f'Règle appliquée avec succès à {count} dépenses.'
+
+        return {'rule_id': rule.id, 'count': count, 'pending_count': pending_count, 'message': message}
@@ -0,0 +1,256 @@
+# app/services/tricount/expense_search.py
+"""
+Recherche plein texte des dépenses avec classement et surlignage.
+
+Sous PostgreSQL, la recherche s'appuie sur `expenses.search_vector` (tsvector
+maintenu par trigger, configuration `fr_unaccent`) et son index GIN:
+- chaque mot saisi devient un préfixe (`mot:*`), tous les mots sont requis
+- le classement utilise ts_rank_cd (poids: marchand > description > notes > référence)
+- le surlignage utilise ts_headline
+
+Sous SQLite (développement), un repli équivalent utilise des ILIKE par mot
+et calcule le classement et le surlignage en Python.
+"""
+import re
+from datetime import datetime
+from markupsafe import Markup, escape
+from sqlalchemy import and_, func, literal, or_
+from app.extensions import db
+from app.models.tricount import Expense
+from app.models.tricount.search import EXPENSE_SEARCH_CONFIG, EXPENSE_SEARCH_WEIGHTS
+from app.utils.sql_query_utils import contains_pattern
+
+# Mots retenus dans une recherche (les opérateurs tsquery sont ignorés).
+# Les mots d'une lettre (l', d'...) correspondraient en préfixe à presque tout
+SEARCH_TERM = re.compile(r'\w{2,}', re.UNICODE)
+MAX_SEARCH_TERMS = 10
+
+# Poids par défaut de ts_rank_cd pour les catégories D, C, B, A
+WEIGHT_VALUES = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+# Marqueurs de surlignage: le texte est échappé avant leur remplacement par <mark>
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_STOP = '\x03'
+HEADLINE_OPTIONS = f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, HighlightAll=true'
+
+
+def parse_search_terms(search_query):
+    """
+    Découpe une saisie utilisateur en mots de recherche
+
+    Args:
+        search_query (str): Texte saisi
+
+    Returns:
+        list: Mots en minuscules (au plus MAX_SEARCH_TERMS)
+    """
+    return [term.lower() for term in SEARCH_TERM.findall(search_query or '')][:MAX_SEARCH_TERMS]
+
+
+def render_highlight(text):
+    """
+    Convertit un texte contenant des marqueurs de surlignage en HTML sûr
+
+    Args:
+        text (str): Texte avec marqueurs HIGHLIGHT_START / HIGHLIGHT_STOP
+
+    Returns:
+        Markup: HTML échappé avec les passages trouvés entre balises <mark>
+    """
+    html = str(escape(text or ''))
+    return Markup(html.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>'))
+
+
+class ExpenseSearchService:
+    """Service de recherche plein texte des dépenses"""
+
+    @staticmethod
+    def _uses_full_text():
+        """Indique si le moteur courant dispose de la recherche plein texte"""
+        return db.session.get_bind().dialect.name == 'postgresql'
+
+    @staticmethod
+    def build_tsquery(terms):
+        """
+        Construit la requête tsquery (mots requis, en préfixe)
+
+        Args:
+            terms (list): Mots issus de parse_search_terms
+
+        Returns:
+            ColumnElement: Expression to_tsquery
+        """
+        return func.to_tsquery(EXPENSE_SEARCH_CONFIG, ' & '.join(f'{term}:*' for term in terms))
+
+    @staticmethod
+    def match_condition(search_query):
+        """
+        Condition SQL de correspondance d'une recherche
+
+        Args:
+            search_query (str): Texte saisi
+
+        Returns:
+            ClauseElement: Condition sur la table des dépenses, ou None si la recherche est vide
+        """
+        terms = parse_search_terms(search_query)
+        if not terms:
+            return None
+
+        if ExpenseSearchService._uses_full_text():
+            return Expense.search_vector.op('@@')(ExpenseSearchService.build_tsquery(terms))
+
+        # Repli: chaque mot doit apparaître dans au moins une colonne indexée
+        return and_(*(
+            or_(*(
+                getattr(Expense, column).ilike(contains_pattern(term), escape='\\')
+                for column, _ in EXPENSE_SEARCH_WEIGHTS
+            ))
+            for term in terms
+        ))
+
+    @staticmethod
+    def apply_search(query, search_query):
+        """
+        Filtre une requête sur les dépenses correspondant à une recherche
+
+        Args:
+            query: Requête SQLAlchemy portant sur Expense
+            search_query (str): Texte saisi (ignoré s'il est vide)
+
+        Returns:
+            query: Requête filtrée
+        """
+        condition = ExpenseSearchService.match_condition(search_query)
+        if condition is None:
+            return query
+        return query.filter(condition)
+
+    @staticmethod
+    def apply_filters(query, filters):
+        """
+        Applique les filtres optionnels d'une recherche
+
+        Args:
+            query: Requête SQLAlchemy portant sur Expense
+            filters (dict): category_id (0 = non catégorisé), flag_id, start_date,
+                end_date (YYYY-MM-DD), status_values (liste de statuts)
+
+        Returns:
+            query: Requête filtrée
+        """
+        category_id = filters.get('category_id')
+        if category_id == 0:
+            query = query.filter(Expense.category_id == None)
+        elif category_id:
+            query = query.filter(Expense.category_id == category_id)
+
+        if filters.get('flag_id'):
+            query = query.filter(Expense.flag_id == filters['flag_id'])
+
+        if filters.get('start_date'):
+            try:
+                query = query.filter(Expense.date >= datetime.strptime(filters['start_date'], '%Y-%m-%d').date())
+            except ValueError:
+                pass
+
+        if filters.get('end_date'):
+            try:
+                query = query.filter(Expense.date <= datetime.strptime(filters['end_date'], '%Y-%m-%d').date())
+            except ValueError:
+                pass
+
+        if filters.get('status_values'):
+            query = query.filter(Expense.declaration_status.in_(filters['status_values']))
+
+        return query
+
+    @staticmethod
+    def search_expenses(search_query, filters=None, limit=50):
+        """
+        Recherche les dépenses correspondant à un texte, classées par pertinence
+
+        Args:
+            search_query (str): Texte saisi
+            filters (dict): Filtres optionnels (voir apply_filters)
+            limit (int): Nombre maximal de résultats
+
+        Returns:
+            list: Dictionnaires {'expense', 'rank', 'merchant_html', 'description_html'},
+                du plus pertinent au moins pertinent
+        """
+        terms = parse_search_terms(search_query)
+        if not terms:
+            return []
+
+        if ExpenseSearchService._uses_full_text():
+            return ExpenseSearchService._search_full_text(terms, filters or {}, limit)
+        return ExpenseSearchService._search_fallback(terms, filters or {}, limit)
+
+    @staticmethod
+    def _search_full_text(terms, filters, limit):
+        """Recherche PostgreSQL: classement ts_rank_cd et surlignage ts_headline"""
+        tsquery = ExpenseSearchService.build_tsquery(terms)
+        rank = func.ts_rank_cd(Expense.search_vector, tsquery)
+
+        merchant_headline = func.ts_headline(
+            EXPENSE_SEARCH_CONFIG,
+            func.coalesce(Expense.renamed_merchant, Expense.merchant, literal('')),
+            tsquery,
+            HEADLINE_OPTIONS
+        )
+        description_headline = func.ts_headline(
+            EXPENSE_SEARCH_CONFIG,
+            Expense.description,
+            tsquery,
+            f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2, MaxWords=20, MinWords=5'
+        )
+
+        query = db.session.query(
+            Expense,
+            rank.label('rank'),
+            merchant_headline.label('merchant_headline'),
+            description_headline.label('description_headline')
+        ).filter(Expense.search_vector.op('@@')(tsquery))
+
+        query = ExpenseSearchService.apply_filters(query, filters)
+        rows = query.order_by(rank.desc(), Expense.date.desc(), Expense.id.desc()).limit(limit).all()
+
+        return [
+            {
+                'expense': expense,
+                'rank': float(row_rank),
+                'merchant_html': render_highlight(merchant),
+                'description_html': render_highlight(description)
+            }
+            for expense, row_rank, merchant, description in rows
+        ]
+
+    @staticmethod
+    def _search_fallback(terms, filters, limit):
+        """Recherche SQLite: ILIKE par mot, classement et surlignage en Python"""
+        query = ExpenseSearchService.apply_search(Expense.query, ' '.join(terms))
+        query = ExpenseSearchService.apply_filters(query, filters)
+
+        pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+
+        def highlight(text):
+            return pattern.sub(lambda m: f'{HIGHLIGHT_START}{m.group(0)}{HIGHLIGHT_STOP}', text or '')
+
+        results = []
+        for expense in query.all():
+            # Somme des poids des colonnes contenant chaque mot (approximation de ts_rank_cd)
+            rank = 0.0
+            for column, weight in EXPENSE_SEARCH_WEIGHTS:
+                value = (getattr(expense, column) or '').lower()
+                rank += WEIGHT_VALUES[weight] * sum(1 for term in terms if term in value)
+
+            results.append({
+                'expense': expense,
+                'rank': rank,
+                'merchant_html': render_highlight(highlight(expense.renamed_merchant or expense.merchant)),
+                'description_html': render_highlight(highlight(expense.description))
+            })
+
+        results.sort(key=lambda r: (-r['rank'], -r['expense'].date.toordinal(), -r['expense'].id))
+        return results[:limit]
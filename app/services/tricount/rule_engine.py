@@ -0,0 +1,287 @@
+# app/services/tricount/rule_engine.py
+"""
+Moteur de correspondance compilé pour les règles d'auto-catégorisation.
+
+Toutes les règles sont compilées une seule fois en un matcher pré-construit:
+- un automate Aho-Corasick unique sur l'ensemble des motifs textuels
+  (merchant_contains / description_contains) mis en minuscules
+- des tables d'intervalles de montants triées pour les règles sans critère textuel
+
+Le moteur compilé est mis en cache au niveau du processus et n'est invalidé
+que lorsqu'une règle est créée, supprimée ou qu'une colonne compilée change
+(COMPILED_COLUMNS). Les modifications des autres processus sont détectées par
+une signature de la table, vérifiée au plus toutes les
+RULE_ENGINE_CHECK_INTERVAL secondes.
+"""
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from threading import Lock
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, inspect
+from app.extensions import db
+from app.models.tricount import AutoCategorizationRule
+
+# Colonnes des règles utilisées par le moteur compilé
+COMPILED_COLUMNS = ('merchant_contains', 'description_contains', 'min_amount', 'max_amount')
+
+DEFAULT_CHECK_INTERVAL = 5
+
+
+class AhoCorasickAutomaton:
+    """Automate Aho-Corasick pour rechercher plusieurs motifs en une seule passe"""
+
+    def __init__(self, needles):
+        """
+        Construit l'automate à partir d'une liste de motifs
+
+        Args:
+            needles (list): Liste de chaînes à rechercher (déjà en minuscules)
+        """
+        # Chaque état: transitions, lien d'échec, et indices des motifs terminés ici
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [set()]
+
+        for index, needle in enumerate(needles):
+            state = 0
+            for char in needle:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(set())
+                state = next_state
+            self._output[state].add(index)
+
+        # Calcul des liens d'échec en largeur d'abord
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def search(self, text):
+        """
+        Recherche tous les motifs présents dans un texte
+
+        Args:
+            text (str): Texte à analyser (déjà en minuscules)
+
+        Returns:
+            set: Indices des motifs trouvés
+        """
+        found = set()
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+
+        return found
+
+
+class RuleEngine:
+    """Matcher compilé regroupant toutes les règles d'auto-catégorisation"""
+
+    _cached = None
+    _cached_signature = None
+    _checked_at = 0.0
+    _dirty = True
+    _lock = Lock()
+
+    def __init__(self, rules):
+        """
+        Compile les règles fournies
+
+        Args:
+            rules (list): Liste d'objets AutoCategorizationRule
+        """
+        # Ordre de priorité des règles (même ordre que le parcours historique)
+        self.rule_ids = [rule.id for rule in sorted(rules, key=lambda r: r.id)]
+        self._position = {rule_id: index for index, rule_id in enumerate(self.rule_ids)}
+
+        needles = []
+        needle_index = {}
+
+        def register(value):
+            needle = value.lower()
+            if needle not in needle_index:
+                needle_index[needle] = len(needles)
+                needles.append(needle)
+            return needle_index[needle]
+
+        # Bornes de montant par règle (None si absentes)
+        self._bounds = {}
+        # Règles candidates par motif trouvé dans le marchand / la description
+        self._merchant_rules = {}
+        self._description_rules = {}
+        # Motif de description requis en plus du motif de marchand
+        self._required_description = {}
+
+        amount_only = []
+
+        for rule in rules:
+            self._bounds[rule.id] = (rule.min_amount, rule.max_amount)
+
+            merchant_needle = register(rule.merchant_contains) if rule.merchant_contains else None
+            description_needle = register(rule.description_contains) if rule.description_contains else None
+
+            if merchant_needle is not None:
+                self._merchant_rules.setdefault(merchant_needle, []).append(rule.id)
+                if description_needle is not None:
+                    self._required_description[rule.id] = description_needle
+            elif description_needle is not None:
+                self._description_rules.setdefault(description_needle, []).append(rule.id)
+            else:
+                amount_only.append(rule)
+
+        self._automaton = AhoCorasickAutomaton(needles)
+
+        # Tables d'intervalles triées pour les règles sans critère textuel
+        self._unbounded = [rule.id for rule in amount_only
+                           if rule.min_amount is None and rule.max_amount is None]
+        with_min = sorted((rule.min_amount, rule.id) for rule in amount_only if rule.min_amount is not None)
+        with_max = sorted((rule.max_amount, rule.id) for rule in amount_only if rule.max_amount is not None)
+        self._min_values = [value for value, _ in with_min]
+        self._min_rule_ids = [rule_id for _, rule_id in with_min]
+        self._max_values = [value for value, _ in with_max]
+        self._max_rule_ids = [rule_id for _, rule_id in with_max]
+        self._no_min = {rule.id for rule in amount_only if rule.min_amount is None}
+        self._no_max = {rule.id for rule in amount_only if rule.max_amount is None}
+
+    def _amount_matches(self, rule_id, amount):
+        """Vérifie les bornes de montant d'une règle"""
+        min_amount, max_amount = self._bounds[rule_id]
+        if min_amount is not None and amount < min_amount:
+            return False
+        if max_amount is not None and amount > max_amount:
+            return False
+        return True
+
+    def _amount_only_matches(self, amount):
+        """Règles sans critère textuel dont l'intervalle de montant contient le montant"""
+        # min_amount <= amount : préfixe de la table triée des minimums
+        above_min = set(self._min_rule_ids[:bisect_right(self._min_values, amount)]) | self._no_min
+        # max_amount >= amount : suffixe de la table triée des maximums
+        below_max = set(self._max_rule_ids[bisect_left(self._max_values, amount):]) | self._no_max
+        return (above_min & below_max) | set(self._unbounded)
+
+    def match(self, expense):
+        """
+        Retourne les IDs des règles correspondant à une dépense
+
+        Args:
+            expense (Expense): Dépense à tester
+
+        Returns:
+            list: IDs des règles correspondantes, dans l'ordre de priorité
+        """
+        merchant_found = self._automaton.search((expense.merchant or '').lower())
+        description_found = self._automaton.search((expense.description or '').lower())
+
+        candidates = set()
+
+        for needle in merchant_found:
+            for rule_id in self._merchant_rules.get(needle, ()):
+                required = self._required_description.get(rule_id)
+                if required is None or required in description_found:
+                    candidates.add(rule_id)
+
+        for needle in description_found:
+            candidates.update(self._description_rules.get(needle, ()))
+
+        matched = {rule_id for rule_id in candidates if self._amount_matches(rule_id, expense.amount)}
+        if self._unbounded or self._min_rule_ids or self._max_rule_ids:
+            matched |= self._amount_only_matches(expense.amount)
+
+        return sorted(matched, key=self._position.__getitem__)
+
+    def match_batch(self, expenses):
+        """
+        Calcule les règles correspondantes pour un lot de dépenses en une seule passe
+
+        Args:
+            expenses (iterable): Dépenses à tester
+
+        Returns:
+            dict: {expense_id: [rule_id, ...]} pour les dépenses ayant au moins une règle
+        """
+        results = {}
+        for expense in expenses:
+            rule_ids = self.match(expense)
+            if rule_ids:
+                results[expense.id] = rule_ids
+        return results
+
+    @staticmethod
+    def _table_signature():
+        """Signature légère de la table des règles (détecte les changements des autres processus)"""
+        return tuple(db.session.query(
+            func.count(AutoCategorizationRule.id),
+            func.max(AutoCategorizationRule.updated_at),
+            func.sum(AutoCategorizationRule.id)
+        ).one())
+
+    @classmethod
+    def get(cls):
+        """
+        Retourne le moteur compilé, en le reconstruisant uniquement si les règles ont changé
+
+        Returns:
+            RuleEngine: Moteur compilé
+        """
+        interval = DEFAULT_CHECK_INTERVAL
+        if has_app_context():
+            interval = current_app.config.get('RULE_ENGINE_CHECK_INTERVAL', DEFAULT_CHECK_INTERVAL)
+
+        with cls._lock:
+            now = time.monotonic()
+            # La signature n'est relue qu'à intervalle: get() est appelé pour chaque dépense d'un lot
+            if cls._dirty or cls._cached is None or now - cls._checked_at >= interval:
+                signature = cls._table_signature()
+                if cls._dirty or cls._cached is None or signature != cls._cached_signature:
+                    cls._cached = cls(AutoCategorizationRule.query.all())
+                    cls._cached_signature = signature
+                    cls._dirty = False
+                cls._checked_at = now
+            return cls._cached
+
+    @classmethod
+    def invalidate(cls):
+        """Force la recompilation au prochain appel de get()"""
+        cls._dirty = True
+
+
+@event.listens_for(AutoCategorizationRule, 'after_insert')
+@event.listens_for(AutoCategorizationRule, 'after_delete')
+def _invalidate_rule_engine(mapper, connection, target):
+    """Invalide le moteur compilé dès qu'une règle est créée ou supprimée"""
+    RuleEngine.invalidate()
+
+
+@event.listens_for(AutoCategorizationRule, 'after_update')
+def _invalidate_rule_engine_on_change(mapper, connection, target):
+    """
+    Invalide le moteur compilé si une colonne compilée a changé
+
+    after_update est aussi émis pour une règle seulement marquée modifiée (par
+    exemple rule.affected_expenses.append(expense) lors de l'application).
+    """
+    state = inspect(target)
+    if any(state.attrs[column].history.has_changes() for column in COMPILED_COLUMNS):
+        RuleEngine.invalidate()
@@ -0,0 +1,86 @@
+// app/static/js/common/job_progress.js
+/**
+ * Suivi des traitements exécutés en arrière-plan (voir app/services/job_runner.py)
+ *
+ * Les éléments portant data-job-id (macro job_progress) sont mis à jour
+ * automatiquement: barre de progression, étape en cours, puis résultat. Si
+ * data-job-reload-url est renseigné, la page est rechargée à la fin du traitement.
+ */
+class JobPoller {
+    /**
+     * Récupère l'état d'un traitement
+     * @param {number} jobId - ID du traitement
+     * @returns {Promise} Promesse contenant la réponse de l'API
+     */
+    static async get(jobId) {
+        return fetch(`/jobs/${jobId}`).then(response => response.json());
+    }
+
+    /**
+     * Attend la fin d'un traitement
+     * @param {number} jobId - ID du traitement
+     * @param {Function} onProgress - Appelée avec le traitement à chaque interrogation
+     * @param {number} interval - Délai entre deux interrogations (ms)
+     * @returns {Promise} Promesse contenant le traitement terminé
+     */
+    static async wait(jobId, onProgress = null, interval = 1000) {
+        while (true) {
+            const data = await JobPoller.get(jobId);
+            if (!data.success) {
+                throw new Error(data.error || 'Traitement introuvable');
+            }
+            if (onProgress) {
+                onProgress(data.job);
+            }
+            if (data.job.finished) {
+                return data.job;
+            }
+            await new Promise(resolve => setTimeout(resolve, interval));
+        }
+    }
+
+    /**
+     * Met à jour un élément de suivi avec l'état d'un traitement
+     * @param {HTMLElement} element - Élément de la macro job_progress
+     * @param {Object} job - Traitement renvoyé par l'API
+     */
+    static render(element, job) {
+        const bar = element.querySelector('.progress-bar');
+        const message = element.querySelector('[data-job-message]');
+
+        if (bar) {
+            bar.style.width = `${job.progress}%`;
+            bar.textContent = `${job.progress}%`;
+        }
+        if (message) {
+            message.textContent = job.status === 'failed' ? `Échec: ${job.error}` : (job.message || 'En attente...');
+        }
+        if (job.finished) {
+            element.classList.remove('alert-info');
+            element.classList.add(job.status === 'failed' ? 'alert-danger' : 'alert-success');
+            if (bar) {
+                bar.classList.remove('progress-bar-animated');
+            }
+        }
+    }
+
+    /**
+     * Suit tous les éléments data-job-id d'un conteneur
+     * @param {HTMLElement|Document} root - Conteneur à parcourir
+     */
+    static watchElements(root = document) {
+        root.querySelectorAll('[data-job-id]').forEach(element => {
+            JobPoller.wait(element.dataset.jobId, job => JobPoller.render(element, job))
+                .then(job => {
+                    if (job.status === 'succeeded' && element.dataset.jobReloadUrl) {
+                        window.location.href = element.dataset.jobReloadUrl;
+                    }
+                })
+                .catch(error => console.error('Job polling error:', error));
+        });
+    }
+}
+
+window.JobPoller = JobPoller;
+
+document.addEventListener('DOMContentLoaded', () => JobPoller.watchElements());
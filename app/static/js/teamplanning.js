@@ -291,6 +291,29 @@ class API {
         }).then(response => response.json());
     }
 
+    /**
+     * Extrait les événements de toute l'équipe en une seule requête
+     * @param {Object} options - Options de l'extraction (days, slots)
+     * @returns {Promise} Promesse contenant la réponse de l'API
+     */
+    static async extractTeam(options = {}) {
+        return fetch('/teamplanning/extract-team', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(options)
+        }).then(response => response.json());
+    }
+
+    /**
+     * Récupère les utilisateurs et jours modifiés depuis le planning précédent
+     * @returns {Promise} Promesse contenant la réponse de l'API (delta null si rien à comparer)
+     */
+    static async getPlanningDelta() {
+        return fetch('/teamplanning/planning-delta').then(response => response.json());
+    }
+
     static async extractMetadata() {
         return fetch('/teamplanning/extract-metadata', {
             method: 'POST',
@@ -371,10 +394,24 @@ class Teamplanning {
                         this.netplanningContent.classList.remove('d-none');
                     }
                     
-                    if (data.parsed) {
-                        UI.showStatusMessage('success', `Données récupérées et analysées avec succès! <a href="${window.location.pathname}view-planning/${data.parsed_planning_id}" class="alert-link">Voir le planning</a>`);
-                    } else if (data.is_new) {
-                        UI.showStatusMessage('success', 'Nouvelles données récupérées avec succès!');
+                    if (data.parse_job_id) {
+                        // Nouveau contenu: l'analyse se poursuit en arrière-plan
+                        UI.showStatusMessage('success', 'Nouvelles données récupérées, analyse en cours...');
+                        const job = await JobPoller.wait(data.parse_job_id, job => {
+                            UI.showStatusMessage('success', `Nouvelles données récupérées, analyse en cours (${job.progress}%)...`);
+                        });
+                        
+                        if (job.status === 'succeeded') {
+                            const delta = job.result.delta;
+                            const changes = delta
+                                ? ` (${delta.changed_users.length + delta.added_users.length} utilisateur(s) modifié(s))`
+                                : '';
+                            UI.showStatusMessage('success', `Données récupérées et analysées avec succès${changes}! <a href="${window.location.pathname}view-planning/${job.result.parsed_planning_id}" class="alert-link">Voir le planning</a>`);
+                        } else {
+                            UI.showStatusMessage('error', `Données récupérées, mais l'analyse a échoué: ${job.error}`);
+                        }
+                    } else if (data.parsed) {
+                        UI.showStatusMessage('success', `Données récupérées avec succès (aucun changement détecté). <a href="${window.location.pathname}view-planning/${data.parsed_planning_id}" class="alert-link">Voir le planning</a>`);
                     } else {
                         UI.showStatusMessage('success', 'Données récupérées avec succès (aucun changement détecté).');
                     }
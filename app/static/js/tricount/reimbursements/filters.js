@@ -216,6 +216,12 @@ export function submitFiltersAjax() {
         formData = new FormData(filterForm);
         formData.append('ajax', 'true');
         
+        // Le curseur de pagination n'est valable que pour cette requête
+        const cursorInput = filterForm.querySelector('input[name="cursor"]');
+        if (cursorInput) {
+            filterForm.removeChild(cursorInput);
+        }
+        
         // LOGS DE DÉBOGAGE: Vérifier tous les champs du formulaire
         console.log('🔍 Contenu du formulaire:');
         for (let pair of formData.entries()) {
@@ -310,6 +316,8 @@ function handlePaginationClick(e) {
     e.preventDefault();
     
     const page = this.dataset.page || '1';
+    // Curseur opaque (pagination par clé) pour les liens précédent/suivant
+    const cursor = this.dataset.cursor || '';
     
     // Mettre à jour le champ caché de page du formulaire
     const pageInput = document.createElement('input');
@@ -320,15 +328,26 @@ function handlePaginationClick(e) {
     const filterForm = document.getElementById('filter-form');
     if (!filterForm) return false;
     
-    // Supprimer l'ancien input de page s'il existe
+    // Supprimer les anciens inputs de page et de curseur s'ils existent
     const oldPageInput = filterForm.querySelector('input[name="page"]');
     if (oldPageInput) {
         filterForm.removeChild(oldPageInput);
     }
+    const oldCursorInput = filterForm.querySelector('input[name="cursor"]');
+    if (oldCursorInput) {
+        filterForm.removeChild(oldCursorInput);
+    }
     
     try {
-        // Ajouter le nouvel input
+        // Ajouter les nouveaux inputs
         filterForm.appendChild(pageInput);
+        if (cursor) {
+            const cursorInput = document.createElement('input');
+            cursorInput.type = 'hidden';
+            cursorInput.name = 'cursor';
+            cursorInput.value = cursor;
+            filterForm.appendChild(cursorInput);
+        }
         
         // Déclencher une soumission AJAX
         submitFiltersAjax();
@@ -110,9 +110,15 @@ export function updatePagination(pagination) {
             has_prev: !!pagination.has_prev,
             has_next: !!pagination.has_next,
             prev_num: parseInt(pagination.prev_num) || 1,
-            next_num: parseInt(pagination.next_num) || 2
+            next_num: parseInt(pagination.next_num) || 2,
+            prev_cursor: pagination.prev_cursor || '',
+            next_cursor: pagination.next_cursor || ''
         };
         
+        // Attributs de curseur pour les liens précédent/suivant (pagination par clé)
+        const prevCursorAttr = safePagination.prev_cursor ? ` data-cursor="${safePagination.prev_cursor}"` : '';
+        const nextCursorAttr = safePagination.next_cursor ? ` data-cursor="${safePagination.next_cursor}"` : '';
+        
         // Générer le HTML de pagination
         let html = '';
         
@@ -120,7 +126,7 @@ export function updatePagination(pagination) {
         if (safePagination.has_prev) {
             html += `
                 <li class="page-item">
-                    <a class="page-link" href="#" data-page="${safePagination.prev_num}">
+                    <a class="page-link" href="#" data-page="${safePagination.prev_num}"${prevCursorAttr}>
                         <i class="fas fa-chevron-left"></i> Précédent
                     </a>
                 </li>
@@ -159,7 +165,7 @@ export function updatePagination(pagination) {
         if (safePagination.has_next) {
             html += `
                 <li class="page-item">
-                    <a class="page-link" href="#" data-page="${safePagination.next_num}">
+                    <a class="page-link" href="#" data-page="${safePagination.next_num}"${nextCursorAttr}>
                         Suivant <i class="fas fa-chevron-right"></i>
                     </a>
                 </li>
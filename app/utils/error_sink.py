@@ -0,0 +1,343 @@
+# app/utils/error_sink.py
+"""
+Journal d'erreurs à écriture différée.
+
+`log_error` est appelé depuis la requête qui échoue: enregistrer l'erreur avec
+la session de la requête coûtait un commit supplémentaire et validait au passage
+tout ce qui était en attente dans cette session. Les erreurs sont désormais
+déposées dans une file bornée, vidée par un thread d'arrière-plan qui les insère
+par lots sur une connexion dédiée du moteur.
+
+Quand la file est pleine (rafale d'erreurs: robots, boucle JavaScript), les
+nouvelles erreurs sont abandonnées et comptées plutôt que de ralentir la
+requête. La file est vidée à l'arrêt du processus.
+
+Chaque lot est regroupé par empreinte (voir compute_fingerprint): une seule ligne
+par erreur dans error_following, dont le compteur d'occurrences est incrémenté
+(INSERT ... ON CONFLICT DO UPDATE), et les occurrences récentes dans
+error_occurrences, limitées à MAX_SAMPLES_PER_ERROR par erreur. Les compteurs
+journaliers de error_stats_daily sont incrémentés dans la même transaction.
+"""
+import atexit
+import logging
+import os
+import queue
+from datetime import datetime
+from threading import Event, Lock, Thread
+from flask import current_app
+from sqlalchemy import case, select
+from app.extensions import db
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ERROR_SINK_ASYNC': True,
+    'ERROR_SINK_QUEUE_SIZE': 1000,
+    'ERROR_SINK_BATCH_SIZE': 100,
+}
+
+# Délai maximal d'attente du thread d'écriture à l'arrêt du processus (secondes)
+SHUTDOWN_TIMEOUT = 5
+
+_STOP = object()
+
+
+class _FlushMarker:
+    """Marqueur déposé dans la file: signalé quand tout ce qui le précède est écrit"""
+
+    def __init__(self):
+        self.done = Event()
+
+
+class ErrorSink:
+    """File d'écriture différée des lignes de la table error_following"""
+
+    _queue = None
+    _thread = None
+    _pid = None
+    _batch_size = DEFAULTS['ERROR_SINK_BATCH_SIZE']
+    _lock = Lock()
+    _atexit_registered = False
+
+    # Compteurs depuis le démarrage du processus
+    _counters = {'enqueued': 0, 'written': 0, 'dropped': 0, 'failed': 0}
+    _counters_lock = Lock()
+
+    @classmethod
+    def _count(cls, name, value=1):
+        with cls._counters_lock:
+            cls._counters[name] += value
+
+    @staticmethod
+    def row_from_error(error):
+        """
+        Valeurs de colonnes d'une erreur (ErrorFollowing non sauvegardée)
+
+        La date de création est fixée ici: c'est celle de l'erreur, pas celle de l'écriture.
+
+        Args:
+            error (ErrorFollowing): Erreur construite dans le contexte de la requête
+
+        Returns:
+            dict: Valeurs des colonnes, sans l'ID
+        """
+        from app.models.error_following import compute_fingerprint
+
+        row = {
+            column.name: getattr(error, column.key)
+            for column in error.__table__.columns
+            if not column.primary_key
+        }
+        if row.get('created_at') is None:
+            row['created_at'] = datetime.utcnow()
+        if isinstance(row.get('stack_trace'), (list, tuple)):
+            row['stack_trace'] = ''.join(row['stack_trace'])
+        if not row.get('fingerprint'):
+            row['fingerprint'] = compute_fingerprint(row['error_type'], row['source'], row['stack_trace'])
+        row.update(
+            resolved=False,
+            resolved_at=None,
+            occurrence_count=1,
+            first_seen=row['created_at'],
+            last_seen=row['created_at']
+        )
+        return row
+
+    @classmethod
+    def _ensure_started(cls):
+        """Crée la file et démarre le thread d'écriture (à nouveau après un fork)"""
+        with cls._lock:
+            if cls._thread is not None and cls._thread.is_alive() and cls._pid == os.getpid():
+                return
+            config = current_app.config
+            cls._queue = queue.Queue(maxsize=config.get('ERROR_SINK_QUEUE_SIZE', DEFAULTS['ERROR_SINK_QUEUE_SIZE']))
+            cls._batch_size = config.get('ERROR_SINK_BATCH_SIZE', DEFAULTS['ERROR_SINK_BATCH_SIZE'])
+            cls._pid = os.getpid()
+            cls._thread = Thread(target=cls._drain, name='qb-error-sink', daemon=True)
+            cls._thread.start()
+            if not cls._atexit_registered:
+                atexit.register(cls.shutdown)
+                cls._atexit_registered = True
+
+    @classmethod
+    def enqueue(cls, error):
+        """
+        Dépose une erreur dans la file d'écriture, sans jamais bloquer
+
+        Si ERROR_SINK_ASYNC est désactivé, l'erreur est écrite immédiatement (sur la
+        connexion dédiée également, jamais avec la session de la requête).
+
+        Args:
+            error (ErrorFollowing): Erreur construite dans le contexte de la requête
+
+        Returns:
+            bool: True si l'erreur est enregistrée ou en attente, False si abandonnée
+        """
+        row = cls.row_from_error(error)
+        engine = db.engine
+
+        if not current_app.config.get('ERROR_SINK_ASYNC', DEFAULTS['ERROR_SINK_ASYNC']):
+            return cls._write(engine, [row])
+
+        cls._ensure_started()
+        try:
+            cls._queue.put_nowait((engine, row))
+        except queue.Full:
+            cls._count('dropped')
+            return False
+        cls._count('enqueued')
+        return True
+
+    @staticmethod
+    def _group_rows(rows):
+        """
+        Regroupe les lignes d'un lot par empreinte
+
+        Returns:
+            dict: {empreinte: (ligne de l'erreur regroupée, [occurrences les plus récentes])}
+        """
+        from app.models.error_following import MAX_SAMPLES_PER_ERROR
+
+        grouped = {}
+        for row in sorted(rows, key=lambda r: r['created_at']):
+            grouped.setdefault(row['fingerprint'], []).append(row)
+
+        result = {}
+        for fingerprint, occurrences in grouped.items():
+            group = dict(occurrences[-1])
+            group.update(
+                occurrence_count=len(occurrences),
+                first_seen=occurrences[0]['created_at'],
+                created_at=occurrences[0]['created_at']
+            )
+            result[fingerprint] = (group, occurrences[-MAX_SAMPLES_PER_ERROR:])
+        return result
+
+    @staticmethod
+    def _store(connection, rows):
+        """
+        Enregistre un lot d'erreurs: une ligne par empreinte, occurrences récentes plafonnées
+
+        Une erreur résolue qui se reproduit redevient non résolue.
+
+        Args:
+            connection: Connexion dans une transaction ouverte
+            rows (list): Lignes produites par row_from_error
+        """
+        from app.models.error_following import (
+            ErrorFollowing, ErrorOccurrence, ErrorStatsDaily, MAX_SAMPLES_PER_ERROR
+        )
+        from app.utils.sql_query_utils import insert_ignoring_conflicts
+
+        errors = ErrorFollowing.__table__
+        occurrences = ErrorOccurrence.__table__
+        grouped = ErrorSink._group_rows(rows)
+
+        ErrorStatsDaily.increment(connection, ErrorStatsDaily.count_rows(rows))
+
+        upsert = insert_ignoring_conflicts(errors, bind=connection)
+        excluded = upsert.excluded
+        updated = {column: excluded[column] for column in ErrorFollowing.OCCURRENCE_COLUMNS}
+        updated.update(
+            occurrence_count=errors.c.occurrence_count + excluded.occurrence_count,
+            last_seen=case((excluded.last_seen > errors.c.last_seen, excluded.last_seen), else_=errors.c.last_seen),
+            resolved=False,
+            resolved_at=None
+        )
+        connection.execute(
+            upsert.on_conflict_do_update(index_elements=[errors.c.fingerprint], set_=updated),
+            [group for group, _ in grouped.values()]
+        )
+
+        ids = connection.execute(
+            select(errors.c.fingerprint, errors.c.id, errors.c.occurrence_count)
+            .where(errors.c.fingerprint.in_(list(grouped)))
+        ).all()
+
+        samples = []
+        for fingerprint, error_id, _ in ids:
+            for row in grouped[fingerprint][1]:
+                sample = {column: row[column] for column in ErrorFollowing.OCCURRENCE_COLUMNS}
+                sample.update(error_id=error_id, created_at=row['created_at'])
+                samples.append(sample)
+        connection.execute(occurrences.insert(), samples)
+
+        # Ne garder que les occurrences les plus récentes des erreurs qui dépassent le plafond
+        for _, error_id, occurrence_count in ids:
+            if occurrence_count <= MAX_SAMPLES_PER_ERROR:
+                continue
+            kept = (
+                select(occurrences.c.id)
+                .where(occurrences.c.error_id == error_id)
+                .order_by(occurrences.c.created_at.desc(), occurrences.c.id.desc())
+                .limit(MAX_SAMPLES_PER_ERROR)
+            )
+            connection.execute(
+                occurrences.delete().where(occurrences.c.error_id == error_id, occurrences.c.id.notin_(kept))
+            )
+
+    @classmethod
+    def _write(cls, engine, rows):
+        """
+        Enregistre un lot d'erreurs dans une transaction dédiée
+
+        Returns:
+            bool: True si le lot a été écrit
+        """
+        try:
+            with engine.begin() as connection:
+                cls._store(connection, rows)
+        except Exception as e:
+            cls._count('failed', len(rows))
+            logger.error("Échec de l'enregistrement de %d erreur(s): %s", len(rows), e)
+            return False
+        cls._count('written', len(rows))
+        return True
+
+    @classmethod
+    def _write_batch(cls, batch):
+        """Écrit un lot, groupé par moteur (une application de test peut avoir le sien)"""
+        by_engine = {}
+        for engine, row in batch:
+            by_engine.setdefault(engine, []).append(row)
+        for engine, rows in by_engine.items():
+            cls._write(engine, rows)
+
+    @classmethod
+    def _drain(cls):
+        """Boucle du thread d'écriture: attend une erreur puis écrit tout ce qui est en file"""
+        pending = cls._queue
+        while True:
+            item = pending.get()
+            batch = []
+            markers = []
+            stop = False
+
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, _FlushMarker):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= cls._batch_size:
+                    break
+                try:
+                    item = pending.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                cls._write_batch(batch)
+            for marker in markers:
+                marker.done.set()
+            if stop:
+                return
+
+    @classmethod
+    def flush(cls, timeout=SHUTDOWN_TIMEOUT):
+        """
+        Attend l'écriture de toutes les erreurs déjà en file
+
+        Args:
+            timeout (float): Délai maximal d'attente (secondes)
+
+        Returns:
+            bool: True si la file a été vidée dans le délai
+        """
+        if cls._thread is None or not cls._thread.is_alive() or cls._pid != os.getpid():
+            return True
+        marker = _FlushMarker()
+        try:
+            cls._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout)
+
+    @classmethod
+    def shutdown(cls, timeout=SHUTDOWN_TIMEOUT):
+        """Vide la file puis arrête le thread d'écriture (enregistré avec atexit)"""
+        with cls._lock:
+            thread = cls._thread
+            if thread is None or not thread.is_alive() or cls._pid != os.getpid():
+                return
+            try:
+                cls._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                logger.warning("Journal d'erreurs: file pleine à l'arrêt, %d erreur(s) perdue(s)", cls._queue.qsize())
+                return
+            thread.join(timeout)
+            cls._thread = None
+
+    @classmethod
+    def stats(cls):
+        """
+        Compteurs du journal depuis le démarrage du processus
+
+        Returns:
+            dict: {'enqueued', 'written', 'dropped', 'failed', 'queued'}
+        """
+        with cls._counters_lock:
+            result = dict(cls._counters)
+        result['queued'] = cls._queue.qsize() if cls._queue is not None else 0
+        return result
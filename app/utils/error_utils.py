@@ -14,6 +14,10 @@ def log_error(error_type, source, message, stack_trace=None, additional_info=Non
     """
     Enregistre une erreur dans la table ErrorFollowing
     
+    L'erreur est construite dans le contexte de la requête puis confiée au journal
+    à écriture différée (voir app/utils/error_sink.py): la session de la requête
+    n'est ni utilisée ni validée.
+    
     Args:
         error_type (str): Type d'erreur ('exception', 'redirection', etc.)
         source (str): Source de l'erreur (nom de la fonction, route, etc.)
@@ -22,12 +26,12 @@ def log_error(error_type, source, message, stack_trace=None, additional_info=Non
         additional_info (dict, optional): Informations supplémentaires
     
     Returns:
-        bool: True si l'erreur a été enregistrée, False sinon
+        bool: True si l'erreur a été enregistrée ou mise en file, False sinon
     """
     try:
         # Import local pour éviter les imports circulaires
-        from app.extensions import db
         from app.models.error_following import ErrorFollowing
+        from app.utils.error_sink import ErrorSink
         
         # Collecter des informations supplémentaires sur la requête
         all_info = {
@@ -59,11 +63,8 @@ def log_error(error_type, source, message, stack_trace=None, additional_info=Non
             additional_info=all_info
         )
         
-        # Enregistrer l'erreur
-        db.session.add(error)
-        db.session.commit()
-        
-        return True
+        # Enregistrer l'erreur (écriture différée, par lots)
+        return ErrorSink.enqueue(error)
     except Exception as e:
         # Ne pas provoquer une erreur supplémentaire, juste logger l'échec
         current_app.logger.error(f"Erreur lors de l'enregistrement de l'erreur: {str(e)}")
@@ -0,0 +1,182 @@
+# app/utils/identity_cache.py
+"""
+Cache des utilisateurs connectés pour le user_loader de Flask-Login.
+
+`load_user` relisait l'utilisateur à chaque requête, puis ses groupes et leurs
+permissions (relations lazy='subquery'): trois requêtes avant même le travail de
+la page. Le user_loader renvoie désormais un instantané en lecture seule
+(UserSnapshot), conservé dans un cache LRU du processus pendant
+IDENTITY_CACHE_TTL secondes.
+
+Si IDENTITY_CACHE_REDIS_URL est défini (et le paquet redis installé), les
+instantanés sont aussi partagés entre processus via Redis, sous une clé portant
+une génération: invalider tous les utilisateurs revient à incrémenter la
+génération.
+
+Les instantanés sont invalidés à la validation des modifications des
+utilisateurs, groupes et permissions (mêmes événements que PermissionCache,
+voir app/models/user.py), donc depuis les routes d'administration des
+utilisateurs et des groupes comme depuis les commandes. Dans les autres
+processus, le cache local expire après IDENTITY_CACHE_TTL secondes, ou dès que
+PermissionCache détecte un changement des groupes et permissions.
+"""
+import json
+import logging
+import time
+from collections import OrderedDict
+from threading import Lock
+from flask import current_app, has_app_context
+from app.extensions import db
+from app.utils.permission_cache import ALL_USERS, PermissionCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'IDENTITY_CACHE_TTL': 30,
+    'IDENTITY_CACHE_SIZE': 256,
+    'IDENTITY_CACHE_REDIS_URL': None,
+}
+
+KEY_PREFIX = 'qb:identity'
+GENERATION_KEY = f'{KEY_PREFIX}:generation'
+
+
+class IdentityCache:
+    """Instantanés des utilisateurs connectés: LRU local, Redis optionnel"""
+
+    _entries = OrderedDict()
+    _invalidations = 0
+    _lock = Lock()
+    _backend = None
+    _backend_url = None
+
+    @classmethod
+    def _settings(cls):
+        config = current_app.config
+        return (
+            config.get('IDENTITY_CACHE_TTL', DEFAULTS['IDENTITY_CACHE_TTL']),
+            config.get('IDENTITY_CACHE_SIZE', DEFAULTS['IDENTITY_CACHE_SIZE'])
+        )
+
+    @classmethod
+    def _shared_backend(cls):
+        """Client Redis si IDENTITY_CACHE_REDIS_URL est défini, sinon None"""
+        url = current_app.config.get('IDENTITY_CACHE_REDIS_URL', DEFAULTS['IDENTITY_CACHE_REDIS_URL'])
+        if not url:
+            return None
+        if cls._backend_url != url:
+            cls._backend_url = url
+            try:
+                import redis
+                cls._backend = redis.Redis.from_url(url, socket_timeout=0.5)
+            except ImportError:
+                logger.warning("IDENTITY_CACHE_REDIS_URL défini mais le paquet redis n'est pas installé: cache local seul")
+                cls._backend = None
+        return cls._backend
+
+    @staticmethod
+    def _shared_key(backend, user_id):
+        generation = int(backend.get(GENERATION_KEY) or 0)
+        return f'{KEY_PREFIX}:{generation}:{user_id}'
+
+    @classmethod
+    def _get_shared(cls, user_id):
+        """Données partagées d'un utilisateur (None si absentes ou Redis indisponible)"""
+        backend = cls._shared_backend()
+        if backend is None:
+            return None
+        try:
+            raw = backend.get(cls._shared_key(backend, user_id))
+        except Exception as e:
+            logger.warning("Cache des utilisateurs: Redis indisponible (%s)", e)
+            return None
+        return json.loads(raw) if raw else None
+
+    @classmethod
+    def _set_shared(cls, user_id, data, ttl):
+        backend = cls._shared_backend()
+        if backend is None:
+            return
+        try:
+            backend.set(cls._shared_key(backend, user_id), json.dumps(data), ex=ttl)
+        except Exception as e:
+            logger.warning("Cache des utilisateurs: Redis indisponible (%s)", e)
+
+    @staticmethod
+    def _load_data(user_id):
+        """Données de l'instantané lues en base (None si l'utilisateur n'existe plus)"""
+        from app.models.user import User
+        from app.models.user_snapshot import UserSnapshot
+
+        user = db.session.get(User, user_id)
+        return UserSnapshot.data_from_user(user) if user is not None else None
+
+    @classmethod
+    def get(cls, user_id):
+        """
+        Instantané d'un utilisateur, pour le user_loader
+
+        Args:
+            user_id (int): ID de l'utilisateur
+
+        Returns:
+            UserSnapshot: Utilisateur en lecture seule, ou None s'il n'existe plus
+        """
+        from app.models.user_snapshot import UserSnapshot
+
+        ttl, size = cls._settings()
+        # Détecte aussi les changements de groupes et permissions des autres processus
+        version = PermissionCache.version()
+        now = time.monotonic()
+
+        with cls._lock:
+            invalidations = cls._invalidations
+            entry = cls._entries.get(user_id)
+            if entry is not None and entry[0] > now and entry[1] == version:
+                cls._entries.move_to_end(user_id)
+                return entry[2]
+
+        data = cls._get_shared(user_id)
+        if data is None:
+            data = cls._load_data(user_id)
+            if data is None:
+                return None
+            cls._set_shared(user_id, data, ttl)
+
+        snapshot = UserSnapshot(data)
+        with cls._lock:
+            # Ne pas conserver un instantané lu avant une invalidation survenue entre-temps
+            if cls._invalidations == invalidations:
+                cls._entries[user_id] = (now + ttl, version, snapshot)
+                cls._entries.move_to_end(user_id)
+                while len(cls._entries) > size:
+                    cls._entries.popitem(last=False)
+        return snapshot
+
+    @classmethod
+    def invalidate(cls, user_ids=None):
+        """
+        Invalide les instantanés, localement et dans Redis
+
+        Args:
+            user_ids (iterable): Utilisateurs à invalider (par défaut ou si ALL_USERS y figure: tous)
+        """
+        user_ids = None if user_ids is None or ALL_USERS in user_ids else list(user_ids)
+        with cls._lock:
+            cls._invalidations += 1
+            if user_ids is None:
+                cls._entries.clear()
+            else:
+                for user_id in user_ids:
+                    cls._entries.pop(user_id, None)
+
+        backend = cls._shared_backend() if has_app_context() else None
+        if backend is None:
+            return
+        try:
+            if user_ids is None:
+                backend.incr(GENERATION_KEY)
+            elif user_ids:
+                backend.delete(*[cls._shared_key(backend, user_id) for user_id in user_ids])
+        except Exception as e:
+            logger.warning("Cache des utilisateurs: invalidation Redis impossible (%s)", e)
@@ -0,0 +1,231 @@
+# app/utils/permission_cache.py
+"""
+Cache des permissions des utilisateurs.
+
+`has_permission` et `is_admin` sont appelés à chaque requête (avant chaque
+route tricount notamment) et parcouraient groupes x permissions en Python, en
+chargeant au besoin les tables d'association. Les groupes et permissions d'un
+utilisateur sont désormais lus en une requête puis conservés dans le processus,
+sous forme d'ensembles figés.
+
+Chaque entrée porte le numéro de version du cache au moment de son calcul. Les
+modifications des utilisateurs, groupes et permissions (événements SQLAlchemy,
+appliqués à la validation de la transaction) incrémentent la version ou retirent
+l'entrée de l'utilisateur concerné.
+
+Les modifications faites par un autre processus sont détectées par le compteur
+de la table permission_version (PermissionVersion), incrémenté dans la même
+transaction que chaque modification des groupes, permissions ou appartenances,
+et relu au plus toutes les PERMISSION_CACHE_CHECK_INTERVAL secondes. Tant que
+la table n'existe pas (avant `flask upgrade_schema`), le cache est vidé à chaque
+vérification.
+"""
+import time
+from collections import namedtuple
+from threading import Lock
+from flask import current_app, has_app_context
+from sqlalchemy import select
+from app.extensions import db
+
+DEFAULT_CHECK_INTERVAL = 30
+
+# Clés de session.info: invalidations en attente de validation, compteur déjà incrémenté
+PENDING_KEY = 'permission_cache_pending'
+BUMPED_KEY = 'permission_version_bumped'
+ALL_USERS = '*'
+
+# Ligne unique de la table permission_version
+VERSION_ROW_ID = 1
+
+UserPermissions = namedtuple('UserPermissions', ['groups', 'permissions'])
+UserPermissions.__doc__ = """Groupes (noms) et permissions ((outil, nom)) d'un utilisateur, en ensembles figés"""
+
+NO_PERMISSIONS = UserPermissions(frozenset(), frozenset())
+
+
+class PermissionCache:
+    """Groupes et permissions par utilisateur, invalidés par numéro de version"""
+
+    _entries = {}
+    _version = 0
+    _stored_version = None
+    _version_table = False
+    _checked_at = 0.0
+    _lock = Lock()
+
+    @staticmethod
+    def _check_interval():
+        if has_app_context():
+            return current_app.config.get('PERMISSION_CACHE_CHECK_INTERVAL', DEFAULT_CHECK_INTERVAL)
+        return DEFAULT_CHECK_INTERVAL
+
+    @classmethod
+    def _has_version_table(cls, connection):
+        """Vérifie (une fois trouvée, plus jamais) la présence de la table permission_version"""
+        if not cls._version_table:
+            cls._version_table = db.inspect(connection).has_table('permission_version')
+        return cls._version_table
+
+    @classmethod
+    def _read_stored_version(cls):
+        """Compteur partagé de la table permission_version (None si la table ou la ligne manque)"""
+        from app.models.user import PermissionVersion
+
+        if not cls._has_version_table(db.session.connection()):
+            return None
+        return db.session.execute(
+            select(PermissionVersion.version).where(PermissionVersion.id == VERSION_ROW_ID)
+        ).scalar()
+
+    @classmethod
+    def _check_other_processes(cls):
+        """Incrémente la version si le compteur partagé a changé depuis la dernière vérification"""
+        now = time.monotonic()
+        if now - cls._checked_at < cls._check_interval():
+            return
+        stored = cls._read_stored_version()
+        with cls._lock:
+            # Sans compteur partagé, les entrées ne vivent qu'un intervalle de vérification
+            if stored is None or (cls._stored_version is not None and stored != cls._stored_version):
+                cls._version += 1
+                cls._entries.clear()
+            cls._stored_version = stored
+            cls._checked_at = now
+
+    @classmethod
+    def bump_stored_version(cls, connection, session):
+        """
+        Incrémente le compteur partagé dans la transaction de la modification
+
+        Appelé depuis les événements de flush: une seule incrémentation par transaction.
+
+        Args:
+            connection: Connexion du flush en cours
+            session: Session SQLAlchemy de la modification
+        """
+        from app.models.user import PermissionVersion
+
+        if session is not None:
+            if session.info.get(BUMPED_KEY):
+                return
+            session.info[BUMPED_KEY] = True
+        if not cls._has_version_table(connection):
+            return
+
+        table = PermissionVersion.__table__
+        result = connection.execute(
+            table.update().where(table.c.id == VERSION_ROW_ID).values(version=table.c.version + 1)
+        )
+        if result.rowcount == 0:
+            connection.execute(table.insert().values(id=VERSION_ROW_ID, version=1))
+
+    @classmethod
+    def version(cls):
+        """
+        Numéro de version courant, après vérification des autres processus
+
+        Returns:
+            int: Incrémenté à chaque invalidation globale
+        """
+        cls._check_other_processes()
+        return cls._version
+
+    @staticmethod
+    def _load(user_id):
+        """Groupes et permissions d'un utilisateur, en une requête"""
+        from app.models.user import Group, Permission, user_groups, group_permissions
+
+        rows = db.session.execute(
+            select(Group.name, Permission.tool, Permission.name)
+            .select_from(user_groups)
+            .join(Group, Group.id == user_groups.c.group_id)
+            .outerjoin(group_permissions, group_permissions.c.group_id == Group.id)
+            .outerjoin(Permission, Permission.id == group_permissions.c.permission_id)
+            .where(user_groups.c.user_id == user_id)
+        ).all()
+        return UserPermissions(
+            groups=frozenset(group for group, _, _ in rows),
+            permissions=frozenset((tool, name) for _, tool, name in rows if tool is not None)
+        )
+
+    @classmethod
+    def get(cls, user_id):
+        """
+        Groupes et permissions d'un utilisateur
+
+        Args:
+            user_id (int): ID de l'utilisateur
+
+        Returns:
+            UserPermissions: Ensembles figés des noms de groupes et des couples (outil, permission)
+        """
+        if user_id is None:
+            return NO_PERMISSIONS
+
+        cls._check_other_processes()
+        version = cls._version
+        entry = cls._entries.get(user_id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        permissions = cls._load(user_id)
+        with cls._lock:
+            # Ne pas conserver un calcul fait avant une invalidation survenue entre-temps
+            if cls._version == version:
+                cls._entries[user_id] = (version, permissions)
+        return permissions
+
+    @classmethod
+    def invalidate(cls, user_id=None):
+        """
+        Invalide immédiatement le cache
+
+        Args:
+            user_id (int): Utilisateur à invalider (par défaut: tous, par incrément de version)
+        """
+        with cls._lock:
+            if user_id is None or user_id == ALL_USERS:
+                cls._version += 1
+                cls._entries.clear()
+            else:
+                cls._entries.pop(user_id, None)
+            cls._checked_at = 0.0
+
+    @staticmethod
+    def schedule_invalidation(session, user_id=None):
+        """
+        Invalide le cache à la validation de la transaction en cours (rien en cas d'annulation)
+
+        Args:
+            session: Session SQLAlchemy de la modification
+            user_id (int): Utilisateur concerné (par défaut: tous)
+        """
+        if session is None:
+            PermissionCache.invalidate(user_id)
+            return
+        session.info.setdefault(PENDING_KEY, set()).add(ALL_USERS if user_id is None else user_id)
+
+    @classmethod
+    def apply_pending(cls, session):
+        """
+        Applique les invalidations enregistrées par schedule_invalidation (après validation)
+
+        Returns:
+            set: Utilisateurs invalidés (ALL_USERS pour tous), vide si aucun
+        """
+        session.info.pop(BUMPED_KEY, None)
+        pending = session.info.pop(PENDING_KEY, None)
+        if not pending:
+            return set()
+        if ALL_USERS in pending:
+            cls.invalidate()
+        else:
+            for user_id in pending:
+                cls.invalidate(user_id)
+        return pending
+
+    @staticmethod
+    def discard_pending(session):
+        """Oublie les invalidations d'une transaction annulée"""
+        session.info.pop(PENDING_KEY, None)
+        session.info.pop(BUMPED_KEY, None)
@@ -0,0 +1,114 @@
+# app/utils/query_counter.py
+"""
+Comptage des requêtes SQL exécutées, pour détecter les régressions N+1.
+
+- QueryCounter: gestionnaire de contexte qui enregistre les requêtes du thread courant
+- assert_max_queries: échoue (QueryBudgetExceeded) si un bloc dépasse un budget
+- query_budget: décorateur de vue, actif si SQL_QUERY_BUDGET_CHECK est activé
+"""
+from contextlib import contextmanager
+from functools import wraps
+from threading import get_ident
+from flask import current_app
+from sqlalchemy import event
+from app.extensions import db
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Levée lorsqu'un bloc ou une vue dépasse son budget de requêtes SQL"""
+
+
+class QueryCounter:
+    """Enregistre les requêtes SQL exécutées par le thread courant"""
+
+    def __init__(self, engine=None):
+        """
+        Args:
+            engine: Moteur SQLAlchemy à observer (par défaut db.engine)
+        """
+        self.engine = engine
+        self.statements = []
+        self._thread_id = None
+
+    @property
+    def count(self):
+        """Nombre de requêtes enregistrées"""
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Le moteur est partagé: ignorer les requêtes des autres threads
+        if get_ident() == self._thread_id:
+            self.statements.append(statement)
+
+    def __enter__(self):
+        if self.engine is None:
+            self.engine = db.engine
+        self._thread_id = get_ident()
+        event.listen(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        event.remove(self.engine, 'before_cursor_execute', self._before_cursor_execute)
+        return False
+
+    def report(self):
+        """Liste numérotée des requêtes (première ligne de chacune)"""
+        return '\n'.join(
+            f"{index}. {statement.strip().splitlines()[0]}"
+            for index, statement in enumerate(self.statements, start=1)
+        )
+
+
+@contextmanager
+def assert_max_queries(budget, engine=None):
+    """
+    Vérifie qu'un bloc n'exécute pas plus de `budget` requêtes SQL
+
+    Args:
+        budget (int): Nombre maximal de requêtes
+        engine: Moteur SQLAlchemy à observer (par défaut db.engine)
+
+    Yields:
+        QueryCounter: Compteur du bloc
+
+    Raises:
+        QueryBudgetExceeded: Si le budget est dépassé
+    """
+    with QueryCounter(engine) as counter:
+        yield counter
+
+    if counter.count > budget:
+        raise QueryBudgetExceeded(
+            f"{counter.count} requêtes SQL pour un budget de {budget}:\n{counter.report()}"
+        )
+
+
+def query_budget(budget):
+    """
+    Décorateur de vue: contrôle le nombre de requêtes SQL d'une requête HTTP.
+
+    Inactif sauf si SQL_QUERY_BUDGET_CHECK est activé. En mode TESTING un
+    dépassement lève QueryBudgetExceeded, sinon il est journalisé.
+
+    Args:
+        budget (int): Nombre maximal de requêtes pour la vue
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('SQL_QUERY_BUDGET_CHECK'):
+                return view(*args, **kwargs)
+
+            with QueryCounter() as counter:
+                response = view(*args, **kwargs)
+
+            if counter.count > budget:
+                message = (f"{view.__name__}: {counter.count} requêtes SQL "
+                           f"pour un budget de {budget}:\n{counter.report()}")
+                if current_app.config.get('TESTING'):
+                    raise QueryBudgetExceeded(message)
+                current_app.logger.warning(message)
+
+            return response
+        return wrapper
+    return decorator
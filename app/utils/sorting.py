@@ -3,8 +3,13 @@
 Utilitaires pour le tri et la pagination des données dans les requêtes SQL
 """
 
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from math import ceil
 from flask import request
-from sqlalchemy import asc, desc
+from sqlalchemy import and_, asc, desc, or_
 
 
 def get_sort_params(default_sort='date', default_order='desc'):
@@ -161,4 +166,246 @@ def prepare_paginated_response(query, page, per_page, item_processor=None):
     return {
         'items': items,
         'pagination': pagination
-    }
\ No newline at end of file
+    }
+# --- Pagination par clé (keyset / seek) ---
+
+def _encode_cursor_value(value):
+    """Sérialise une valeur de tri en conservant son type"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return ['dt', value.isoformat()]
+    if isinstance(value, date):
+        return ['d', value.isoformat()]
+    if isinstance(value, Decimal):
+        return ['dec', str(value)]
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"Type de valeur de tri non supporté: {type(value).__name__}")
+    return ['raw', value]
+
+def _decode_cursor_value(encoded):
+    """Reconstruit une valeur de tri sérialisée par _encode_cursor_value"""
+    kind, raw = encoded
+    if kind == 'dt':
+        return datetime.fromisoformat(raw)
+    if kind == 'd':
+        return date.fromisoformat(raw)
+    if kind == 'dec':
+        return Decimal(raw)
+    if kind == 'raw' and isinstance(raw, (int, float, str)):
+        return raw
+    raise ValueError(f"Type de curseur inconnu: {kind}")
+
+def encode_cursor(sort_key, order, value, item_id, page, direction='next'):
+    """
+    Construit un curseur opaque désignant une position dans une liste triée
+    
+    Args:
+        sort_key (str): Nom du tri (date, amount, etc.)
+        order (str): Ordre de tri ('asc' ou 'desc')
+        value: Valeur de la colonne de tri de la ligne de référence
+        item_id (int): ID de la ligne de référence (départage des égalités)
+        page (int): Numéro de la page désignée (affichage uniquement)
+        direction (str): 'next' pour les lignes après la référence, 'prev' pour celles avant
+        
+    Returns:
+        str: Curseur encodé en base64 (URL-safe), ou None si la valeur n'est pas encodable
+    """
+    if value is None:
+        return None
+    
+    payload = {
+        's': sort_key,
+        'o': order,
+        'v': _encode_cursor_value(value),
+        'i': item_id,
+        'p': page,
+        'd': direction
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token, sort_key, order):
+    """
+    Décode un curseur et vérifie qu'il correspond au tri courant
+    
+    Args:
+        token (str): Curseur reçu du client
+        sort_key (str): Tri courant
+        order (str): Ordre de tri courant
+        
+    Returns:
+        dict: {'value', 'id', 'page', 'direction'} ou None si le curseur est absent ou invalide
+    """
+    if not token:
+        return None
+    
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        
+        # Un curseur émis pour un autre tri n'a pas de sens: repartir du début
+        if payload['s'] != sort_key or payload['o'] != order:
+            return None
+        if payload['d'] not in ('next', 'prev'):
+            return None
+        
+        return {
+            'value': _decode_cursor_value(payload['v']),
+            'id': int(payload['i']),
+            'page': max(int(payload['p']), 1),
+            'direction': payload['d']
+        }
+    except (ValueError, TypeError, KeyError, IndexError):
+        return None
+
+class KeysetPage:
+    """
+    Page de résultats paginée par clé, compatible avec les attributs
+    utilisés dans les templates pour l'objet Pagination de Flask-SQLAlchemy
+    """
+    
+    def __init__(self, items, page, per_page, has_prev, has_next,
+                 prev_cursor=None, next_cursor=None, total=None):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.has_prev = has_prev
+        self.has_next = has_next
+        self.prev_cursor = prev_cursor
+        self.next_cursor = next_cursor
+        # Total optionnel (None si inconnu): aucun COUNT(*) n'est exécuté ici
+        self.total = total
+    
+    @property
+    def pages(self):
+        """Nombre de pages si le total est connu, sinon au moins la page courante"""
+        if self.total is None:
+            return self.page + (1 if self.has_next else 0)
+        return max(ceil(self.total / self.per_page), self.page) if self.per_page else 0
+    
+    @property
+    def prev_num(self):
+        return self.page - 1 if self.has_prev else None
+    
+    @property
+    def next_num(self):
+        return self.page + 1 if self.has_next else None
+    
+    def to_dict(self):
+        """Données de pagination pour les réponses JSON"""
+        return {
+            'page': self.page,
+            'pages': self.pages,
+            'total': self.total,
+            'has_prev': self.has_prev,
+            'has_next': self.has_next,
+            'prev_num': self.prev_num,
+            'next_num': self.next_num,
+            'prev_cursor': self.prev_cursor,
+            'next_cursor': self.next_cursor
+        }
+
+def keyset_paginate(query, sort_key, sort_column, sort_attr, order, id_column,
+                    page=1, per_page=20, cursor=None, total=None):
+    """
+    Pagine une requête par clé (colonne de tri, id) plutôt que par OFFSET.
+    
+    Avec un curseur valide, la page est obtenue par une condition
+    `(col, id) > (valeur, id)` qui profite d'un index sur (col, id): le coût
+    ne dépend plus de la profondeur de la page. Sans curseur, la page demandée
+    est lue par OFFSET (accès direct à une page numérotée). Dans les deux cas,
+    une ligne supplémentaire est lue pour savoir s'il existe une page suivante,
+    sans COUNT(*).
+    
+    Args:
+        query: Requête SQLAlchemy filtrée (son tri éventuel est remplacé)
+        sort_key (str): Nom du tri, enregistré dans les curseurs
+        sort_column: Expression SQL de tri (non nulle de préférence)
+        sort_attr (str): Attribut des objets retournés portant la valeur de tri
+        order (str): Ordre de tri ('asc' ou 'desc')
+        id_column: Colonne de départage (clé primaire)
+        page (int): Page demandée lorsque aucun curseur n'est fourni
+        per_page (int): Nombre de lignes par page
+        cursor (str): Curseur opaque reçu du client
+        total (int): Nombre total de lignes s'il est déjà connu (optionnel)
+        
+    Returns:
+        KeysetPage: Page de résultats avec les curseurs précédent/suivant
+    """
+    if order not in ('asc', 'desc'):
+        order = 'desc'
+    page = max(page or 1, 1)
+    
+    token = decode_cursor(cursor, sort_key, order)
+    query = query.order_by(None)
+    
+    if token is not None:
+        value, ref_id = token['value'], token['id']
+        # Parcourir vers l'avant dans l'ordre demandé, ou en sens inverse pour la page précédente
+        forward = (order == 'desc') == (token['direction'] == 'prev')
+        if forward:
+            condition = or_(sort_column > value, and_(sort_column == value, id_column > ref_id))
+            query = query.order_by(asc(sort_column), asc(id_column))
+        else:
+            condition = or_(sort_column < value, and_(sort_column == value, id_column < ref_id))
+            query = query.order_by(desc(sort_column), desc(id_column))
+        
+        rows = query.filter(condition).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        page = token['page']
+        
+        if token['direction'] == 'prev':
+            rows.reverse()
+            has_prev, has_next = has_more, True
+        else:
+            has_prev, has_next = True, has_more
+    else:
+        order_func = desc if order == 'desc' else asc
+        query = query.order_by(order_func(sort_column), order_func(id_column))
+        
+        rows = query.offset((page - 1) * per_page).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_prev = page > 1
+    
+    prev_cursor = next_cursor = None
+    if rows:
+        first, last = rows[0], rows[-1]
+        if has_prev:
+            prev_cursor = encode_cursor(sort_key, order, getattr(first, sort_attr),
+                                        first.id, page - 1, 'prev')
+        if has_next:
+            next_cursor = encode_cursor(sort_key, order, getattr(last, sort_attr),
+                                        last.id, page + 1, 'next')
+    
+    return KeysetPage(rows, page, per_page, has_prev, has_next,
+                      prev_cursor=prev_cursor, next_cursor=next_cursor, total=total)
+
+def estimate_query_count(query):
+    """
+    Estime le nombre de lignes d'une requête sans la parcourir.
+    
+    Sous PostgreSQL, l'estimation du planificateur (EXPLAIN) est utilisée.
+    Les autres moteurs (SQLite en développement) exécutent un COUNT(*) exact.
+    
+    Args:
+        query: Requête SQLAlchemy filtrée
+        
+    Returns:
+        int: Nombre de lignes estimé, ou None si l'estimation échoue
+    """
+    from sqlalchemy.exc import SQLAlchemyError
+    from app.utils.sql_query_utils import explain_query
+    
+    query = query.order_by(None)
+    
+    try:
+        plan = explain_query(query)
+    except SQLAlchemyError:
+        return None
+    
+    if plan is None:
+        return query.count()
+    return int(plan['Plan Rows'])
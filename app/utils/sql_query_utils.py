@@ -3,9 +3,112 @@
 Utilitaires pour la construction de requêtes SQL avec SQLAlchemy
 Centralise les opérations courantes sur les requêtes, notamment le tri
 """
-from sqlalchemy import func, desc, asc, case, cast, Integer, or_
-from sqlalchemy.orm import aliased
+import json
+from sqlalchemy import func, desc, asc, case, cast, Integer, and_
+from sqlalchemy.orm import aliased, joinedload, selectinload
 from app.models.tricount import Expense, Category, Flag, DeclarationStatus
+from app.extensions import db
+
+def insert_ignoring_conflicts(table, bind=None):
+    """
+    Retourne un INSERT supportant ON CONFLICT (DO NOTHING / DO UPDATE) pour le dialecte courant.
+    
+    Args:
+        table: Table ou modèle SQLAlchemy cible
+        bind: Moteur ou connexion utilisé (par défaut celui de la session)
+    
+    Returns:
+        Insert: Instruction INSERT spécifique au dialecte (PostgreSQL ou SQLite)
+    """
+    if (bind if bind is not None else db.session.get_bind()).dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(table)
+
+def explain_query(query):
+    """
+    Retourne le plan d'exécution PostgreSQL (EXPLAIN FORMAT JSON) d'une requête.
+    
+    La requête est expliquée dans un point de sauvegarde: un échec n'invalide pas
+    la transaction en cours.
+    
+    Args:
+        query: Requête SQLAlchemy (ORM)
+    
+    Returns:
+        dict: Nœud racine du plan ('Plan'), ou None si le moteur n'est pas PostgreSQL
+    """
+    bind = db.session.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return None
+    
+    compiled = query.statement.compile(dialect=bind.dialect)
+    params = compiled.params
+    if compiled.positiontup is not None:
+        params = tuple(params[name] for name in compiled.positiontup)
+    
+    with db.session.begin_nested():
+        plan = db.session.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", params
+        ).scalar()
+    
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+def plan_index_names(plan):
+    """
+    Liste les index utilisés par un plan d'exécution PostgreSQL.
+    
+    Args:
+        plan (dict): Nœud de plan retourné par explain_query
+    
+    Returns:
+        set: Noms des index parcourus par le plan
+    """
+    names = set()
+    if not plan:
+        return names
+    if 'Index Name' in plan:
+        names.add(plan['Index Name'])
+    for child in plan.get('Plans', []):
+        names |= plan_index_names(child)
+    return names
+
+def expense_list_options():
+    """
+    Options de chargement des relations affichées dans les listes de dépenses.
+    
+    La catégorie et le flag (many-to-one) sont joints à la requête principale:
+    une page de dépenses est chargée en une seule requête, sans requête par ligne.
+    
+    Returns:
+        tuple: Options à passer à query.options(...)
+    """
+    return (joinedload(Expense.category), joinedload(Expense.flag))
+
+def category_list_options():
+    """
+    Options de chargement des catégories avec leurs flags associés (une requête IN).
+    
+    Returns:
+        tuple: Options à passer à query.options(...)
+    """
+    return (selectinload(Category.flags),)
+
+def contains_pattern(value):
+    """
+    Construit un motif ILIKE équivalent à `value in texte` (jokers échappés).
+    
+    Args:
+        value (str): Texte recherché
+    
+    Returns:
+        str: Motif à utiliser avec ilike(..., escape='\\')
+    """
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
 
 def apply_sort_to_query(query, sort_by='date', order='desc'):
     """
@@ -120,34 +223,25 @@ def apply_sort_to_query(query, sort_by='date', order='desc'):
         print(f"Erreur lors du tri: {str(e)}")
         return query.order_by(Expense.date.desc())
 
-def build_reimbursement_query(flag_id=None, status_values=None, start_date=None, end_date=None, search_query="", show_all=False, sort_by='date', order='desc'):
+def apply_reimbursement_filters(query, flag_id=None, status_values=None, start_date=None, end_date=None, search_query="", show_all=False):
     """
-    Construit une requête pour les dépenses en fonction des critères de filtrage.
+    Applique les filtres de la page des remboursements à une requête portant sur Expense.
+    
+    Partagé entre la requête de liste et la requête d'agrégation du résumé,
+    pour garantir que les deux portent exactement sur les mêmes dépenses.
     
     Args:
+        query: Requête SQLAlchemy dont l'entité principale est Expense
         flag_id (int, optional): ID du flag pour filtrer
         status_values (list, optional): Liste des statuts de déclaration
         start_date (str, optional): Date de début au format YYYY-MM-DD
         end_date (str, optional): Date de fin au format YYYY-MM-DD
         search_query (str, optional): Terme de recherche
         show_all (bool, optional): Afficher toutes les dépenses (True) ou uniquement les remboursables (False)
-        sort_by (str, optional): Champ de tri
-        order (str, optional): Direction du tri
     
     Returns:
         query: Requête SQLAlchemy filtrée
     """
-    # Construire la requête de base
-    query = Expense.query
-    
-    # Validation des entrées
-    if order not in ['asc', 'desc']:
-        order = 'desc'
-    
-    if sort_by not in ['date', 'amount', 'merchant', 'description', 'category', 'flag', 'declared', 'reimbursed']:
-        sort_by = 'date'
-    
-    # Appliquer les filtres selon les paramètres
     # Filtre par status multiple
     if status_values:
         query = query.filter(Expense.declaration_status.in_(status_values))
@@ -169,53 +263,107 @@ def build_reimbursement_query(flag_id=None, status_values=None, start_date=None,
         except ValueError:
             pass
     
-    # Filtre par recherche textuelle
+    # Filtre par recherche textuelle (plein texte sous PostgreSQL)
     if search_query:
-        search_term = f"%{search_query}%"
-        query = query.filter(
-            or_(
-                Expense.merchant.ilike(search_term),
-                Expense.renamed_merchant.ilike(search_term),
-                Expense.description.ilike(search_term),
-                Expense.notes.ilike(search_term),
-                Expense.declaration_reference.ilike(search_term)
-            )
-        )
+        # Import local pour éviter les cycles d'import
+        from app.services.tricount.expense_search import ExpenseSearchService
+        query = ExpenseSearchService.apply_search(query, search_query)
     
-    # JOINTURES: les faire avant le filtrage pour éviter les problèmes de référence
-    if sort_by == 'category':
-        Category_alias = aliased(Category)
-        query = query.outerjoin(Category_alias, Expense.category_id == Category_alias.id)
+    # Filtre par flag spécifique
+    if flag_id is not None and flag_id > 0:
+        query = query.filter(Expense.flag_id == flag_id)
     
-    if sort_by == 'flag' or flag_id is not None or not show_all:
-        # S'il y a tri par flag, ou un filtrage par flag, ou qu'on montre uniquement les remboursables
+    # Filtre pour n'afficher que les dépenses remboursables (jointure sur le flag de la dépense)
+    if not show_all:
         Flag_alias = aliased(Flag)
         query = query.outerjoin(Flag_alias, Expense.flag_id == Flag_alias.id)
-        
-        # Filtre par flag spécifique
-        if flag_id is not None and flag_id > 0:
-            query = query.filter(Expense.flag_id == flag_id)
-        
-        # Filtre pour n'afficher que les dépenses remboursables
-        if not show_all:
-            # Utiliser Flag_alias si on a fait une jointure avec
-            if sort_by == 'flag':
-                query = query.filter(
-                    Flag_alias.reimbursement_type.in_([
-                        'partially_reimbursable',
-                        'fully_reimbursable'
-                    ])
-                )
-            else:
-                # Sinon utiliser le flag normal
-                query = query.filter(
-                    Flag.reimbursement_type.in_([
-                        'partially_reimbursable',
-                        'fully_reimbursable'
-                    ])
-                )
+        query = query.filter(
+            Flag_alias.reimbursement_type.in_([
+                'partially_reimbursable',
+                'fully_reimbursable'
+            ])
+        )
+    
+    return query
+
+def build_reimbursement_query(flag_id=None, status_values=None, start_date=None, end_date=None, search_query="", show_all=False, sort_by='date', order='desc'):
+    """
+    Construit une requête pour les dépenses en fonction des critères de filtrage.
+    
+    Args:
+        flag_id (int, optional): ID du flag pour filtrer
+        status_values (list, optional): Liste des statuts de déclaration
+        start_date (str, optional): Date de début au format YYYY-MM-DD
+        end_date (str, optional): Date de fin au format YYYY-MM-DD
+        search_query (str, optional): Terme de recherche
+        show_all (bool, optional): Afficher toutes les dépenses (True) ou uniquement les remboursables (False)
+        sort_by (str, optional): Champ de tri
+        order (str, optional): Direction du tri
     
-    # Appliquer le tri
+    Returns:
+        query: Requête SQLAlchemy filtrée
+    """
+    # Validation des entrées
+    if order not in ['asc', 'desc']:
+        order = 'desc'
+    
+    if sort_by not in ['date', 'amount', 'merchant', 'description', 'category', 'flag', 'declared', 'reimbursed']:
+        sort_by = 'date'
+    
+    # Appliquer les filtres selon les paramètres
+    query = apply_reimbursement_filters(
+        Expense.query.options(*expense_list_options()),
+        flag_id=flag_id,
+        status_values=status_values,
+        start_date=start_date,
+        end_date=end_date,
+        search_query=search_query,
+        show_all=show_all
+    )
+    
+    # Appliquer le tri (les jointures de tri sont ajoutées par apply_sort_to_query)
     query = apply_sort_to_query(query, sort_by, order)
     
-    return query
\ No newline at end of file
+    return query
+
+def build_reimbursement_summary_query(flag_id=None, status_values=None, start_date=None, end_date=None, search_query="", show_all=False):
+    """
+    Construit une requête d'agrégation pour le résumé des remboursements.
+    
+    Les totaux sont calculés en SQL (SUM(CASE ...)) sur exactement les mêmes filtres
+    que build_reimbursement_query, sans charger les dépenses. Les montants restent
+    en NUMERIC côté base et sont retournés en Decimal.
+    
+    Args:
+        flag_id (int, optional): ID du flag pour filtrer
+        status_values (list, optional): Liste des statuts de déclaration
+        start_date (str, optional): Date de début au format YYYY-MM-DD
+        end_date (str, optional): Date de fin au format YYYY-MM-DD
+        search_query (str, optional): Terme de recherche
+        show_all (bool, optional): Afficher toutes les dépenses (True) ou uniquement les remboursables (False)
+    
+    Returns:
+        query: Requête retournant une ligne (count, total_amount, total_declared, total_reimbursed)
+    """
+    def debit_sum(*conditions):
+        return func.coalesce(func.sum(case(
+            (and_(Expense.is_debit == True, *conditions), Expense.amount),
+            else_=0
+        )), 0)
+    
+    query = db.session.query(
+        func.count(Expense.id).label('count'),
+        debit_sum().label('total_amount'),
+        debit_sum(Expense.declaration_status == DeclarationStatus.DECLARED.value).label('total_declared'),
+        debit_sum(Expense.declaration_status == DeclarationStatus.REIMBURSED.value).label('total_reimbursed')
+    ).select_from(Expense)
+    
+    return apply_reimbursement_filters(
+        query,
+        flag_id=flag_id,
+        status_values=status_values,
+        start_date=start_date,
+        end_date=end_date,
+        search_query=search_query,
+        show_all=show_all
+    )
@@ -0,0 +1,150 @@
+# scripts/benchmarks/error_stats.py
+"""
+Benchmark des requêtes de la page de statistiques des erreurs.
+
+Compare les agrégats de référence (COUNT, GROUP BY type, GROUP BY date et
+GROUP BY source sur une ligne par occurrence) aux requêtes sur la table de
+compteurs journaliers `error_stats_daily`, pour un historique synthétique (par
+défaut 200 000 occurrences sur 365 jours), et vérifie que les totaux par type
+sont identiques.
+
+La base utilisée est DATABASE_URL si elle est définie, sinon SQLite en mémoire.
+Les tables du benchmark sont temporaires et supprimées à la fin.
+
+Usage:
+    python scripts/benchmarks/error_stats.py [--occurrences 200000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.config import config
+
+ERROR_TYPES = ['404', '403', '500', 'exception', 'redirection']
+SOURCES = [f"/tricount/route_{index}" for index in range(15)] + [f"/teamplanning/route_{index}" for index in range(5)]
+
+
+def build_occurrences(count, days=365, seed=42):
+    """
+    Construit un historique synthétique d'occurrences
+
+    Args:
+        count (int): Nombre d'occurrences
+        days (int): Nombre de jours couverts
+        seed (int): Graine du générateur aléatoire
+
+    Returns:
+        list: Lignes {'error_type', 'source', 'message', 'created_at'}
+    """
+    rnd = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    return [
+        {
+            'error_type': rnd.choice(ERROR_TYPES),
+            'source': rnd.choice(SOURCES),
+            'message': 'x' * rnd.randint(50, 400),
+            'created_at': start + timedelta(seconds=rnd.randint(0, days * 86400 - 1))
+        }
+        for _ in range(count)
+    ]
+
+
+def best_of(repeat, func):
+    """Meilleur temps d'exécution de func sur repeat essais (secondes) et son dernier résultat"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--occurrences', type=int, default=200000, help="Nombre d'occurrences de l'historique")
+    parser.add_argument('--repeat', type=int, default=3, help='Nombre de répétitions par mesure')
+    args = parser.parse_args()
+
+    settings = config['default']
+    if not os.getenv('DATABASE_URL'):
+        settings.SQLALCHEMY_DATABASE_URI = 'sqlite://'
+        settings.SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    from app import create_app
+    from app.extensions import db
+    from app.models.error_following import ErrorStatsDaily
+
+    app = create_app()
+    with app.app_context():
+        metadata = db.MetaData()
+        flat = db.Table(
+            'benchmark_error_history', metadata,
+            db.Column('id', db.Integer, primary_key=True),
+            db.Column('error_type', db.String(50), nullable=False),
+            db.Column('source', db.String(255), nullable=False),
+            db.Column('message', db.Text, nullable=False),
+            db.Column('created_at', db.DateTime),
+        )
+        rollup = ErrorStatsDaily.__table__.to_metadata(metadata, name='benchmark_error_stats_daily')
+        metadata.create_all(db.engine)
+
+        try:
+            occurrences = build_occurrences(args.occurrences)
+            counts = ErrorStatsDaily.count_rows(occurrences)
+            with db.engine.begin() as connection:
+                connection.execute(flat.insert(), occurrences)
+                connection.execute(rollup.insert(), [
+                    {'day': day, 'error_type': error_type, 'source': source, 'occurrence_count': count}
+                    for (day, error_type, source), count in counts.items()
+                ])
+
+            def legacy_queries():
+                with db.engine.connect() as connection:
+                    day = db.func.date(flat.c.created_at)
+                    count = db.func.count(flat.c.id)
+                    connection.execute(db.select(count)).scalar()
+                    by_type = connection.execute(db.select(flat.c.error_type, count).group_by(flat.c.error_type)).all()
+                    connection.execute(db.select(day, count).group_by(day).order_by(day.desc()).limit(30)).all()
+                    connection.execute(db.select(flat.c.source, count).group_by(flat.c.source)
+                                       .order_by(count.desc()).limit(10)).all()
+                    return sorted(by_type)
+
+            def rollup_queries():
+                with db.engine.connect() as connection:
+                    total = db.func.sum(rollup.c.occurrence_count)
+                    since = (datetime(2025, 1, 1) + timedelta(days=335)).date()
+                    connection.execute(db.select(total)).scalar()
+                    by_type = connection.execute(db.select(rollup.c.error_type, total).group_by(rollup.c.error_type)).all()
+                    connection.execute(db.select(rollup.c.day, total).where(rollup.c.day >= since)
+                                       .group_by(rollup.c.day).order_by(rollup.c.day)).all()
+                    connection.execute(db.select(rollup.c.source, total).where(rollup.c.day >= since)
+                                       .group_by(rollup.c.source).order_by(total.desc()).limit(10)).all()
+                    return sorted((error_type, int(count)) for error_type, count in by_type)
+
+            legacy_time, legacy_types = best_of(args.repeat, legacy_queries)
+            rollup_time, rollup_types = best_of(args.repeat, rollup_queries)
+        finally:
+            metadata.drop_all(db.engine)
+
+        print(f"Historique synthétique: {args.occurrences} occurrences, {len(counts)} compteurs journaliers "
+              f"(base: {db.engine.dialect.name})")
+        print()
+        print(f"{'agrégats sur les occurrences':<32}{legacy_time * 1000:>10.1f}ms")
+        print(f"{'compteurs journaliers':<32}{rollup_time * 1000:>10.1f}ms")
+        print(f"{'gain':<32}{legacy_time / rollup_time:>11.1f}x")
+
+        if legacy_types != rollup_types:
+            print("ERREUR: les totaux par type diffèrent")
+            sys.exit(1)
+        print()
+        print("Totaux par type identiques pour les deux méthodes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+# scripts/benchmarks/planning_entries_insert.py
+"""
+Benchmark de la création des entrées PlanningEntry d'un planning analysé.
+
+Compare l'implémentation de référence (un objet ORM par personne et par jour,
+ajouté à la session puis validé) à l'insertion en masse de
+`PlanningParser._create_planning_entries` sur un planning synthétique (par
+défaut 100 personnes sur un mois de 31 jours), et vérifie que les deux
+produisent exactement les mêmes lignes.
+
+La base utilisée est DATABASE_URL si elle est définie, sinon SQLite en mémoire.
+
+Usage:
+    python scripts/benchmarks/planning_entries_insert.py [--people 100] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.config import config
+
+SLOT_CODES = [None, None, 'TL', 'P', 'Pf', 'C', 'R', 'CP', 'RTT']
+
+
+def build_planning_data(people=100, days=31, seed=42):
+    """
+    Construit des données de planning au format de PlanningParser._extract_planning_data
+
+    Args:
+        people (int): Nombre de personnes
+        days (int): Nombre de jours du mois
+        seed (int): Graine du générateur aléatoire
+
+    Returns:
+        dict: {'people', 'days', 'entries': {personne: {jour: {morning, day, evening}}}}
+    """
+    rnd = random.Random(seed)
+    planning_data = {"people": [], "days": list(range(1, days + 1)), "entries": {}}
+    for index in range(people):
+        person = f"NOM{index:04d} Prénom{index}"
+        planning_data["people"].append(person)
+        planning_data["entries"][person] = {
+            day: {slot: rnd.choice(SLOT_CODES) for slot in ('morning', 'day', 'evening')}
+            for day in planning_data["days"]
+        }
+    return planning_data
+
+
+def legacy_create_planning_entries(parsed_planning, planning_data):
+    """Implémentation de référence: un objet ORM par entrée, puis validation"""
+    from app.extensions import db
+    from app.models.planning import PlanningEntry
+    from app.services.planning_parser import PlanningParser
+
+    first_day, days_in_month = PlanningParser._planning_first_day(parsed_planning)
+    for person in planning_data["people"]:
+        for day_num in planning_data["days"]:
+            if day_num < 1 or day_num > days_in_month:
+                continue
+            day_data = planning_data["entries"].get(person, {}).get(day_num, {})
+            db.session.add(PlanningEntry(
+                parsed_planning_id=parsed_planning.id,
+                person_name=person,
+                date=first_day + timedelta(days=day_num - 1),
+                morning=day_data.get("morning"),
+                day=day_data.get("day"),
+                evening=day_data.get("evening")
+            ))
+    db.session.commit()
+
+
+def bulk_create_planning_entries(parsed_planning, planning_data):
+    """Implémentation actuelle: insertion en masse, puis validation"""
+    from app.extensions import db
+    from app.services.planning_parser import PlanningParser
+
+    PlanningParser._create_planning_entries(parsed_planning, planning_data)
+    db.session.commit()
+
+
+def entry_rows(parsed_planning):
+    """Lignes insérées pour un planning, sans identifiant ni référence au planning"""
+    return sorted(
+        (entry.person_name, entry.date, entry.morning, entry.day, entry.evening)
+        for entry in parsed_planning.entries
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--people', type=int, default=100, help='Nombre de personnes du planning')
+    parser.add_argument('--repeat', type=int, default=3, help='Nombre de répétitions par mesure')
+    args = parser.parse_args()
+
+    settings = config['default']
+    if not os.getenv('DATABASE_URL'):
+        settings.SQLALCHEMY_DATABASE_URI = 'sqlite://'
+        settings.SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    from app import create_app
+    from app.extensions import db
+    from app.models.planning import RawPlanning, ParsedPlanning, PlanningEntry, PlanningExtractionCache
+
+    app = create_app()
+    with app.app_context():
+        tables = [RawPlanning.__table__, ParsedPlanning.__table__, PlanningEntry.__table__,
+                  PlanningExtractionCache.__table__]
+        db.metadata.create_all(db.engine, tables=tables)
+
+        planning_data = build_planning_data(people=args.people)
+        raw_planning = RawPlanning(content_hash='benchmark-planning-entries', raw_content='', parsed=True)
+        db.session.add(raw_planning)
+        db.session.commit()
+        raw_planning_id = raw_planning.id
+
+        implementations = {
+            'objets ORM (référence)': legacy_create_planning_entries,
+            'insertion en masse': bulk_create_planning_entries,
+        }
+        plannings = {}
+        timings = {}
+        try:
+            for label, create_entries in implementations.items():
+                best = None
+                for _ in range(args.repeat):
+                    parsed_planning = ParsedPlanning(
+                        raw_planning_id=raw_planning_id, month='mars', year=2025, planning_data='{}'
+                    )
+                    db.session.add(parsed_planning)
+                    db.session.flush()
+
+                    start = time.perf_counter()
+                    create_entries(parsed_planning, planning_data)
+                    elapsed = time.perf_counter() - start
+
+                    best = elapsed if best is None else min(best, elapsed)
+                    plannings[label] = parsed_planning.id
+                    # Repartir d'une session vide: l'unité de travail ne doit pas fausser la mesure suivante
+                    db.session.expunge_all()
+                timings[label] = best
+
+            rows = {label: entry_rows(db.session.get(ParsedPlanning, planning_id))
+                    for label, planning_id in plannings.items()}
+        finally:
+            # Nettoyer les lignes du benchmark (utile sur une base persistante)
+            db.session.rollback()
+            planning_ids = db.session.query(ParsedPlanning.id).filter_by(raw_planning_id=raw_planning_id)
+            PlanningEntry.query.filter(PlanningEntry.parsed_planning_id.in_(planning_ids)).delete(
+                synchronize_session=False
+            )
+            ParsedPlanning.query.filter_by(raw_planning_id=raw_planning_id).delete(synchronize_session=False)
+            RawPlanning.query.filter_by(id=raw_planning_id).delete(synchronize_session=False)
+            db.session.commit()
+
+        labels = list(implementations)
+        count = len(rows[labels[0]])
+        print(f"Planning synthétique: {args.people} personnes, 31 jours, {count} entrées "
+              f"(base: {db.engine.dialect.name})")
+        print()
+        for label in labels:
+            print(f"{label:<28}{timings[label] * 1000:>10.0f}ms")
+        print(f"{'gain':<28}{timings[labels[0]] / timings[labels[1]]:>11.1f}x")
+
+        if rows[labels[0]] != rows[labels[1]]:
+            print("ERREUR: les deux implémentations n'insèrent pas les mêmes lignes")
+            sys.exit(1)
+        print()
+        print("Lignes insérées identiques pour les deux implémentations")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+# scripts/benchmarks/societe_generale_parser.py
+"""
+Micro-benchmark du parser Société Générale.
+
+Compare l'implémentation de référence (re.match avec motifs littéraux et
+parcours indexé) au tokenizer à motifs précompilés sur un relevé synthétique,
+et vérifie que les deux produisent exactement la même sortie.
+
+Usage:
+    python scripts/benchmarks/societe_generale_parser.py [--lines 10000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.services.tricount.bank_statement_parser import SocieteGeneraleParser
+from app.utils.money_helpers import clean_amount_string
+
+
+def legacy_parse_statement(text):
+    """
+    Implémentation de référence (avant précompilation des motifs)
+
+    Args:
+        text (str): Texte brut du relevé bancaire
+
+    Returns:
+        list: Liste des transactions extraites sous forme de dictionnaires
+    """
+    transactions = []
+    current_date = None
+
+    # Nettoyer le texte
+    text = text.strip()
+
+    # Diviser en lignes
+    lines = text.split('\n')
+
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+
+        # Rechercher une ligne de date
+        date_match = re.match(r'^(\w+)\s+(\d+)\s+(\w+)\s+(\d{4})$', line)
+        if date_match:
+            # Extraire et formater la date
+            day_name, day, month, year = date_match.groups()
+            month_num = SocieteGeneraleParser._convert_month_to_num(month)
+            current_date = datetime(int(year), month_num, int(day))
+            i += 1
+            continue
+
+        # Rechercher une ligne de transaction carte
+        card_transaction_match = re.match(r'^CARTE\s+([^\s]+)\s+(\d{2}/\d{2})\s+(.+)$', line)
+        if card_transaction_match and current_date and i + 1 < len(lines):
+            card_num, transaction_date, description = card_transaction_match.groups()
+
+            # Ligne suivante contient le montant
+            amount_line = lines[i + 1].strip()
+            amount_match = re.match(r'^moins-\s*([\d\s,]+)\s*€$', amount_line)
+
+            if amount_match:
+                amount_str = amount_match.group(1)
+                amount = clean_amount_string(amount_str)
+
+                # Créer la transaction
+                transaction = {
+                    'date': current_date,
+                    'description': description,
+                    'amount': amount,
+                    'is_debit': True,  # C'est une dépense (moins-)
+                    'payment_method': f'CARTE {card_num}',
+                    'transaction_date': SocieteGeneraleParser._parse_transaction_date(transaction_date, current_date),
+                    'merchant': SocieteGeneraleParser._extract_merchant(description),
+                    'original_text': line + '\n' + amount_line
+                }
+
+                transactions.append(transaction)
+                i += 2  # Avancer de 2 lignes (ligne de transaction + ligne de montant)
+                continue
+
+        # Rechercher un virement reçu
+        vir_recu_match = re.match(r'^VIR\s+RECU\s+DE:\s+(.+)$', line)
+        if vir_recu_match and current_date and i + 1 < len(lines):
+            sender = vir_recu_match.group(1)
+
+            # Ligne suivante peut contenir un motif ou un montant
+            next_line = lines[i + 1].strip()
+            motif_match = re.match(r'^Motif\s*:\s*(.+)$', next_line)
+
+            if motif_match:
+                motif = motif_match.group(1)
+
+                # La ligne suivante devrait contenir le montant
+                if i + 2 < len(lines):
+                    amount_line = lines[i + 2].strip()
+                    amount_match = re.match(r'^([\d\s,]+)\s*€$', amount_line)
+
+                    if amount_match:
+                        amount_str = amount_match.group(1)
+                        amount = clean_amount_string(amount_str)
+
+                        transaction = {
+                            'date': current_date,
+                            'description': f"Virement reçu de {sender} - {motif}",
+                            'amount': amount,
+                            'is_debit': False,  # C'est un crédit
+                            'payment_method': 'VIREMENT',
+                            'merchant': sender,
+                            'reference': motif,
+                            'original_text': '\n'.join([line, next_line, amount_line])
+                        }
+
+                        transactions.append(transaction)
+                        i += 3  # Avancer de 3 lignes
+                        continue
+            else:
+                # Vérifier si c'est directement un montant
+                amount_match = re.match(r'^([\d\s,]+)\s*€$', next_line)
+                if amount_match:
+                    amount_str = amount_match.group(1)
+                    amount = clean_amount_string(amount_str)
+
+                    transaction = {
+                        'date': current_date,
+                        'description': f"Virement reçu de {sender}",
+                        'amount': amount,
+                        'is_debit': False,  # C'est un crédit
+                        'payment_method': 'VIREMENT',
+                        'merchant': sender,
+                        'original_text': '\n'.join([line, next_line])
+                    }
+
+                    transactions.append(transaction)
+                    i += 2  # Avancer de 2 lignes
+                    continue
+
+        # Rechercher un virement émis
+        vir_emis_match = re.match(r'^(VIR\s+PERM|VIR\s+INSTANTANE\s+EMIS)\s+POUR:\s+(.+)$', line)
+        if vir_emis_match and current_date and i + 1 < len(lines):
+            vir_type, recipient = vir_emis_match.groups()
+
+            # Ligne suivante peut contenir un motif ou un montant
+            next_line = lines[i + 1].strip()
+            motif_match = re.match(r'^Motif\s*:\s*(.+)$', next_line)
+
+            if motif_match:
+                motif = motif_match.group(1)
+
+                # La ligne suivante devrait contenir le montant
+                if i + 2 < len(lines):
+                    amount_line = lines[i + 2].strip()
+                    amount_match = re.match(r'^moins-\s*([\d\s,]+)\s*€$', amount_line)
+
+                    if amount_match:
+                        amount_str = amount_match.group(1)
+                        amount = clean_amount_string(amount_str)
+
+                        transaction = {
+                            'date': current_date,
+                            'description': f"{vir_type} à {recipient} - {motif}",
+                            'amount': amount,
+                            'is_debit': True,  # C'est un débit
+                            'payment_method': vir_type,
+                            'merchant': recipient,
+                            'reference': motif,
+                            'original_text': '\n'.join([line, next_line, amount_line])
+                        }
+
+                        transactions.append(transaction)
+                        i += 3  # Avancer de 3 lignes
+                        continue
+            else:
+                # Vérifier si c'est directement un montant
+                amount_match = re.match(r'^moins-\s*([\d\s,]+)\s*€$', next_line)
+                if amount_match:
+                    amount_str = amount_match.group(1)
+                    amount = clean_amount_string(amount_str)
+
+                    transaction = {
+                        'date': current_date,
+                        'description': f"{vir_type} à {recipient}",
+                        'amount': amount,
+                        'is_debit': True,  # C'est un débit
+                        'payment_method': vir_type,
+                        'merchant': recipient,
+                        'original_text': '\n'.join([line, next_line])
+                    }
+
+                    transactions.append(transaction)
+                    i += 2  # Avancer de 2 lignes
+                    continue
+
+        # Rechercher un prélèvement
+        prelevement_match = re.match(r'^PRELEVEMENT\s+EUROPEEN\s+(DE|POUR\s+CPTE\s+DE):\s*(.+)$', line)
+        if prelevement_match and current_date and i + 1 < len(lines):
+            _, creditor = prelevement_match.groups()
+
+            # Ligne suivante peut contenir un motif ou un montant
+            next_line = lines[i + 1].strip()
+            motif_match = re.match(r'^Motif\s*:\s*(.+)$', next_line)
+
+            if motif_match:
+                motif = motif_match.group(1)
+
+                # La ligne suivante devrait contenir le montant
+                if i + 2 < len(lines):
+                    amount_line = lines[i + 2].strip()
+                    amount_match = re.match(r'^moins-\s*([\d\s,]+)\s*€$', amount_line)
+
+                    if amount_match:
+                        amount_str = amount_match.group(1)
+                        amount = clean_amount_string(amount_str)
+
+                        # Extraire une référence ou un mandat s'il existe
+                        ref_match = re.search(r'REF:\s+([^\s]+)', motif)
+                        mandat_match = re.search(r'MANDAT\s+([^\s]+)', motif)
+
+                        reference = None
+                        if ref_match:
+                            reference = ref_match.group(1)
+                        elif mandat_match:
+                            reference = f"MANDAT {mandat_match.group(1)}"
+
+                        transaction = {
+                            'date': current_date,
+                            'description': f"Prélèvement {creditor} - {motif}",
+                            'amount': amount,
+                            'is_debit': True,  # C'est un débit
+                            'payment_method': 'PRELEVEMENT',
+                            'merchant': creditor,
+                            'reference': reference or motif,
+                            'original_text': '\n'.join([line, next_line, amount_line])
+                        }
+
+                        transactions.append(transaction)
+                        i += 3  # Avancer de 3 lignes
+                        continue
+
+        # Si aucun des motifs n'a été trouvé, passer à la ligne suivante
+        i += 1
+
+    return transactions
+
+
+def build_statement(line_count, seed=42):
+    """
+    Génère un relevé synthétique d'environ `line_count` lignes
+
+    Args:
+        line_count (int): Nombre de lignes visé
+        seed (int): Graine du générateur aléatoire
+
+    Returns:
+        str: Texte du relevé
+    """
+    rng = random.Random(seed)
+    months = ['janvier', 'février', 'mars', 'avril', 'mai', 'juin',
+              'juillet', 'août', 'septembre', 'octobre', 'novembre', 'décembre']
+    merchants = ['CARREFOUR CITY', 'SNCF INTERNET', 'AMAZON EU SARL', 'UBER BV', 'FNAC DARTY']
+    lines = []
+
+    while len(lines) < line_count:
+        month_index = rng.randrange(12)
+        lines.append(f"lundi {rng.randint(1, 28)} {months[month_index]} 2024")
+
+        for _ in range(rng.randint(1, 6)):
+            amount = f"{rng.randint(1, 1999)},{rng.randint(0, 99):02d}"
+            kind = rng.randrange(6)
+            if kind < 3:
+                suffix = rng.choice(['', ' COMMERCE ELECTRONIQUE', ' EUR IRLANDE'])
+                lines.append(f"CARTE X{rng.randint(1000, 9999)} {rng.randint(1, 28):02d}/{month_index + 1:02d} {rng.choice(merchants)}{suffix}")
+                lines.append(f"moins- {amount} €")
+            elif kind == 3:
+                lines.append(f"VIR RECU DE: {rng.choice(['JEAN DUPONT', 'EMPLOYEUR SA'])}")
+                if rng.random() < 0.5:
+                    lines.append(f"Motif : REMBOURSEMENT {rng.randint(1, 99)}")
+                lines.append(f"{amount} €")
+            elif kind == 4:
+                lines.append(f"{rng.choice(['VIR PERM', 'VIR INSTANTANE EMIS'])} POUR: {rng.choice(['LOYER SCI', 'EPARGNE'])}")
+                if rng.random() < 0.5:
+                    lines.append("Motif : VIREMENT MENSUEL")
+                lines.append(f"moins- {amount} €")
+            else:
+                lines.append(f"PRELEVEMENT EUROPEEN DE: {rng.choice(['EDF', 'FREE MOBILE', 'MUTUELLE'])}")
+                lines.append(f"Motif : ECHEANCE REF: {rng.randint(100000, 999999)} MANDAT M{rng.randint(1, 999)}")
+                lines.append(f"moins- {amount} €")
+
+        # Lignes parasites présentes dans les copier-coller réels
+        lines.append("Solde au jour")
+
+    return '\n'.join(lines[:line_count])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--lines', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    statement = build_statement(args.lines)
+
+    expected = legacy_parse_statement(statement)
+    actual = SocieteGeneraleParser.parse_statement(statement)
+    if repr(expected) != repr(actual):
+        print("ERREUR: les sorties diffèrent")
+        sys.exit(1)
+
+    legacy_time = min(timeit.repeat(lambda: legacy_parse_statement(statement), number=1, repeat=args.repeat))
+    compiled_time = min(timeit.repeat(lambda: SocieteGeneraleParser.parse_statement(statement), number=1, repeat=args.repeat))
+
+    print(f"{args.lines} lignes, {len(actual)} transactions (sorties identiques)")
+    print(f"référence : {legacy_time * 1000:8.2f} ms")
+    print(f"compilé   : {compiled_time * 1000:8.2f} ms")
+    print(f"accélération: x{legacy_time / compiled_time:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+# scripts/benchmarks/teamplanning_extraction.py
+"""
+Benchmark des backends de parsing Teamplanning.
+
+Génère un planning Netplanning synthétique (par défaut 200 utilisateurs sur un
+mois de 31 jours, trois créneaux par jour), puis mesure pour chaque backend
+disponible le temps de parsing seul et le temps complet (parsing + extraction)
+de `extract_users`, `extract_planning_dates`, `extract_specific_days` et de
+l'extraction de toute l'équipe (`extract_planning_events`).
+Vérifie aussi que tous les backends produisent exactement la même sortie.
+
+Usage:
+    python scripts/benchmarks/teamplanning_extraction.py [--users 200] [--repeat 3]
+"""
+import argparse
+import calendar
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.services.teamplanning import UserExtractor, DateExtractor, EventExtractor, PlanningDocument
+from app.services.teamplanning.extractor_base import ExtractorBase, PARSER_BACKENDS, is_parser_available
+
+WEEKDAYS = ['Lun', 'Mar', 'Mer', 'Jeu', 'Ven', 'Sam', 'Dim']
+MONTHS = ['Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin', 'Juillet',
+          'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre']
+SLOT_IDS = ['512719', '512720', '512721']
+
+# Codes d'événements tirés au hasard (la chaîne vide donne une cellule vide)
+EVENT_CODES = ['', '', '', 'TL', 'P', 'Pf', 'C', 'R', 'CP', 'RTT', 'FOR']
+COLOR_CLASSES = {'CP': 'tomato', 'RTT': 'blackwhite', 'R': 'maroon'}
+
+
+def build_planning_html(users=200, year=2025, month=1, seed=42):
+    """
+    Construit un planning Netplanning synthétique
+
+    Reprend la structure attendue par les extracteurs: tableau `#tableau`, en-tête
+    avec mois/année et cellules `tjN`, un tbody par utilisateur contenant trois
+    lignes (matin, journée, soir) de cellules `<user_id> <slot_id> <jour>`.
+
+    Args:
+        users (int): Nombre d'utilisateurs
+        year (int): Année du planning
+        month (int): Mois du planning (janvier: 31 jours)
+        seed (int): Graine du générateur aléatoire
+
+    Returns:
+        str: HTML du planning
+    """
+    rnd = random.Random(seed)
+    days_in_month = calendar.monthrange(year, month)[1]
+
+    parts = [
+        '<html><head><title>Netplanning</title></head><body>',
+        '<table id="tableau"><thead>',
+        '<tr><td><div class="bigtext titre">', MONTHS[month - 1], '</div>',
+        '<div class="noir">', str(year), '</div></td></tr>',
+        '<tr><td>&nbsp;</td></tr><tr><td></td><td></td>',
+    ]
+    for day in range(1, days_in_month + 1):
+        weekday = WEEKDAYS[calendar.weekday(year, month, day)]
+        parts.append(f'<td id="tj{day}"><div class="jhref"><div>{weekday}</div>\n{day}</div></td>')
+    parts.append('</tr></thead><tbody><tr><td colspan="2">Ressources</td></tr></tbody>')
+
+    for index in range(users):
+        user_id = str(40000 + index * 7)
+        parts.append('<tbody>')
+        for slot_index, slot_id in enumerate(SLOT_IDS):
+            parts.append('<tr>')
+            if slot_index == 0:
+                parts.append(
+                    f'<td></td><td class="nom_ress {user_id}" rowspan="3">'
+                    f'<ress class="ressource">NOM{index:04d}<p class="pn">Prénom{index}</p></ress></td>'
+                )
+            for day in range(1, days_in_month + 1):
+                classes = [user_id, slot_id, str(day)]
+                content = ''
+                if calendar.weekday(year, month, day) >= 5:
+                    classes.append('WE')
+                else:
+                    code = rnd.choice(EVENT_CODES)
+                    if code:
+                        if code in COLOR_CLASSES:
+                            classes.append(COLOR_CLASSES[code])
+                        content = f'<a id="{day}" href="#"><div class="href">{code}</div></a>'
+                        if rnd.random() < 0.1:
+                            content += ('<p style="background: blue">03/01/2025 - 09:15 (admin)</p>'
+                                        '<noclick><span class="arrondi">Commentaire</span></noclick>')
+                parts.append(f'<td class="{" ".join(classes)}">{content}</td>')
+            parts.append('</tr>')
+        parts.append('</tbody>')
+
+    parts.append('</table></body></html>')
+    return ''.join(parts)
+
+
+def run_extractions(html, parser, user_indexes):
+    """Exécute les trois extractions, chacune sur un document neuf (parsing inclus)"""
+    users = UserExtractor.extract_users(PlanningDocument(html, parser))
+    dates = DateExtractor.extract_planning_dates(PlanningDocument(html, parser))
+    events = [
+        EventExtractor.extract_specific_days(PlanningDocument(html, parser), None, user_index)
+        for user_index in user_indexes
+    ]
+    return users, dates, events
+
+
+def best_time(function, repeat):
+    """Meilleur temps (en secondes) sur `repeat` exécutions"""
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200, help="Nombre d'utilisateurs du planning")
+    parser.add_argument('--repeat', type=int, default=3, help='Nombre de répétitions par mesure')
+    args = parser.parse_args()
+
+    html = build_planning_html(users=args.users)
+    user_indexes = sorted({0, args.users // 2, args.users - 1})
+    backends = [name for name in PARSER_BACKENDS if is_parser_available(name)]
+    missing = [name for name in PARSER_BACKENDS if name not in backends]
+
+    print(f"Planning synthétique: {args.users} utilisateurs, 31 jours, {len(html) / 1e6:.1f} Mo")
+    if missing:
+        print(f"Backends non installés (ignorés): {', '.join(missing)}")
+
+    reference = None
+    for backend in backends:
+        result = run_extractions(html, backend, user_indexes)
+        if reference is None:
+            reference = result
+        elif result != reference:
+            print(f"ERREUR: la sortie du backend {backend} diffère de celle de {backends[0]}")
+            sys.exit(1)
+
+    measures = {
+        'parsing seul': lambda backend: ExtractorBase.create_soup(html, backend),
+        'extract_users': lambda backend: UserExtractor.extract_users(PlanningDocument(html, backend)),
+        'extract_planning_dates': lambda backend: DateExtractor.extract_planning_dates(PlanningDocument(html, backend)),
+        f'extract_specific_days x{len(user_indexes)}': lambda backend: [
+            EventExtractor.extract_specific_days(PlanningDocument(html, backend), None, user_index)
+            for user_index in user_indexes
+        ],
+        'extract_planning_events': lambda backend: EventExtractor.extract_planning_events(
+            PlanningDocument(html, backend), limit_to_first_user=False, extract_first_line_only=False
+        ),
+    }
+
+    print()
+    print(f"{'Mesure':<30}" + ''.join(f"{backend:>14}" for backend in backends))
+    for label, function in measures.items():
+        timings = [best_time(lambda: function(backend), args.repeat) for backend in backends]
+        print(f"{label:<30}" + ''.join(f"{timing * 1000:>12.0f}ms" for timing in timings))
+
+    print()
+    print(f"Sorties identiques pour: {', '.join(backends)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# tests/conftest.py
+"""
+Fixtures communes: application de test (TestConfig, SQLite en mémoire par
+défaut), client HTTP et utilisateur connecté avec des permissions choisies.
+"""
+import pytest
+from app import create_app
+from app.extensions import db
+from app.services.teamplanning import ExtractionCache
+from app.services.tricount.rule_engine import RuleEngine
+from app.utils.identity_cache import IdentityCache
+from app.utils.permission_cache import PermissionCache
+
+
+@pytest.fixture
+def app():
+    flask_app = create_app('testing')
+    with flask_app.app_context():
+        import app.models  # noqa: F401 - enregistre tous les modèles avant create_all
+        db.create_all()
+        # Caches de processus: les identifiants repartent de 1 à chaque base
+        PermissionCache.invalidate()
+        IdentityCache.invalidate()
+        RuleEngine.invalidate()
+        ExtractionCache.clear_memory()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login(app, client):
+    """
+    Connecte un utilisateur non administrateur ayant les permissions tricount données
+
+    Usage: user = login('view', 'edit')
+    """
+    from app.models.user import Group, Permission, User
+
+    def _login(*permission_names, tool='tricount'):
+        group = Group(name=f"{tool}-{'-'.join(permission_names) or 'none'}")
+        group.permissions = [Permission(tool=tool, name=name) for name in permission_names]
+        user = User(username='alice', email='alice@example.com', groups=[group])
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.commit()
+
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+            session['_fresh'] = True
+        return user
+
+    return _login
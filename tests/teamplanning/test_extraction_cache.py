@@ -0,0 +1,69 @@
+# tests/teamplanning/test_extraction_cache.py
+"""
+Tests du cache d'extraction Netplanning (niveaux mémoire et table planning_extraction_cache)
+"""
+from app.extensions import db
+from app.models.planning import PlanningExtractionCache
+from app.models.tricount import Category
+from app.services.teamplanning import ExtractionCache, extraction_cache
+from app.services.teamplanning.extraction_cache import make_params_key
+
+CONTENT_HASH = 'a' * 64
+
+
+def _count_calls(result):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return result
+    return compute, calls
+
+
+def test_result_is_computed_once_then_read_from_the_table(app):
+    compute, calls = _count_calls({'users': ['Alice']})
+
+    assert ExtractionCache.get_or_compute(CONTENT_HASH, 'users', {}, compute) == {'users': ['Alice']}
+    ExtractionCache.clear_memory()
+    assert ExtractionCache.get_or_compute(CONTENT_HASH, 'users', {}, compute) == {'users': ['Alice']}
+
+    assert len(calls) == 1
+    assert PlanningExtractionCache.query.count() == 1
+
+
+def test_params_key_depends_on_parser_backend(app):
+    assert make_params_key({'day': 3}, parser='lxml') != make_params_key({'day': 3}, parser='html.parser')
+
+
+def test_parser_switch_does_not_reuse_stored_results(app):
+    compute, calls = _count_calls({'users': ['Alice']})
+
+    app.config['TEAMPLANNING_HTML_PARSER'] = 'lxml'
+    ExtractionCache.get_or_compute(CONTENT_HASH, 'users', {}, compute)
+    ExtractionCache.clear_memory()
+    app.config['TEAMPLANNING_HTML_PARSER'] = 'html.parser'
+    ExtractionCache.get_or_compute(CONTENT_HASH, 'users', {}, compute)
+
+    assert len(calls) == 2
+
+
+def test_extraction_version_bump_does_not_reuse_stored_results(app, monkeypatch):
+    compute, calls = _count_calls({'users': ['Alice']})
+
+    ExtractionCache.get_or_compute(CONTENT_HASH, 'users', {}, compute)
+    ExtractionCache.clear_memory()
+    monkeypatch.setattr(extraction_cache, 'EXTRACTION_VERSION', extraction_cache.EXTRACTION_VERSION + 1)
+    ExtractionCache.get_or_compute(CONTENT_HASH, 'users', {}, compute)
+
+    assert len(calls) == 2
+
+
+def test_cache_does_not_commit_the_request_session(app):
+    compute, _ = _count_calls({'users': ['Alice']})
+    db.session.add(Category(name='En attente'))
+
+    ExtractionCache.get_or_compute(CONTENT_HASH, 'users', {}, compute)
+    db.session.rollback()
+
+    assert Category.query.filter_by(name='En attente').count() == 0
+    assert PlanningExtractionCache.query.count() == 1
@@ -0,0 +1,203 @@
+# tests/teamplanning/test_netplanning_client.py
+"""
+Tests du client Netplanning contre un serveur HTTP local (http.server)
+
+Le serveur sert une page de planning enregistrée (fixtures/netplanning_planning.html)
+et rejoue une suite de réponses scriptée par test; chaque requête reçue est
+conservée pour vérifier les en-têtes envoyés par le client.
+"""
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import pytest
+from app.services.teamplanning import netplanning_client
+from app.services.teamplanning.netplanning_client import NetplanningClient
+
+FIXTURE = Path(__file__).parent / 'fixtures' / 'netplanning_planning.html'
+ETAG = '"planning-v1"'
+LAST_MODIFIED = 'Sat, 01 Mar 2025 08:00:00 GMT'
+
+
+class _PlanningHandler(BaseHTTPRequestHandler):
+    """Rejoue les réponses scriptées du serveur (status, en-têtes, corps)"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.received.append(dict(self.headers.items()))
+        status, headers, body = server.responses.pop(0) if server.responses else server.default
+
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PlanningServer:
+    """Serveur Netplanning local: file de réponses et requêtes reçues"""
+
+    def __init__(self):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), _PlanningHandler)
+        self.httpd.responses = []
+        self.httpd.received = []
+        self.httpd.default = (404, [], b'')
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}/'
+        self.thread = threading.Thread(target=self.httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+
+    @property
+    def received(self):
+        return self.httpd.received
+
+    def respond(self, status, headers=(), body=b''):
+        """Ajoute une réponse à la file"""
+        self.httpd.responses.append((status, list(headers), body))
+
+
+@pytest.fixture(scope='module')
+def planning_html():
+    return FIXTURE.read_bytes()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    planning_server = PlanningServer()
+    planning_server.thread.start()
+    monkeypatch.setitem(netplanning_client.DEFAULTS, 'NETPLANNING_URL', planning_server.url)
+    monkeypatch.setitem(netplanning_client.DEFAULTS, 'NETPLANNING_TIMEOUT', 5)
+    NetplanningClient.reset()
+    yield planning_server
+    NetplanningClient.reset()
+    planning_server.httpd.shutdown()
+    planning_server.httpd.server_close()
+
+
+def _planning(body, etag=ETAG, last_modified=LAST_MODIFIED, extra=()):
+    headers = [('Content-Type', 'text/html; charset=utf-8')]
+    if etag:
+        headers.append(('ETag', etag))
+    if last_modified:
+        headers.append(('Last-Modified', last_modified))
+    return 200, headers + list(extra), body
+
+
+def test_fetch_returns_content_and_hash(server, planning_html):
+    server.respond(*_planning(planning_html))
+
+    result = NetplanningClient.fetch('cookie-a')
+
+    assert result['status_code'] == 200
+    assert result['not_modified'] is False
+    assert result['content'] == planning_html.decode('utf-8')
+    # Même hash que PlanningParser.compute_content_hash (SHA-256 du texte en UTF-8)
+    assert result['content_hash'] == hashlib.sha256(result['content'].encode('utf-8')).hexdigest()
+    assert server.received[0]['Cookie'] == 'PHPSESSID=cookie-a'
+    assert 'If-None-Match' not in server.received[0]
+
+
+def test_second_fetch_is_conditional_and_reuses_hash_on_304(server, planning_html):
+    server.respond(*_planning(planning_html))
+    server.respond(304, [('ETag', ETAG)])
+
+    first = NetplanningClient.fetch('cookie-a')
+    second = NetplanningClient.fetch('cookie-a')
+
+    assert server.received[1]['If-None-Match'] == ETAG
+    assert server.received[1]['If-Modified-Since'] == LAST_MODIFIED
+    assert second['status_code'] == 304
+    assert second['not_modified'] is True
+    assert second['content'] is None
+    assert second['content_hash'] == first['content_hash']
+
+
+def test_validators_are_stored_per_cookie_fingerprint(server, planning_html):
+    server.respond(*_planning(planning_html))
+    server.respond(*_planning(planning_html))
+
+    NetplanningClient.fetch('cookie-a')
+    NetplanningClient.fetch('cookie-b')
+
+    # Un autre cookie (autre utilisateur) n'hérite pas des validateurs
+    assert 'If-None-Match' not in server.received[1]
+    # Seule l'empreinte du cookie est conservée, jamais sa valeur
+    assert set(NetplanningClient._validators) == {
+        hashlib.sha256(b'cookie-a').hexdigest(), hashlib.sha256(b'cookie-b').hexdigest()
+    }
+
+
+def test_unconditional_fetch_sends_no_validators(server, planning_html):
+    server.respond(*_planning(planning_html))
+    server.respond(*_planning(planning_html))
+
+    NetplanningClient.fetch('cookie-a')
+    result = NetplanningClient.fetch('cookie-a', conditional=False)
+
+    assert 'If-None-Match' not in server.received[1]
+    assert 'If-Modified-Since' not in server.received[1]
+    assert result['content'] == planning_html.decode('utf-8')
+
+
+def test_response_without_validators_forgets_previous_ones(server, planning_html):
+    server.respond(*_planning(planning_html))
+    server.respond(*_planning(planning_html, etag=None, last_modified=None))
+    server.respond(*_planning(planning_html))
+
+    NetplanningClient.fetch('cookie-a')
+    NetplanningClient.fetch('cookie-a')
+    NetplanningClient.fetch('cookie-a')
+
+    assert server.received[1]['If-None-Match'] == ETAG
+    assert 'If-None-Match' not in server.received[2]
+
+
+def test_unexpected_304_without_validators_is_not_reported_unchanged(server):
+    server.respond(304)
+
+    result = NetplanningClient.fetch('cookie-a')
+
+    assert result['status_code'] == 304
+    assert result['not_modified'] is False
+    assert result['content'] is None
+    assert result['content_hash'] is None
+
+
+def test_transient_503_is_retried(server, planning_html):
+    server.respond(503, [('Retry-After', '0')], b'maintenance')
+    server.respond(*_planning(planning_html))
+
+    result = NetplanningClient.fetch('cookie-a')
+
+    assert len(server.received) == 2
+    assert result['status_code'] == 200
+    assert result['content'] == planning_html.decode('utf-8')
+
+
+def test_error_status_returns_no_content(server):
+    server.respond(403, [], b'forbidden')
+
+    result = NetplanningClient.fetch('cookie-a')
+
+    assert result['status_code'] == 403
+    assert result['content'] is None
+    assert result['content_hash'] is None
+
+
+def test_cookies_set_by_the_server_are_rejected(server, planning_html):
+    server.respond(*_planning(planning_html, extra=[
+        ('Set-Cookie', 'PHPSESSID=server-session; Path=/'),
+        ('Set-Cookie', 'tracking=1; Path=/'),
+    ]))
+    server.respond(*_planning(planning_html))
+
+    NetplanningClient.fetch('cookie-a')
+    NetplanningClient.fetch('cookie-b')
+
+    # La session partagée n'envoie que le cookie de l'utilisateur courant
+    assert server.received[1]['Cookie'] == 'PHPSESSID=cookie-b'
+    assert len(NetplanningClient.get_session().cookies) == 0
@@ -0,0 +1,38 @@
+# tests/tricount/test_access.py
+"""
+Tests des droits d'accès du module Tricount (check_tricount_access): endpoints
+d'administration et d'édition résolus à l'enregistrement du blueprint.
+"""
+from app.routes.tricount import ADMIN_ENDPOINTS, EDIT_ENDPOINTS
+
+
+def test_protected_endpoints_are_resolved_from_view_modules(app):
+    assert {'tricount.import_expenses_n26', 'tricount.categories_list',
+            'tricount.auto_rules_list', 'tricount.apply_auto_rule'} <= ADMIN_ENDPOINTS
+    assert {'tricount.update_expense', 'tricount.reimbursements_list',
+            'tricount.categorize_expenses'} <= EDIT_ENDPOINTS
+    assert 'tricount.index' not in ADMIN_ENDPOINTS | EDIT_ENDPOINTS
+
+
+def test_admin_routes_require_admin_permission(client, login):
+    login('view')
+
+    response = client.get('/tricount/categories')
+
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/tricount/')
+
+
+def test_admin_routes_are_open_with_admin_permission(client, login):
+    login('view', 'admin')
+
+    assert client.get('/tricount/categories').status_code == 200
+
+
+def test_edit_routes_allow_reads_but_not_writes_without_edit_permission(client, login):
+    login('view')
+
+    assert client.get('/tricount/expenses').status_code == 200
+    response = client.post('/tricount/update_expense', data={'expense_id': 1})
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/tricount/')
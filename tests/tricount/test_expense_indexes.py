@@ -0,0 +1,54 @@
+# tests/tricount/test_expense_indexes.py
+"""
+Test de régression des index de la table des dépenses (EXPLAIN PostgreSQL)
+
+Mêmes vérifications que `flask ensure_expense_indexes --check`: chaque requête
+représentative des listes doit utiliser ses index. Ignoré sauf si DATABASE_URL
+désigne une base PostgreSQL. La base n'est jamais vidée: seuls create_all et
+les commandes idempotentes de `flask upgrade_schema` y sont exécutés, et les
+requêtes EXPLAIN sont annulées avec leur transaction.
+"""
+import os
+import pytest
+from app import create_app
+from app.config import TestConfig
+from app.extensions import db
+
+DATABASE_URL = os.getenv('DATABASE_URL', '')
+
+pytestmark = pytest.mark.skipif(
+    not DATABASE_URL.startswith('postgresql'),
+    reason="DATABASE_URL PostgreSQL requis pour les plans EXPLAIN"
+)
+
+
+@pytest.fixture
+def postgres_app(monkeypatch):
+    monkeypatch.setattr(TestConfig, 'SQLALCHEMY_DATABASE_URI', DATABASE_URL)
+    flask_app = create_app('testing')
+    with flask_app.app_context():
+        import app.models  # noqa: F401 - enregistre tous les modèles avant create_all
+        db.create_all()
+        runner = flask_app.test_cli_runner()
+        for command in ('init_expense_search', 'ensure_expense_indexes'):
+            result = runner.invoke(args=[command])
+            assert result.exit_code == 0, result.output
+        yield flask_app
+        db.session.rollback()
+        db.session.remove()
+
+
+def test_list_queries_use_expense_indexes(postgres_app):
+    from app.commands.tricount_commands import _expense_index_checks
+    from app.utils.sql_query_utils import explain_query, plan_index_names
+
+    # Sur une petite table le planificateur préfère un parcours séquentiel
+    db.session.execute(db.text('SET LOCAL enable_seqscan = off'))
+
+    missing = {}
+    for label, query, expected in _expense_index_checks():
+        used = plan_index_names(explain_query(query))
+        if not expected <= used:
+            missing[label] = (sorted(expected - used), sorted(used))
+
+    assert missing == {}, f"Index non utilisés (attendus manquants, plan): {missing}"
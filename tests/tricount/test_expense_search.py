@@ -0,0 +1,89 @@
+# tests/tricount/test_expense_search.py
+"""
+Tests de la recherche des dépenses (/tricount/expenses/search) avec le repli
+SQLite d'ExpenseSearchService: ILIKE par mot, classement et surlignage en Python.
+"""
+from datetime import date
+from decimal import Decimal
+import pytest
+from app.extensions import db
+from app.models.tricount import Category, Expense
+
+
+def _expense(merchant, description, day, **values):
+    return Expense(date=date(2025, 3, day), description=description, merchant=merchant,
+                   amount=Decimal('10.00'), **values)
+
+
+@pytest.fixture
+def expenses(app):
+    rows = {
+        'merchant': _expense('Carrefour Market', 'CARTE X1234 CARREFOUR MARKET', 1),
+        'description': _expense('Boulangerie Paul', 'Achat pain près de Carrefour', 2),
+        'notes': _expense('Station Total', 'CARTE X1234 TOTAL', 3, notes='Parking du carrefour'),
+        'renamed': _expense('CRF EXPRESS', 'CARTE X1234 CRF', 4, renamed_merchant='Carrefour <Express>'),
+        'other': _expense('Pharmacie', 'CARTE X1234 PHARMACIE', 5),
+    }
+    db.session.add_all(rows.values())
+    db.session.commit()
+    return {name: expense.id for name, expense in rows.items()}
+
+
+def _search(client, query, **params):
+    response = client.get('/tricount/expenses/search', query_string={'q': query, **params})
+    assert response.status_code == 200
+    assert response.json['success'] is True
+    return response.json['results']
+
+
+def test_results_are_ranked_by_weighted_columns(client, login, expenses):
+    login('view')
+
+    results = _search(client, 'carrefour')
+
+    # Marchand (A) + description (B), puis marchand renommé (A), description (B), notes (C)
+    assert [result['id'] for result in results] == [
+        expenses['merchant'], expenses['renamed'], expenses['description'], expenses['notes']
+    ]
+    ranks = [result['rank'] for result in results]
+    assert ranks == sorted(ranks, reverse=True)
+    assert ranks[0] > ranks[1]
+
+
+def test_every_word_is_required_and_matches_as_prefix(client, login, expenses):
+    login('view')
+
+    assert [result['id'] for result in _search(client, 'carre mark')] == [expenses['merchant']]
+    assert _search(client, 'carrefour pharmacie') == []
+
+
+def test_matches_are_highlighted_and_escaped(client, login, expenses):
+    login('view')
+
+    results = {result['id']: result for result in _search(client, 'carrefour')}
+
+    assert results[expenses['merchant']]['merchant_html'] == '<mark>Carrefour</mark> Market'
+    assert results[expenses['merchant']]['description_html'] == 'CARTE X1234 <mark>CARREFOUR</mark> MARKET'
+    # Le marchand renommé est affiché, échappé, avec le mot trouvé surligné
+    assert results[expenses['renamed']]['merchant_html'] == '<mark>Carrefour</mark> &lt;Express&gt;'
+
+
+def test_filters_apply_to_search_results(client, login, expenses):
+    login('view')
+    category = Category(name='Courses')
+    db.session.add(category)
+    db.session.flush()
+    db.session.get(Expense, expenses['description']).category_id = category.id
+    db.session.commit()
+
+    assert [result['id'] for result in _search(client, 'carrefour', category_id=category.id)] == [
+        expenses['description']
+    ]
+    assert expenses['description'] not in [result['id'] for result in _search(client, 'carrefour', category_id=0)]
+
+
+def test_empty_or_operator_only_query_returns_nothing(client, login, expenses):
+    login('view')
+
+    assert _search(client, '') == []
+    assert _search(client, '& | !') == []
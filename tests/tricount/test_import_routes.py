@@ -0,0 +1,65 @@
+# tests/tricount/test_import_routes.py
+"""
+Tests de l'import N26: le fichier est envoyé par le client de test, donc lu
+depuis le SpooledTemporaryFile créé par Werkzeug, comme en production.
+"""
+import io
+from tempfile import SpooledTemporaryFile
+from app.models.tricount import Expense
+from app.services.tricount import N26Parser
+
+N26_HEADER = ('"Booking Date","Value Date","Partner Name","Partner Iban","Type",'
+              '"Payment Reference","Account Name","Amount (EUR)","Original Amount",'
+              '"Original Currency","Exchange Rate"\n')
+N26_ROWS = (
+    '"2025-03-01","2025-03-01","Boulangerie Müller","","Presentment","","Compte","-4.20","","",""\n'
+    '"2025-03-02","2025-03-02","Alice Martin","FR7612345","Credit Transfer","Remboursement","Compte","25.00","","",""\n'
+)
+
+
+def _post_csv(client, content, filename='releve.csv'):
+    return client.post(
+        '/tricount/import/n26',
+        data={'csv_file': (io.BytesIO(content), filename)},
+        content_type='multipart/form-data'
+    )
+
+
+def test_n26_upload_imports_transactions(client, login):
+    login('view', 'admin')
+
+    response = _post_csv(client, (N26_HEADER + N26_ROWS).encode('utf-8'))
+
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/tricount/expenses')
+    expenses = {expense.merchant: expense for expense in Expense.query.all()}
+    assert set(expenses) == {'Boulangerie Müller', 'Alice Martin'}
+    assert expenses['Boulangerie Müller'].is_debit is True
+    assert expenses['Alice Martin'].is_debit is False
+
+
+def test_n26_upload_falls_back_to_latin1(client, login):
+    login('view', 'admin')
+
+    response = _post_csv(client, (N26_HEADER + N26_ROWS).encode('latin-1'))
+
+    assert response.status_code == 302
+    assert {expense.merchant for expense in Expense.query.all()} == {'Boulangerie Müller', 'Alice Martin'}
+
+
+class _SpooledFileWithoutReadable(SpooledTemporaryFile):
+    """SpooledTemporaryFile tel qu'en Python 3.10: sans readable()"""
+
+    def __getattribute__(self, name):
+        if name == 'readable':
+            raise AttributeError(name)
+        return super().__getattribute__(name)
+
+
+def test_iter_csv_stream_reads_spooled_file_without_readable():
+    stream = _SpooledFileWithoutReadable(max_size=500 * 1024)
+    stream.write((N26_HEADER + N26_ROWS).encode('utf-8'))
+
+    transactions = list(N26Parser.iter_csv_stream(stream))
+
+    assert [transaction['merchant'] for transaction in transactions] == ['Boulangerie Müller', 'Alice Martin']
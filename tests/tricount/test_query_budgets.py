@@ -0,0 +1,119 @@
+# tests/tricount/test_query_budgets.py
+"""
+Budgets de requêtes SQL des vues de liste (@query_budget)
+
+TestConfig active SQL_QUERY_BUDGET_CHECK en mode TESTING: une vue qui dépasse
+son budget lève QueryBudgetExceeded et fait échouer la requête du client de
+test. Les données couvrent plusieurs catégories et flags pour qu'un chargement
+paresseux par ligne (N+1) dépasse le budget.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+import pytest
+from app.extensions import db
+from app.models.tricount import Category, DeclarationStatus, Expense, Flag, ReimbursementType
+from app.utils.query_counter import QueryBudgetExceeded, assert_max_queries
+
+EXPENSE_COUNT = 30
+REIMBURSEMENT_FILTERS = {
+    'show_all': '1',
+    'sort': 'date',
+    'order': 'desc',
+    'status': [status.value for status in DeclarationStatus],
+}
+
+
+@pytest.fixture
+def expenses(app):
+    flags = [
+        Flag(name='Professionnel', color='blue', reimbursement_type=ReimbursementType.FULLY_REIMBURSABLE.value),
+        Flag(name='Partagé', color='green', reimbursement_type=ReimbursementType.PARTIALLY_REIMBURSABLE.value),
+        Flag(name='Personnel', color='gray', reimbursement_type=ReimbursementType.NOT_REIMBURSABLE.value),
+    ]
+    categories = [Category(name=f'Catégorie {index}', flags=flags[:index + 1]) for index in range(3)]
+    statuses = list(DeclarationStatus)
+    rows = [
+        Expense(
+            date=date(2025, 3, 1) - timedelta(days=index),
+            description=f'CARTE X1234 Commerce {index}',
+            amount=Decimal('12.50') + index,
+            merchant=f'Commerce {index}',
+            # Une dépense sur quatre reste incomplète (page de catégorisation)
+            category=None if index % 4 == 0 else categories[index % 3],
+            flag=flags[index % 3],
+            declaration_status=statuses[index % 3].value,
+        )
+        for index in range(EXPENSE_COUNT)
+    ]
+    db.session.add_all(flags + categories + rows)
+    db.session.commit()
+    # La requête du client de test partage la session: partir d'une session vide
+    db.session.expunge_all()
+    return rows
+
+
+def test_budget_is_enforced_under_testing(app, expenses):
+    with pytest.raises(QueryBudgetExceeded):
+        with assert_max_queries(1):
+            for expense in Expense.query.all():
+                expense.category
+            db.session.expire_all()
+
+
+@pytest.mark.parametrize('query_string', [
+    '',
+    '?sort=amount&order=asc',
+    '?category_id=0',
+    '?category_id=1&search=commerce',
+])
+def test_expenses_list_within_budget(client, login, expenses, query_string):
+    login('view')
+
+    response = client.get(f'/tricount/expenses{query_string}')
+
+    assert response.status_code == 200
+
+
+def test_reimbursements_list_within_budget(client, login, expenses):
+    login('view', 'edit')
+
+    response = client.post('/tricount/reimbursements', data=REIMBURSEMENT_FILTERS)
+
+    assert response.status_code == 200
+
+
+def test_reimbursement_rows_within_budget(client, login, expenses):
+    login('view', 'edit')
+
+    response = client.post('/tricount/reimbursements/rows', data=REIMBURSEMENT_FILTERS)
+
+    assert response.status_code == 200
+    assert b'Commerce 1' in response.data
+
+
+def test_reimbursements_ajax_list_within_budget(client, login, expenses):
+    login('view', 'edit')
+
+    response = client.post('/tricount/reimbursements', data=REIMBURSEMENT_FILTERS,
+                           headers={'X-Requested-With': 'XMLHttpRequest'})
+
+    assert response.status_code == 200
+    assert response.json['success'] is True
+    assert response.json['expenses']
+
+
+def test_categorize_page_within_budget(client, login, expenses):
+    login('view', 'edit')
+
+    response = client.get('/tricount/categorize')
+
+    assert response.status_code == 200
+
+
+def test_categorize_expenses_api_within_budget(client, login, expenses):
+    login('view', 'edit')
+
+    response = client.get('/tricount/categorize/get-expenses?page=1')
+
+    assert response.status_code == 200
+    assert response.json['expenses']